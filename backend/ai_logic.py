@@ -1,7 +1,10 @@
-from typing import List, Dict
+import re
+from typing import List, Dict, Iterable, Optional, Sequence, Tuple
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from datetime import date, timedelta
 from models import Habit, Progress
+from streaks import get_streak, get_streaks
+from suggestions import SuggestionIndex, user_habit_names
 
 # =========================
 # HABIT SUGGESTIONS
@@ -39,33 +42,29 @@ SUGGESTIONS_DB = {
 }
 
 
+# Ranked against what other users track (suggestions.py)
+suggestion_index = SuggestionIndex(SUGGESTIONS_DB)
+
+
 def get_habit_suggestions(
     db: Session,
+    user_id: int,
     target_category: str = None,
     num_suggestions: int = 3
 ) -> List[Dict]:
 
-    user_habits = db.query(Habit).all()
-    existing = {h.name.lower() for h in user_habits}
+    suggestion_index.ensure_built(db)
+    existing = user_habit_names(db, user_id)
 
-    if target_category and target_category in SUGGESTIONS_DB:
-        pool = SUGGESTIONS_DB[target_category]
+    if target_category and suggestion_index.has_category(target_category):
         category = target_category
     else:
-        pool = SUGGESTIONS_DB["general"]
         category = "general"
 
-    suggestions = []
-    for habit in pool:
-        if habit.lower() not in existing:
-            suggestions.append({
-                "name": habit,
-                "category": category
-            })
-        if len(suggestions) == num_suggestions:
-            break
-
-    return suggestions
+    return [
+        {"name": entry.name, "category": category}
+        for entry in suggestion_index.top_k(category, existing, num_suggestions)
+    ]
 
 
 # =========================
@@ -79,6 +78,15 @@ MOOD_RULES = {
     "neutral": ["okay", "fine", "meh"]
 }
 
+# Every keyword in one pattern, matched at every position (the lookahead
+# keeps matches from hiding overlapping ones). Listed in MOOD_RULES order,
+# which is also the priority when several moods match.
+_MOOD_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(word) for words in MOOD_RULES.values() for word in words) + "))"
+)
+_KEYWORD_MOOD = {word: mood for mood, words in MOOD_RULES.items() for word in words}
+_MOOD_RANK = {mood: rank for rank, mood in enumerate(MOOD_RULES)}
+
 QUOTES_DB = {
     "high_streak": [
         "You're on fire! Keep the momentum going 🚀"
@@ -99,51 +107,40 @@ QUOTES_DB = {
 
 
 def calculate_streak(db: Session, habit_id: int) -> int:
-    today = date.today()
-    streak = 0
-    current = today
-
-    while True:
-        entry = db.query(Progress).filter(
-            Progress.habit_id == habit_id,
-            Progress.date == current,
-            Progress.completed == 1
-        ).first()
-
-        if entry:
-            streak += 1
-            current -= timedelta(days=1)
-        else:
-            break
-
-    return streak
+    return get_streak(db, habit_id).current
 
 
 def analyze_mood(notes: str) -> str:
     if not notes:
         return "neutral"
 
-    notes = notes.lower()
-    for mood, keywords in MOOD_RULES.items():
-        if any(word in notes for word in keywords):
-            return mood
-
+    best = None
+    for match in _MOOD_PATTERN.finditer(notes.lower()):
+        mood = _KEYWORD_MOOD[match.group(1)]
+        if best is None or _MOOD_RANK[mood] < _MOOD_RANK[best]:
+            best = mood
+            if _MOOD_RANK[mood] == 0:
+                break
+
+    return best or "neutral"
+
+
+def _latest_mood(recent: Iterable[Tuple[Optional[str], Optional[str]]]) -> str:
+    """
+    Mood of the newest entry with notes among (notes, mood) rows, newest first.
+    """
+    for notes, stored_mood in recent:
+        if notes:
+            # Stored at write time; rows written outside the API may lack it
+            return stored_mood or analyze_mood(notes)
     return "neutral"
 
 
-def get_motivational_quote(db: Session, habit_id: int) -> Dict:
-    streak = calculate_streak(db, habit_id)
+# Streak unit per Habit.frequency (weekly / monthly habits count periods)
+STREAK_UNITS = {"weekly": "weeks", "monthly": "months"}
 
-    recent = db.query(Progress).filter(
-        Progress.habit_id == habit_id
-    ).order_by(Progress.date.desc()).limit(3).all()
-
-    mood = "neutral"
-    for p in recent:
-        if p.notes:
-            mood = analyze_mood(p.notes)
-            break
 
+def _quote(streak: int, mood: str, frequency: Optional[str] = None) -> Dict:
     if streak >= 5:
         theme = "high_streak"
     elif mood == "positive":
@@ -158,5 +155,55 @@ def get_motivational_quote(db: Session, habit_id: int) -> Dict:
     return {
         "quote": quote,
         "theme": theme,
-        "context": f"Streak: {streak} days | Mood: {mood}"
+        "context": f"Streak: {streak} {STREAK_UNITS.get(frequency, 'days')} | Mood: {mood}"
+    }
+
+
+def get_motivational_quote(db: Session, habit_id: int) -> Dict:
+    streak = calculate_streak(db, habit_id)
+    frequency = db.query(Habit.frequency).filter(Habit.id == habit_id).scalar()
+
+    recent = db.query(Progress.notes, Progress.mood).filter(
+        Progress.habit_id == habit_id
+    ).order_by(Progress.date.desc()).limit(3).all()
+
+    return _quote(streak, _latest_mood(recent), frequency)
+
+
+def get_motivational_quotes(db: Session, habit_ids: Sequence[int]) -> Dict[int, Dict]:
+    """
+    get_motivational_quote for many habits in a fixed number of queries:
+    the streaks, the frequencies, and the last 3 entries of every habit
+    (ROW_NUMBER window).
+    """
+    if not habit_ids:
+        return {}
+    streaks = get_streaks(db, habit_ids)
+    frequencies = dict(db.query(Habit.id, Habit.frequency).filter(Habit.id.in_(list(habit_ids))))
+
+    numbered = select(
+        Progress.habit_id,
+        Progress.notes,
+        Progress.mood,
+        func.row_number().over(
+            partition_by=Progress.habit_id,
+            order_by=Progress.date.desc()
+        ).label("position"),
+    ).where(Progress.habit_id.in_(list(habit_ids))).subquery()
+
+    recent: Dict[int, List[Tuple[Optional[str], Optional[str]]]] = {}
+    for habit_id, notes, mood in db.execute(
+        select(numbered.c.habit_id, numbered.c.notes, numbered.c.mood)
+        .where(numbered.c.position <= 3)
+        .order_by(numbered.c.habit_id, numbered.c.position)
+    ):
+        recent.setdefault(habit_id, []).append((notes, mood))
+
+    return {
+        habit_id: _quote(
+            streaks[habit_id].current if habit_id in streaks else 0,
+            _latest_mood(recent.get(habit_id, [])),
+            frequencies.get(habit_id)
+        )
+        for habit_id in habit_ids
     }
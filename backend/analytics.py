@@ -1,94 +1,119 @@
 from typing import List, Dict, Tuple
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from datetime import date, timedelta
-from models import Habit, Progress
+from models import Habit, Progress, HabitStats
+from stats import load_habit_stats
+from streaks import get_streaks
+from rollups import FREQUENCY_PERIODS
 
-def get_completion_trend(db: Session, days_back: int = 30) -> List[Dict]:
+def _daily_completions(db: Session, user_id: int, start_date: date, end_date: date) -> Dict[date, int]:
+    """
+    The user's completed entries per day in [start_date, end_date], one
+    range query. Days without completions are not in the result.
+    """
+    rows = db.query(Progress.date, func.count(Progress.id)).filter(
+        Progress.user_id == user_id,
+        Progress.date >= start_date,
+        Progress.date <= end_date,
+        Progress.completed == 1
+    ).group_by(Progress.date).all()
+
+    return dict(rows)
+
+def get_completion_trend(db: Session, user_id: int, days_back: int = 30) -> List[Dict]:
     """
     Line chart data: Habits completed per day (last N days).
     """
     end_date = date.today()
     start_date = end_date - timedelta(days=days_back)
-    
+    counts = _daily_completions(db, user_id, start_date, end_date)
+
     trend = []
     current_date = start_date
     while current_date <= end_date:
-        daily_completions = db.query(Progress).filter(
-            Progress.date == current_date,
-            Progress.completed == 1
-        ).count()
         trend.append({
             "date": current_date.isoformat(),
-            "completions": daily_completions
+            "completions": counts.get(current_date, 0)
         })
         current_date += timedelta(days=1)
-    
+
     return trend
 
-def get_category_progress(db: Session) -> Dict[str, float]:
+def get_category_progress(db: Session, user_id: int) -> Dict[str, float]:
     """
     Bar chart data: Success rate % per category.
+    Summed from habit_stats, one row per habit.
     """
-    categories = db.query(Habit.category).distinct().all()
+    load_habit_stats(db, user_id)
+    rows = db.query(
+        Habit.category,
+        func.coalesce(func.sum(HabitStats.total), 0),
+        func.coalesce(func.sum(HabitStats.completed), 0),
+    ).outerjoin(HabitStats, HabitStats.habit_id == Habit.id).filter(
+        Habit.user_id == user_id
+    ).group_by(Habit.category).all()
+
     cat_progress = {}
-    
-    for cat_tuple in categories:
-        category = cat_tuple[0]
-        total_entries = db.query(Progress).join(Habit).filter(
-            Habit.category == category
-        ).count()
-        completed_entries = db.query(Progress).join(Habit).filter(
-            Habit.category == category,
-            Progress.completed == 1
-        ).count()
-        
+    for category, total_entries, completed_entries in rows:
         success_rate = (completed_entries / total_entries * 100) if total_entries > 0 else 0
         cat_progress[category] = round(success_rate, 2)
-    
+
     return cat_progress
 
-def get_overall_success_rate(db: Session) -> float:
+def get_overall_success_rate(db: Session, user_id: int) -> float:
     """
     Overall %: Completed entries / total entries.
     """
-    total_entries = db.query(Progress).count()
-    completed_entries = db.query(Progress).filter(Progress.completed == 1).count()
-    
+    load_habit_stats(db, user_id)
+    total_entries, completed_entries = db.query(
+        func.coalesce(func.sum(HabitStats.total), 0),
+        func.coalesce(func.sum(HabitStats.completed), 0),
+    ).join(Habit, Habit.id == HabitStats.habit_id).filter(Habit.user_id == user_id).one()
+
     return (completed_entries / total_entries * 100) if total_entries > 0 else 0
 
-def get_longest_streak(db: Session) -> int:
+def get_longest_streak(db: Session, user_id: int) -> int:
     """
-    Overall longest streak across all habits (max per-habit streak).
-    Uses calculate_streak from ai_logic (reuse!).
+    Overall longest streak across the user's habits (max per-habit current
+    streak), in days for every habit. habit_stats counts weekly / monthly
+    habits in weeks / months, so their day streaks are computed here.
     """
-    from ai_logic import calculate_streak  # Reuse existing logic
-    habits = db.query(Habit).all()
-    max_streak = 0
-    
-    for habit in habits:
-        streak = calculate_streak(db, habit.id)
-        if streak > max_streak:
-            max_streak = streak
-    
-    return max_streak
-
-def get_heatmap_data(db: Session, days: int = 90):
-    from datetime import date, timedelta
+    streaks = {habit_id: row.current_streak for habit_id, row in load_habit_stats(db, user_id).items()}
+    periodic = [
+        habit_id for (habit_id,) in db.query(Habit.id).filter(
+            Habit.user_id == user_id, Habit.frequency.in_(list(FREQUENCY_PERIODS))
+        )
+    ]
+    if periodic:
+        day_streaks = get_streaks(db, periodic, by_frequency=False)
+        for habit_id in periodic:
+            streaks[habit_id] = day_streaks[habit_id].current if habit_id in day_streaks else 0
+    return max(streaks.values(), default=0)
 
+def get_heatmap_data(db: Session, user_id: int, days: int = 90) -> Dict[str, int]:
+    """
+    Heatmap data: completions per day (last N days), zero-filled.
+    """
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
+    counts = _daily_completions(db, user_id, start_date, end_date)
 
     data = {}
     current = start_date
-
     while current <= end_date:
-        count = db.query(Progress).filter(
-            Progress.date == current,
-            Progress.completed == 1
-        ).count()
-
-        data[current.isoformat()] = count
+        data[current.isoformat()] = counts.get(current, 0)
         current += timedelta(days=1)
 
     return data
 
+def get_dashboard_data(db: Session, user_id: int, days_back: int = 30) -> Dict:
+    """
+    Full /analytics/dashboard payload for one user.
+    """
+    return {
+        "completion_trend": get_completion_trend(db, user_id, days_back),
+        "category_progress": get_category_progress(db, user_id),
+        "overall_success_rate": round(get_overall_success_rate(db, user_id), 2),
+        "longest_streak": get_longest_streak(db, user_id),
+    }
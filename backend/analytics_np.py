@@ -0,0 +1,178 @@
+from typing import List, Dict, NamedTuple, Optional
+from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from models import Habit
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency, only needed for engine=numpy
+    np = None
+
+NUMPY_AVAILABLE = np is not None
+
+# =========================
+# VECTORIZED ANALYTICS (engine=numpy)
+# =========================
+# Same outputs as analytics.py, computed from the whole progress history
+# loaded once into flat arrays instead of per-category / per-habit queries.
+
+# CAST(julianday(date) AS INTEGER) - JULIAN_TO_ORDINAL == date.toordinal()
+JULIAN_TO_ORDINAL = 1721424
+
+HISTORY_DTYPE = [("habit_id", "<i4"), ("day", "<i4"), ("completed", "<i1")]
+
+
+class History(NamedTuple):
+    habit_id: "np.ndarray"  # int32, one element per progress row: index into habit_ids
+    day: "np.ndarray"  # int32, date.toordinal() of the row
+    completed: "np.ndarray"  # int8, 1 if completed
+    categories: List[str]  # category names, sorted
+    habit_category: "np.ndarray"  # habit index -> index into categories (-1 = no habit)
+    habit_ids: "np.ndarray"  # habit index -> habit id, sorted
+
+
+def load_history(db: Session, user_id: int) -> History:
+    """
+    One pass over the user's progress into compact arrays (~9 bytes per row).
+    """
+    habits = db.query(Habit.id, Habit.category).filter(Habit.user_id == user_id).all()
+    categories = sorted({category for _, category in habits})
+    category_index = {category: i for i, category in enumerate(categories)}
+
+    cursor = db.connection().exec_driver_sql(
+        "SELECT habit_id, CAST(julianday(date) AS INTEGER), completed FROM progress WHERE user_id = ?",
+        (user_id,)
+    )
+    rows = np.fromiter((tuple(row) for row in cursor), dtype=HISTORY_DTYPE)
+    day = rows["day"] - JULIAN_TO_ORDINAL
+    completed = (rows["completed"] == 1).astype(np.int8)
+
+    # Dense habit indices over every id seen in either table, so array
+    # sizes follow this user's habit count, not the global id range
+    habit_ids = np.union1d(np.array([h for h, _ in habits], dtype=np.int32), rows["habit_id"])
+    habit_id = np.searchsorted(habit_ids, rows["habit_id"]).astype(np.int32)
+    habit_category = np.full(len(habit_ids), -1, dtype=np.int32)
+    for h, category in habits:
+        habit_category[np.searchsorted(habit_ids, h)] = category_index[category]
+
+    return History(habit_id, day, completed, categories, habit_category, habit_ids)
+
+
+def daily_completions(history: History, start_date: date, end_date: date) -> "np.ndarray":
+    """
+    Completions per day for [start_date, end_date], index 0 = start_date.
+    """
+    start, end = start_date.toordinal(), end_date.toordinal()
+    mask = (history.completed == 1) & (history.day >= start) & (history.day <= end)
+    return np.bincount(history.day[mask] - start, minlength=end - start + 1)
+
+
+def get_completion_trend(history: History, days_back: int = 30) -> List[Dict]:
+    end_date = date.today()
+    start_date = end_date - timedelta(days=days_back)
+    counts = daily_completions(history, start_date, end_date)
+
+    return [
+        {"date": (start_date + timedelta(days=i)).isoformat(), "completions": int(count)}
+        for i, count in enumerate(counts)
+    ]
+
+
+def get_heatmap_data(history: History, days: int = 90) -> Dict[str, int]:
+    end_date = date.today()
+    start_date = end_date - timedelta(days=days)
+    counts = daily_completions(history, start_date, end_date)
+
+    return {
+        (start_date + timedelta(days=i)).isoformat(): int(count)
+        for i, count in enumerate(counts)
+    }
+
+
+def _category_counts(history: History):
+    category = history.habit_category[history.habit_id]
+    known = category >= 0
+    size = len(history.categories)
+    totals = np.bincount(category[known], minlength=size)
+    completed = np.bincount(category[known], weights=history.completed[known], minlength=size)
+    return totals, completed.astype(np.int64)
+
+
+def get_category_progress(history: History) -> Dict[str, float]:
+    totals, completed = _category_counts(history)
+    cat_progress = {}
+
+    # Rates from the integer counts in Python, so they match analytics.py exactly
+    for category, total_entries, completed_entries in zip(history.categories, totals.tolist(), completed.tolist()):
+        success_rate = (completed_entries / total_entries * 100) if total_entries > 0 else 0
+        cat_progress[category] = round(success_rate, 2)
+
+    return cat_progress
+
+
+def get_overall_success_rate(history: History) -> float:
+    totals, completed = _category_counts(history)
+    total_entries, completed_entries = int(totals.sum()), int(completed.sum())
+    return (completed_entries / total_entries * 100) if total_entries > 0 else 0
+
+
+def get_streaks(history: History, today: Optional[date] = None) -> Dict[int, tuple]:
+    """
+    {habit_id: (current, longest)} from run lengths of consecutive days.
+    """
+    today = (today or date.today()).toordinal()
+    done = history.completed == 1
+    habit_id, day = history.habit_id[done], history.day[done]
+    if not len(day):
+        return {}
+
+    order = np.lexsort((day, habit_id))
+    habit_id, day = habit_id[order], day[order]
+
+    # A run starts where the habit changes or the previous day is missing
+    starts = np.flatnonzero(
+        np.concatenate(([True], (habit_id[1:] != habit_id[:-1]) | (day[1:] - day[:-1] != 1)))
+    )
+    ends = np.append(starts[1:], len(day)) - 1
+    lengths = ends - starts + 1
+    run_habit, first_day, last_day = habit_id[starts], day[starts], day[ends]
+
+    longest = np.zeros(int(habit_id.max()) + 1, dtype=np.int64)
+    np.maximum.at(longest, run_habit, lengths)
+
+    # Current streak: the run containing today, counted up to today
+    current = np.zeros_like(longest)
+    live = (first_day <= today) & (last_day >= today)
+    current[run_habit[live]] = today - first_day[live] + 1
+
+    return {
+        int(history.habit_ids[h]): (int(current[h]), int(longest[h]))
+        for h in np.unique(run_habit)
+    }
+
+
+def get_longest_streak(history: History) -> int:
+    """
+    Max current streak over habits that still exist, in days whatever the
+    habit's frequency (as analytics.py).
+    """
+    streaks = get_streaks(history)
+    existing = set(history.habit_ids[history.habit_category >= 0].tolist())
+    return max(
+        (current for h, (current, _) in streaks.items() if h in existing),
+        default=0
+    )
+
+
+def get_dashboard_data(db: Session, user_id: int, days_back: int = 30) -> Dict:
+    history = load_history(db, user_id)
+    return {
+        "completion_trend": get_completion_trend(history, days_back),
+        "category_progress": get_category_progress(history),
+        "overall_success_rate": round(get_overall_success_rate(history), 2),
+        "longest_streak": get_longest_streak(history),
+    }
+
+
+def get_heatmap(db: Session, user_id: int, days: int = 90) -> Dict[str, int]:
+    return get_heatmap_data(load_history(db, user_id), days)
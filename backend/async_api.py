@@ -0,0 +1,105 @@
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from typing import List
+
+from database import get_async_db
+from models import Progress
+from schemas import HabitWithStatsResponse
+from stats import get_habits_with_stats, apply_progress_writes, read_completions
+from rollups import refresh_rollups
+from analytics import get_dashboard_data, get_heatmap_data
+from cache import cached_response_async
+import write_hooks
+from fast_json import FastJSONResponse
+from users import get_current_user_id_async, get_user_habit
+from moods import classify_mood
+from change_log import log_progress
+
+# =========================
+# ASYNC ENDPOINTS (ASYNC_DB=1)
+# =========================
+# Async twins of the hot endpoints in main.py. They await the database
+# instead of holding a threadpool worker; the query logic is shared with
+# the sync path through AsyncSession.run_sync.
+
+router = APIRouter(prefix="/async", tags=["async"])
+
+
+@router.get("/habits/", response_model=List[HabitWithStatsResponse])
+async def read_habits(
+    selected_date: date = Query(default=None),
+    user_id: int = Depends(get_current_user_id_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    habits = await db.run_sync(get_habits_with_stats, user_id, selected_date or date.today())
+    return FastJSONResponse(habits)
+
+
+@router.put("/progress/")
+async def update_progress(
+    habit_id: int,
+    target_date: date,
+    completed: int = 1,
+    notes: str = "",
+    user_id: int = Depends(get_current_user_id_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    await db.run_sync(get_user_habit, user_id, habit_id)
+    # Logged first: takes the write lock before the old value is read
+    await db.run_sync(log_progress, user_id, [(habit_id, target_date)])
+    before = (await db.run_sync(read_completions, [(habit_id, target_date)])).get((habit_id, target_date))
+
+    stmt = sqlite_insert(Progress).values(
+        habit_id=habit_id,
+        user_id=user_id,
+        date=target_date,
+        completed=completed,
+        notes=notes,
+        mood=classify_mood(notes)
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[Progress.habit_id, Progress.date],
+        set_={
+            "completed": stmt.excluded.completed,
+            "notes": stmt.excluded.notes,
+            "mood": stmt.excluded.mood,
+        }
+    ))
+
+    await db.run_sync(refresh_rollups, [(habit_id, target_date)])
+    await db.run_sync(apply_progress_writes, [(habit_id, target_date, before, completed)])
+    await db.commit()
+    await db.run_sync(write_hooks.progress_committed, user_id, [(habit_id, target_date, completed)])
+    return {"message": "Progress updated"}
+
+
+@router.get("/analytics/dashboard")
+async def get_dashboard_analytics(
+    request: Request,
+    response: Response,
+    days: int = Query(default=30, ge=1, le=3660),
+    user_id: int = Depends(get_current_user_id_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await cached_response_async(
+        request, response, ("dashboard", days, "sql"),
+        lambda: db.run_sync(get_dashboard_data, user_id, days),
+        scope=user_id
+    )
+
+
+@router.get("/analytics/heatmap")
+async def heatmap(
+    request: Request,
+    response: Response,
+    days: int = Query(default=90, ge=1, le=3660),
+    user_id: int = Depends(get_current_user_id_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await cached_response_async(
+        request, response, ("heatmap", days, "sql"),
+        lambda: db.run_sync(get_heatmap_data, user_id, days),
+        scope=user_id
+    )
@@ -0,0 +1,75 @@
+"""
+Dashboard analytics: SQL engine (analytics.py) vs NumPy engine
+(analytics_np.py) on a large history. Checks both give identical output.
+
+    python -m benchmarks.analytics_engines [--habits 10000] [--days 730]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import analytics
+import analytics_np
+from benchmarks.common import make_session, seed
+from models import Habit, HabitStats, Progress, DEFAULT_USER_ID
+from rollups import refresh_rollups
+
+
+def _timed(label: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<40} {time.perf_counter() - start:>8.2f}s")
+    return result
+
+
+def _add_periodic_habits(db, num_days: int):
+    # A weekly and a monthly habit completed every day: the longest day
+    # streaks, which habit_stats counts in weeks / months
+    seed(db, 2, num_days, rate=1.0, categories=("health",))
+    habits = db.query(Habit).order_by(Habit.id.desc()).limit(2).all()
+    for habit, frequency in zip(habits, ("weekly", "monthly")):
+        habit.frequency = frequency
+    refresh_rollups(db, [
+        (habit.id, day) for habit in habits
+        for (day,) in db.query(Progress.date).filter(Progress.habit_id == habit.id)
+    ])
+    db.commit()
+
+
+def run(num_habits: int, num_days: int, days_back: int = 365):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, db = make_session("sqlite:///" + os.path.join(tmp, "bench.db"))
+        _timed(f"seed {num_habits} habits x {num_days} days", lambda: seed(
+            db, num_habits, num_days, rate=0.85, categories=("health", "learning", "work", "general")
+        ))
+        _add_periodic_habits(db, num_days)
+
+        # SQL engine: cold = habit_stats has to be built, warm = reads it back
+        sql_cold = _timed("sql engine (cold habit_stats)", lambda: analytics.get_dashboard_data(db, DEFAULT_USER_ID, days_back))
+        sql_warm = _timed("sql engine (warm habit_stats)", lambda: analytics.get_dashboard_data(db, DEFAULT_USER_ID, days_back))
+        db.query(HabitStats).delete()
+        db.commit()
+
+        history = _timed("numpy: load history", lambda: analytics_np.load_history(db, DEFAULT_USER_ID))
+        _timed("numpy: compute dashboard", lambda: {
+            "completion_trend": analytics_np.get_completion_trend(history, days_back),
+            "category_progress": analytics_np.get_category_progress(history),
+            "overall_success_rate": round(analytics_np.get_overall_success_rate(history), 2),
+            "longest_streak": analytics_np.get_longest_streak(history),
+        })
+        numpy_result = _timed("numpy engine (load + compute)", lambda: analytics_np.get_dashboard_data(db, DEFAULT_USER_ID, days_back))
+        print(f"history arrays: {sum(a.nbytes for a in history[:3]) / 1e6:.1f} MB for {len(history.day):,} rows")
+
+        assert sql_cold == sql_warm == numpy_result, "engines disagree"
+        print("outputs identical")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--habits", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=730)
+    args = parser.parse_args()
+    run(args.habits, args.days)
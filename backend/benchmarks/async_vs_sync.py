@@ -0,0 +1,56 @@
+"""
+Requests/sec and latency percentiles of the sync endpoints vs their
+/async/... twins under concurrent load (in-process ASGI client). Uses a scratch database seeded with the demo
+data unless DATABASE_URL is set.
+
+    python -m benchmarks.async_vs_sync
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("ASYNC_DB", "1")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+import httpx  # noqa: E402
+
+from benchmarks.common import percentile  # noqa: E402
+from main import app  # noqa: E402
+
+PATHS = [
+    "/habits/",
+    "/analytics/heatmap?days=365",
+]
+
+
+async def _load(client: httpx.AsyncClient, path: str, requests: int, concurrency: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - start), latencies
+
+
+async def run(requests: int = 500, concurrency: int = 50):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/seed-demo-data")
+        print(f"{'path':<36} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+        for path in PATHS:
+            for variant in (path, "/async" + path):
+                await _load(client, variant, concurrency, concurrency)  # warm-up
+                rps, latencies = await _load(client, variant, requests, concurrency)
+                print(f"{variant:<36} {rps:>8.1f} {percentile(latencies, 50):>8.2f} {percentile(latencies, 99):>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
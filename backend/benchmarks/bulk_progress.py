@@ -0,0 +1,65 @@
+"""
+Rows/sec of bulk progress ingestion vs one upsert + commit per row.
+
+    python -m benchmarks.bulk_progress
+"""
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from benchmarks.common import make_session, seed
+from bulk import bulk_upsert_progress
+from models import Progress, DEFAULT_USER_ID
+from schemas import ProgressBulkItem
+
+
+def _items(num_habits: int, num_days: int):
+    start = date.today() - timedelta(days=num_days - 1)
+    return [
+        ProgressBulkItem(habit_id=habit_id, date=start + timedelta(days=offset), completed=offset % 3 != 0)
+        for habit_id in range(1, num_habits + 1)
+        for offset in range(num_days)
+    ]
+
+
+def run(num_habits: int = 50, num_days: int = 365, single_rows: int = 2000):
+    # File-backed so commits cost what they cost in production
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, db = make_session("sqlite:///" + os.path.join(tmp, "bench.db"))
+        seed(db, num_habits, 0)
+        items = _items(num_habits, num_days)
+
+        start = time.perf_counter()
+        result = bulk_upsert_progress(db, DEFAULT_USER_ID, items)
+        elapsed = time.perf_counter() - start
+        print(f"bulk insert: {len(items)} rows in {elapsed:.2f}s = {len(items) / elapsed:,.0f} rows/sec ({result['inserted']} inserted)")
+
+        start = time.perf_counter()
+        result = bulk_upsert_progress(db, DEFAULT_USER_ID, items)
+        elapsed = time.perf_counter() - start
+        print(f"bulk update: {len(items)} rows in {elapsed:.2f}s = {len(items) / elapsed:,.0f} rows/sec ({result['updated']} updated)")
+
+        # Baseline: what PUT /progress/ does per row
+        start = time.perf_counter()
+        for item in items[:single_rows]:
+            stmt = sqlite_insert(Progress).values(
+                habit_id=item.habit_id, user_id=DEFAULT_USER_ID, date=item.date,
+                completed=item.completed, notes=item.notes
+            )
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[Progress.habit_id, Progress.date],
+                set_={"completed": stmt.excluded.completed}
+            ))
+            db.commit()
+        elapsed = time.perf_counter() - start
+        print(f"per-row:     {single_rows} rows in {elapsed:.2f}s = {single_rows / elapsed:,.0f} rows/sec")
+
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,80 @@
+import random
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, Habit, DEFAULT_USER_ID
+
+
+def make_session(url: str = "sqlite://"):
+    """
+    Fresh database + session for a benchmark run (in-memory by default),
+    so benchmarks never touch habit_hero.db.
+    """
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+INSERT_PROGRESS = "INSERT INTO progress (habit_id, user_id, date, completed) VALUES (?, ?, ?, ?)"
+
+
+def seed(db, num_habits: int, num_days: int, rate: float = 0.8, rng_seed: int = 42,
+         categories=("general",), chunk_size: int = 100_000, user_id: int = DEFAULT_USER_ID):
+    """
+    num_habits habits of user_id, each with num_days of history ending today.
+    Progress rows go in through raw executemany so millions of rows are cheap.
+    """
+    rng = random.Random(rng_seed)
+    today = date.today()
+    start = today - timedelta(days=num_days - 1)
+    days = [(start + timedelta(days=offset)).isoformat() for offset in range(num_days)]
+
+    habits = [
+        Habit(name=f"Habit {i}", frequency="daily", category=categories[i % len(categories)],
+              start_date=start, user_id=user_id)
+        for i in range(num_habits)
+    ]
+    db.add_all(habits)
+    db.flush()
+
+    conn = db.connection()
+    chunk = []
+    for habit in habits:
+        for day in days:
+            chunk.append((habit.id, user_id, day, 1 if rng.random() < rate else 0))
+            if len(chunk) >= chunk_size:
+                conn.exec_driver_sql(INSERT_PROGRESS, chunk)
+                chunk = []
+    if chunk:
+        conn.exec_driver_sql(INSERT_PROGRESS, chunk)
+    db.commit()
+
+
+class QueryCounter:
+    """
+    Counts statements executed on an engine.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    @contextmanager
+    def track(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        try:
+            yield self
+        finally:
+            event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
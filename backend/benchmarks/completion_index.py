@@ -0,0 +1,48 @@
+"""
+Completion index: bitmap memory per habit and heatmap latency vs the SQL
+range query, as history grows.
+
+    python -m benchmarks.completion_index
+"""
+import sys
+import time
+
+from analytics import get_heatmap_data as sql_heatmap
+from benchmarks.common import make_session, seed
+from completion_index import CompletionIndex, completion_index, get_heatmap_data as bitset_heatmap
+from models import DEFAULT_USER_ID
+
+
+def _ms(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def run(num_habits: int = 500, history_days=(90, 365, 1095), heatmap_days: int = 365):
+    print(f"{'days':>6} {'rows':>9} {'bytes/habit':>12} {'load ms':>9} {'sql ms':>8} {'bitset ms':>10}")
+    for num_days in history_days:
+        engine, db = make_session()
+        seed(db, num_habits, num_days)
+
+        index = CompletionIndex()
+        load_ms = _ms(lambda: index.ensure_loaded(db, DEFAULT_USER_ID))
+        per_habit = sum(
+            sys.getsizeof(bits.present) + sys.getsizeof(bits.done)
+            for bits in index._users[DEFAULT_USER_ID].habits.values()
+        ) / num_habits
+
+        completion_index.reset()
+        completion_index.ensure_loaded(db, DEFAULT_USER_ID)
+        assert sql_heatmap(db, DEFAULT_USER_ID, heatmap_days) == bitset_heatmap(db, DEFAULT_USER_ID, heatmap_days)
+        sql_ms = _ms(lambda: sql_heatmap(db, DEFAULT_USER_ID, heatmap_days))
+        bitset_ms = _ms(lambda: bitset_heatmap(db, DEFAULT_USER_ID, heatmap_days))
+
+        rows = num_habits * num_days
+        print(f"{num_days:>6} {rows:>9} {per_habit:>12.0f} {load_ms:>9.1f} {sql_ms:>8.2f} {bitset_ms:>10.2f}")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,126 @@
+"""
+GET /events under many idle connections: server memory and thread count
+as streams are opened, and how long one progress write takes to reach
+every stream. Runs uvicorn on a scratch database in a subprocess.
+
+    python -m benchmarks.events [--streams 100 1000 5000] [--port 8765]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+import httpx
+
+from benchmarks.common import make_session, seed
+from models import DEFAULT_USER_ID, User
+
+WRITES = 5
+
+
+def _proc_status(pid: int) -> dict:
+    # VmRSS (kB) and thread count of the server process
+    with open(f"/proc/{pid}/status") as status:
+        fields = dict(line.split(":", 1) for line in status)
+    with open(f"/proc/{pid}/stat") as stat:
+        ticks = sum(int(value) for value in stat.read().rsplit(")", 1)[1].split()[11:13])
+    return {
+        "rss_mb": int(fields["VmRSS"].split()[0]) / 1024,
+        "threads": int(fields["Threads"]),
+        "cpu_ms": ticks * 1000 / os.sysconf("SC_CLK_TCK"),
+    }
+
+
+async def _listen(client: httpx.AsyncClient, url: str, ready: asyncio.Event, arrivals: list):
+    async with client.stream("GET", url) as response:
+        buffer = ""
+        async for chunk in response.aiter_text():
+            if not ready.is_set():
+                ready.set()  # The "retry:" preamble: subscribed
+            buffer += chunk
+            while "\n\n" in buffer:
+                message, buffer = buffer.split("\n\n", 1)
+                if "event: progress" in message:
+                    arrivals.append(time.perf_counter())
+
+
+async def _run(base: str, pid: int, stream_counts):
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(timeout=None, limits=limits) as client:
+        habit_id = (await client.get(f"{base}/habits/")).json()[0]["id"]
+        baseline = _proc_status(pid)
+        print(f"{'streams':>8} {'rss MB':>7} {'KB/stream':>10} {'threads':>8} "
+              f"{'write ms':>9} {'p50 ms':>7} {'p99 ms':>7} {'last ms':>8} {'server cpu ms':>14}")
+
+        tasks, arrivals = [], []
+        for target in stream_counts:
+            while len(tasks) < target:
+                ready = asyncio.Event()
+                tasks.append((asyncio.create_task(_listen(client, f"{base}/events", ready, arrivals)), ready))
+            await asyncio.gather(*(ready.wait() for _, ready in tasks))
+            await asyncio.sleep(1)
+            status = _proc_status(pid)
+
+            latencies, write_ms = [], []
+            cpu_start = _proc_status(pid)["cpu_ms"]
+            for write in range(WRITES):
+                arrivals.clear()
+                start = time.perf_counter()
+                await client.put(f"{base}/progress/", params={
+                    "habit_id": habit_id, "target_date": date.today().isoformat(), "completed": write % 2
+                })
+                write_ms.append((time.perf_counter() - start) * 1000)
+                while len(arrivals) < len(tasks):
+                    await asyncio.sleep(0.005)
+                latencies += sorted((arrival - start) * 1000 for arrival in arrivals)
+            latencies.sort()
+            server_cpu_ms = (_proc_status(pid)["cpu_ms"] - cpu_start) / WRITES
+
+            print(f"{len(tasks):>8} {status['rss_mb']:>7.1f} "
+                  f"{(status['rss_mb'] - baseline['rss_mb']) * 1024 / len(tasks):>10.1f} {status['threads']:>8} "
+                  f"{statistics.median(write_ms):>9.2f} {latencies[len(latencies) // 2]:>7.1f} "
+                  f"{latencies[int(len(latencies) * 0.99)]:>7.1f} {latencies[-1]:>8.1f} {server_cpu_ms:>14.1f}")
+
+        for task, _ in tasks:
+            task.cancel()
+        await asyncio.gather(*(task for task, _ in tasks), return_exceptions=True)
+
+
+def run(stream_counts=(100, 1000, 5000), port: int = 8765):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = "sqlite:///" + os.path.join(tmp, "bench.db")
+        engine, db = make_session(url)
+        db.add(User(id=DEFAULT_USER_ID, name="bench"))
+        seed(db, 20, 90, categories=("health", "learning", "work", "general"))
+        db.close()
+        engine.dispose()
+
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+            env={**os.environ, "DATABASE_URL": url, "BACKGROUND_JOBS": "0"},
+        )
+        base = f"http://127.0.0.1:{port}"
+        try:
+            for _ in range(100):
+                try:
+                    httpx.get(f"{base}/")
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.1)
+            asyncio.run(_run(base, server.pid, stream_counts))
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streams", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    run(tuple(args.streams), args.port)
@@ -0,0 +1,104 @@
+"""
+PUT /progress/ latency and SQL statements per request as a habit's
+history grows, for today, yesterday and a random past day, then with
+several clients writing the same habits at once. Checks habit_stats
+against a full recompute afterwards.
+
+    python -m benchmarks.progress_writes [--years 0.1 1 10 30] [--writes 100] [--writers 8]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+
+def _concurrent_writes(client, habit_ids, num_days: int, writers: int, writes: int) -> float:
+    # writers threads PUT writes entries each into the same few habits and
+    # recent days, so their read-modify-write of habit_stats overlaps;
+    # returns the wall time in ms
+    today = date.today()
+
+    def write(seed_: int) -> None:
+        rng = random.Random(seed_)
+        for _ in range(writes):
+            response = client.put("/progress/", params={
+                "habit_id": rng.choice(habit_ids),
+                "target_date": (today - timedelta(days=rng.randrange(min(num_days, 14)))).isoformat(),
+                "completed": rng.randint(0, 1),
+            })
+            assert response.status_code == 200, response.text
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(writers) as pool:
+        list(pool.map(write, range(writers)))
+    return (time.perf_counter() - start) * 1000
+
+
+def run(history_years=(0.1, 1, 10, 30), writes: int = 100, writers: int = 8):
+    from fastapi.testclient import TestClient
+
+    from benchmarks.common import QueryCounter, seed
+    from database import SessionLocal, engine
+    from main import app
+    from models import Habit
+    from rollups import rebuild_rollups
+    from stats import check_habit_stats, refresh_habit_stats
+
+    rng = random.Random(5)
+    client = TestClient(app)
+    counter = QueryCounter(engine)
+    today = date.today()
+    print(f"{'days':>7} {'kind':>10} {'p50 ms':>8} {'max ms':>8} {'queries':>8}")
+
+    for years in history_years:
+        num_days = int(years * 365)
+        db = SessionLocal()
+        seed(db, 2, num_days, rate=0.9, rng_seed=rng.randrange(1000))
+        habit_ids = [habit_id for (habit_id,) in db.query(Habit.id).order_by(Habit.id.desc()).limit(2)]
+        habit_id = habit_ids[0]
+        rebuild_rollups(db)
+        refresh_habit_stats(db, habit_ids)
+        db.commit()
+        db.close()
+
+        days = {
+            "today": lambda: today,
+            "yesterday": lambda: today - timedelta(days=1),
+            "past": lambda: today - timedelta(days=rng.randrange(2, num_days)),
+        }
+        for kind, pick_day in days.items():
+            timings, queries = [], []
+            for i in range(writes):
+                params = {"habit_id": habit_id, "target_date": pick_day().isoformat(), "completed": rng.randint(0, 1)}
+                with counter.track():
+                    start = time.perf_counter()
+                    client.put("/progress/", params=params)
+                    timings.append((time.perf_counter() - start) * 1000)
+                queries.append(counter.count)
+            print(f"{num_days:>7} {kind:>10} {statistics.median(timings):>8.2f} {max(timings):>8.2f} "
+                  f"{statistics.median(queries):>8.0f}")
+
+        elapsed = _concurrent_writes(client, habit_ids, num_days, writers, writes)
+        print(f"{num_days:>7} {f'{writers} writers':>10} {elapsed / (writers * writes):>8.2f} {'':>8} {'':>8}")
+
+        db = SessionLocal()
+        problems = check_habit_stats(db)
+        db.close()
+        assert not problems, f"habit_stats drifted: {problems[:3]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=float, nargs="+", default=[0.1, 1, 10, 30])
+    parser.add_argument("--writes", type=int, default=100)
+    parser.add_argument("--writers", type=int, default=8)
+    args = parser.parse_args()
+
+    # Must be set before database.py is imported
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["BACKGROUND_JOBS"] = "0"
+    run(tuple(args.years), args.writes, args.writers)
@@ -0,0 +1,37 @@
+"""
+Query count + latency of GET /habits/ stats as the habit count grows.
+
+    python -m benchmarks.read_habits
+"""
+import time
+from datetime import date
+
+from benchmarks.common import make_session, seed, QueryCounter
+from completion_index import completion_index
+from models import DEFAULT_USER_ID
+from stats import get_habits_with_stats
+
+
+def run(habit_counts=(10, 100, 500), num_days: int = 60):
+    print(f"{'habits':>8} {'queries':>8} {'ms':>10}")
+    for num_habits in habit_counts:
+        engine, db = make_session()
+        seed(db, num_habits, num_days, rate=0.9)
+
+        # First call loads the completion index; measure the steady state after it
+        completion_index.reset()
+        get_habits_with_stats(db, DEFAULT_USER_ID, date.today())
+
+        counter = QueryCounter(engine)
+        with counter.track():
+            start = time.perf_counter()
+            get_habits_with_stats(db, DEFAULT_USER_ID, date.today())
+            elapsed = (time.perf_counter() - start) * 1000
+
+        print(f"{num_habits:>8} {counter.count:>8} {elapsed:>10.2f}")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    run()
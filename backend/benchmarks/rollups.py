@@ -0,0 +1,100 @@
+"""
+Period rollups: a multi-year monthly / weekly trend read from the rollups
+vs grouping the progress rows, and what keeping them current adds to a
+single progress write.
+
+    python -m benchmarks.rollups [--habits 200] [--years 1 3 5]
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import func
+
+from benchmarks.common import make_session, seed
+from models import DEFAULT_USER_ID, Habit, HabitPeriod, Progress
+from rollups import get_trend, rebuild_rollups, refresh_rollups
+from stats import refresh_habit_stats
+
+WRITES = 200
+
+
+def _ms(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def _progress_trend(db, since: date):
+    # The same monthly numbers straight from progress
+    month = func.date(Progress.date, "start of month")
+    return db.query(month, func.count(Progress.id), func.sum(Progress.completed)).filter(
+        Progress.user_id == DEFAULT_USER_ID, Progress.date >= since
+    ).group_by(month).all()
+
+
+def _check_years(db, range_: str):
+    # Year totals (summed from month rollups) against the progress rows
+    year = func.strftime("%Y", Progress.date)
+    by_year = dict(db.query(year, func.count(Progress.id)).filter(
+        Progress.user_id == DEFAULT_USER_ID
+    ).group_by(year).all())
+    for period in get_trend(db, DEFAULT_USER_ID, "year", range_)["periods"]:
+        expected = by_year.get(period["start"][:4], 0)
+        assert period["total"] == expected, f"{period['start']}: {period['total']} != {expected}"
+
+
+def run(num_habits: int = 200, years=(1, 3, 5)):
+    rng = random.Random(23)
+    print(f"{'years':>6} {'rows':>10} {'rollup rows':>12} {'rebuild s':>10} "
+          f"{'month trend ms':>15} {'week trend ms':>14} {'progress ms':>12} {'write ms':>9} {'+rollups ms':>12}")
+    for num_years in years:
+        engine, db = make_session()
+        num_days = num_years * 365
+        seed(db, num_habits, num_days, categories=("health", "learning", "work", "general"))
+
+        rebuild_s = _ms(lambda: (rebuild_rollups(db), db.commit())) / 1000
+        range_ = f"{num_years}y"
+        _check_years(db, range_)
+        month_ms = statistics.median(_ms(lambda: get_trend(db, DEFAULT_USER_ID, "month", range_)) for _ in range(5))
+        week_ms = statistics.median(_ms(lambda: get_trend(db, DEFAULT_USER_ID, "week", range_)) for _ in range(5))
+        since = date.today() - timedelta(days=num_days)
+        progress_ms = statistics.median(_ms(lambda: _progress_trend(db, since)) for _ in range(5))
+
+        # One upserted entry: habit_stats refresh alone, then with the rollups
+        habit_ids = [habit_id for (habit_id,) in db.query(Habit.id)]
+        writes = [(rng.choice(habit_ids), date.today() - timedelta(days=rng.randrange(num_days)))
+                  for _ in range(WRITES)]
+
+        def write(with_rollups: bool):
+            timings = []
+            for habit_id, day in writes:
+                start = time.perf_counter()
+                db.query(Progress).filter(Progress.habit_id == habit_id, Progress.date == day).update(
+                    {"completed": Progress.completed}, synchronize_session=False
+                )
+                if with_rollups:
+                    refresh_rollups(db, [(habit_id, day)])
+                refresh_habit_stats(db, [habit_id])
+                db.commit()
+                timings.append((time.perf_counter() - start) * 1000)
+            return statistics.median(timings)
+
+        write_ms = write(False)
+        with_rollups_ms = write(True)
+
+        rows = db.query(Progress).count()
+        print(f"{num_years:>6} {rows:>10} {db.query(HabitPeriod).count():>12} {rebuild_s:>10.1f} "
+              f"{month_ms:>15.2f} {week_ms:>14.2f} {progress_ms:>12.1f} {write_ms:>9.2f} {with_rollups_ms - write_ms:>12.2f}")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--habits", type=int, default=200)
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 3, 5])
+    args = parser.parse_args()
+    run(args.habits, tuple(args.years))
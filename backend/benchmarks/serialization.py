@@ -0,0 +1,76 @@
+"""
+Per-row cost of serializing GET /progress/{habit_id}: ORM objects validated
+through response_model (the old path) vs column tuples encoded directly.
+
+    python -m benchmarks.serialization
+"""
+import json
+import time
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+import fast_json
+from benchmarks.common import make_session, seed
+from models import Progress
+from schemas import ProgressResponse
+
+FIELDS = ("id", "habit_id", "date", "completed", "notes")
+
+
+def orm_pydantic(db, habit_id):
+    # What FastAPI does for response_model=List[ProgressResponse]
+    rows = db.query(Progress).filter(Progress.habit_id == habit_id).order_by(Progress.date).all()
+    validated = TypeAdapter(List[ProgressResponse]).validate_python(rows, from_attributes=True)
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def tuples_fast(db, habit_id):
+    rows = db.query(*[getattr(Progress, name) for name in FIELDS]).filter(
+        Progress.habit_id == habit_id
+    ).order_by(Progress.date)
+    return fast_json.dumps([dict(zip(FIELDS, row)) for row in rows])
+
+
+def tuples_stdlib(db, habit_id):
+    rows = db.query(*[getattr(Progress, name) for name in FIELDS]).filter(
+        Progress.habit_id == habit_id
+    ).order_by(Progress.date)
+    return json.dumps([dict(zip(FIELDS, row)) for row in rows], default=fast_json._default,
+                      ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _time(fn, db, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        db.expunge_all()  # No identity-map reuse between runs
+        start = time.perf_counter()
+        fn(db, 1)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(day_counts=(365, 3650, 36500), repeat: int = 5):
+    paths = [("orm+pydantic", orm_pydantic), ("tuples+stdlib", tuples_stdlib)]
+    if fast_json.orjson is not None:
+        paths.append(("tuples+orjson", tuples_fast))
+
+    print(f"{'rows':>8} " + " ".join(f"{name + ' us/row':>22}" for name, _ in paths) + f" {'speedup':>8}")
+    for num_days in day_counts:
+        engine, db = make_session()
+        seed(db, 1, num_days)
+
+        bodies = {fn(db, 1) for _, fn in paths}
+        assert len(bodies) == 1, "paths produce different JSON"
+
+        timings = [_time(fn, db, repeat) for _, fn in paths]
+        per_row = [seconds / num_days * 1e6 for seconds in timings]
+        print(f"{num_days:>8} " + " ".join(f"{us:>22.2f}" for us in per_row) + f" {timings[0] / timings[-1]:>7.1f}x")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    run()
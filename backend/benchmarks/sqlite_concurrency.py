@@ -0,0 +1,95 @@
+"""
+Concurrent readers + writers against a file database, default SQLite
+settings vs the tuned profile from database.py (WAL, busy_timeout, ...).
+
+    python -m benchmarks.sqlite_concurrency
+"""
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import seed
+from database import create_db_engine, SQLITE_PRAGMAS
+from models import Base, Progress, DEFAULT_USER_ID
+from stats import get_habits_with_stats, refresh_habit_stats
+
+PROFILES = {
+    # What database.py used to do: driver defaults, rollback journal
+    "default": {"journal_mode": "DELETE"},
+    "tuned": SQLITE_PRAGMAS,
+}
+
+
+def _writer(Session, habit_id: int, stop: threading.Event, counts: dict):
+    day = date.today()
+    while not stop.is_set():
+        db = Session()
+        try:
+            stmt = sqlite_insert(Progress).values(habit_id=habit_id, user_id=DEFAULT_USER_ID, date=day, completed=1, notes="")
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[Progress.habit_id, Progress.date],
+                set_={"completed": stmt.excluded.completed}
+            ))
+            refresh_habit_stats(db, [habit_id])
+            db.commit()
+            counts["writes"] += 1
+        except OperationalError:
+            db.rollback()
+            counts["errors"] += 1
+        finally:
+            db.close()
+        day -= timedelta(days=1)
+
+
+def _reader(Session, stop: threading.Event, counts: dict):
+    while not stop.is_set():
+        db = Session()
+        try:
+            get_habits_with_stats(db, DEFAULT_USER_ID, date.today())
+            counts["reads"] += 1
+        except OperationalError:
+            db.rollback()
+            counts["errors"] += 1
+        finally:
+            db.close()
+
+
+def run(writers: int = 4, readers: int = 8, seconds: float = 5.0, num_habits: int = 200):
+    print(f"{'profile':<10} {'writes/s':>9} {'reads/s':>9} {'errors':>7}")
+    for name, pragmas in PROFILES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_db_engine("sqlite:///" + os.path.join(tmp, "bench.db"), pragmas=pragmas)
+            Base.metadata.create_all(bind=engine)
+            Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            seed_db = Session()
+            seed(seed_db, num_habits, 90)
+            seed_db.close()
+
+            counts = {"writes": 0, "reads": 0, "errors": 0}
+            stop = threading.Event()
+            threads = [
+                threading.Thread(target=_writer, args=(Session, i + 1, stop, counts))
+                for i in range(writers)
+            ] + [
+                threading.Thread(target=_reader, args=(Session, stop, counts))
+                for _ in range(readers)
+            ]
+            for thread in threads:
+                thread.start()
+            time.sleep(seconds)
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+            print(f"{name:<10} {counts['writes'] / seconds:>9.1f} {counts['reads'] / seconds:>9.1f} {counts['errors']:>7}")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    run()
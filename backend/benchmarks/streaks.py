@@ -0,0 +1,35 @@
+"""
+Query count + latency of streak computation as streaks get longer.
+
+    python -m benchmarks.streaks
+"""
+import time
+
+from benchmarks.common import make_session, seed, QueryCounter
+from streaks import get_streak, get_streaks
+
+
+def run(streak_lengths=(30, 365, 1825), num_habits: int = 50):
+    print(f"{'days':>8} {'single q':>9} {'batch q':>8} {'batch ms':>10}")
+    for num_days in streak_lengths:
+        engine, db = make_session()
+        seed(db, num_habits, num_days, rate=1.0)
+
+        counter = QueryCounter(engine)
+        with counter.track():
+            streak = get_streak(db, 1)
+        single_queries = counter.count
+        assert streak.current == num_days
+
+        with counter.track():
+            start = time.perf_counter()
+            get_streaks(db)
+            elapsed = (time.perf_counter() - start) * 1000
+
+        print(f"{num_days:>8} {single_queries:>9} {counter.count:>8} {elapsed:>10.2f}")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,76 @@
+"""
+Habit suggestions: index build time and per-request latency of the ranked
+top-k (in-memory ranking alone, and with the indexed exclusion lookup)
+against loading every habit row to filter the curated list.
+
+    python -m benchmarks.suggestions [--users 100 1000 10000] [--habits 8]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from ai_logic import SUGGESTIONS_DB
+from benchmarks.common import make_session
+from models import Habit, User
+from suggestions import SuggestionIndex, user_habit_names
+
+EXTRA_NAMES = 300  # Habit names beyond the curated ones
+REQUESTS = 200
+
+
+def _ms(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def _full_load(db, category: str, k: int):
+    # Every habit in the table, filtered in Python
+    existing = {habit.name.lower() for habit in db.query(Habit).all()}
+    return [name for name in SUGGESTIONS_DB[category] if name.lower() not in existing][:k]
+
+
+def run(user_counts=(100, 1000, 10000), habits_per_user: int = 8, k: int = 3):
+    rng = random.Random(21)
+    names = [(name, category) for category, pool in SUGGESTIONS_DB.items() for name in pool]
+    names += [(f"Custom habit {i}", rng.choice(list(SUGGESTIONS_DB))) for i in range(EXTRA_NAMES)]
+    weights = [1 / (rank + 1) for rank in range(len(names))]  # A few popular, a long tail
+
+    engine, db = make_session()
+    users = 0
+    print(f"{'users':>6} {'habits':>7} {'entries':>8} {'build ms':>9} {'top-k ms':>9} {'request ms':>11} {'full load ms':>13}")
+    for target in user_counts:
+        while users < target:
+            users += 1
+            db.add(User(id=users, name=f"user {users}"))
+            picked = {names[i] for i in rng.choices(range(len(names)), weights, k=habits_per_user)}
+            db.add_all(Habit(name=name, category=category, user_id=users) for name, category in picked)
+        db.commit()
+
+        index = SuggestionIndex(SUGGESTIONS_DB)
+        build_ms = _ms(lambda: index.build(db))
+        sample = [(rng.randint(1, users), rng.choice(list(SUGGESTIONS_DB))) for _ in range(REQUESTS)]
+
+        existing = {user_id: user_habit_names(db, user_id) for user_id, _ in sample}
+        top_k_ms = statistics.median(
+            _ms(lambda: index.top_k(category, existing[user_id], k)) for user_id, category in sample
+        )
+        request_ms = statistics.median(
+            _ms(lambda: index.top_k(category, user_habit_names(db, user_id), k)) for user_id, category in sample
+        )
+        full_ms = statistics.median(_ms(lambda: _full_load(db, category, k)) for _, category in sample[:20])
+
+        print(f"{users:>6} {db.query(Habit).count():>7} {len(index._entries):>8} {build_ms:>9.1f} "
+              f"{top_k_ms:>9.3f} {request_ms:>11.3f} {full_ms:>13.2f}")
+
+    db.close()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--habits", type=int, default=8)
+    args = parser.parse_args()
+    run(tuple(args.users), args.habits)
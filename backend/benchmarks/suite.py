@@ -0,0 +1,193 @@
+"""
+Benchmark / load-test suite for the API.
+
+Seeds a scratch database, then drives every endpoint through an in-process
+ASGI client, one request at a time and concurrently. Records latency
+percentiles, throughput and SQL statements per request, and writes JSON
+so runs from different commits can be compared.
+
+    python -m benchmarks.suite --habits 200 --days 365 --output before.json
+    python -m benchmarks.suite --output after.json
+    python -m benchmarks.suite compare before.json after.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _endpoints(num_habits: int):
+    """
+    (name, method, path builder, cache cleared before each request).
+    Path builders get the request number so requests spread over habits/days.
+    """
+    today = date.today()
+    habit = lambda i: i % num_habits + 1  # noqa: E731
+    return [
+        ("GET /habits/", "GET", lambda i: "/habits/", False),
+        ("GET /progress/{id}", "GET", lambda i: f"/progress/{habit(i)}", False),
+        ("PUT /progress/", "PUT", lambda i: (
+            f"/progress/?habit_id={habit(i)}&target_date={today - timedelta(days=i % 30)}&completed={i % 2}"
+        ), False),
+        ("GET /analytics/dashboard", "GET", lambda i: "/analytics/dashboard", False),
+        ("GET /analytics/dashboard (uncached)", "GET", lambda i: "/analytics/dashboard", True),
+        ("GET /analytics/heatmap", "GET", lambda i: "/analytics/heatmap", False),
+        ("GET /analytics/heatmap (uncached)", "GET", lambda i: "/analytics/heatmap?days=365", True),
+        ("GET /ai/motivation/{id}", "GET", lambda i: f"/ai/motivation/{habit(i)}", False),
+    ]
+
+
+async def _drive(client, counter, method, path_for, clear_cache, requests, concurrency):
+    from benchmarks.common import percentile
+    from cache import analytics_cache
+
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            if clear_cache:
+                analytics_cache.clear()
+            start = time.perf_counter()
+            response = await client.request(method, path_for(i))
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{method} {path_for(i)} -> {response.status_code}")
+
+    counter.count = 0
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(max(latencies), 3),
+        "queries_per_request": round(counter.count / requests, 2),
+    }
+
+
+async def run(num_habits: int, num_days: int, requests: int, concurrency: int) -> dict:
+    import httpx
+    from benchmarks.common import QueryCounter
+    from database import engine, SessionLocal
+    from demo_data import generate_demo_data
+    from main import app
+
+    db = SessionLocal()
+    seeded = generate_demo_data(db, num_habits=num_habits, num_days=num_days)
+    db.close()
+
+    counter = QueryCounter(engine)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+
+    with counter.track():
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, method, path_for, clear_cache in _endpoints(num_habits):
+                # Warm-up (loads in-process indexes, fills caches)
+                await _drive(client, counter, method, path_for, clear_cache, 5, 1)
+                results[name] = {
+                    "sequential": await _drive(client, counter, method, path_for, clear_cache, requests, 1),
+                    "concurrent": await _drive(client, counter, method, path_for, clear_cache, requests, concurrency),
+                }
+                seq = results[name]["sequential"]
+                print(f"{name:<38} p50 {seq['p50_ms']:>8.2f}ms  p99 {seq['p99_ms']:>8.2f}ms  "
+                      f"{results[name]['concurrent']['throughput_rps']:>8.1f} req/s @{concurrency}  "
+                      f"{seq['queries_per_request']:>6.2f} q/req")
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "habits": seeded["habits"],
+            "progress_rows": seeded["progress_rows"],
+            "days": num_days,
+        },
+        "results": results,
+    }
+
+
+def compare(before_path: str, after_path: str, threshold: float = 0.10) -> int:
+    """
+    Print per-endpoint changes; returns the number of regressions
+    (p50 / p99 slower or throughput lower by more than threshold, or any
+    increase in queries per request).
+    """
+    before, after = (json.load(open(path)) for path in (before_path, after_path))
+    print(f"{before['meta']['commit']} -> {after['meta']['commit']}")
+    regressions = 0
+
+    for name, modes in after["results"].items():
+        if name not in before["results"]:
+            continue
+        for mode, now in modes.items():
+            then = before["results"][name][mode]
+            changes = []
+            for metric in ("p50_ms", "p99_ms", "throughput_rps", "queries_per_request"):
+                if not then[metric]:
+                    continue
+                change = (now[metric] - then[metric]) / then[metric]
+                if metric == "queries_per_request":
+                    worse = now[metric] > then[metric]  # any extra query counts
+                elif metric == "throughput_rps":
+                    worse = change < -threshold
+                else:
+                    worse = change > threshold
+                regressions += worse
+                changes.append(f"{metric} {then[metric]} -> {now[metric]} ({change:+.0%}){' !' if worse else ''}")
+            print(f"{name} [{mode}]: " + ", ".join(changes))
+
+    print(f"{regressions} regression(s)")
+    return regressions
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "compare":
+        parser = argparse.ArgumentParser(prog="benchmarks.suite compare")
+        parser.add_argument("before")
+        parser.add_argument("after")
+        parser.add_argument("--threshold", type=float, default=0.10)
+        args = parser.parse_args(sys.argv[2:])
+        sys.exit(1 if compare(args.before, args.after, args.threshold) else 0)
+
+    parser = argparse.ArgumentParser(prog="benchmarks.suite")
+    parser.add_argument("--habits", type=int, default=100)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--database-url", help="defaults to a scratch SQLite file")
+    args = parser.parse_args()
+
+    # Must be set before database.py is imported
+    os.environ["DATABASE_URL"] = args.database_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+
+    report = asyncio.run(run(args.habits, args.days, args.requests, args.concurrency))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
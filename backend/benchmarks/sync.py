@@ -0,0 +1,103 @@
+"""
+Reconnecting after offline changes: GET /sync from the last seen seq vs
+refetching the habit list and every habit's progress, as data grows and
+for a few sizes of change.
+
+    python -m benchmarks.sync [--habits 50 500] [--days 365] [--changes 10 1000]
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import func
+
+from benchmarks.common import make_session, seed
+from bulk import progress_upsert_statement
+from change_log import log_existing, log_progress
+from fast_json import dumps
+from models import DEFAULT_USER_ID, Change, Habit, Progress, User
+from stats import get_habits_with_stats
+from sync import PROGRESS_FIELDS, get_changes
+
+REPEATS = 5
+
+
+def _full_refetch(db) -> int:
+    # GET /habits/, then GET /progress/{id} per habit; returns the bytes sent
+    habits = get_habits_with_stats(db, DEFAULT_USER_ID, date.today())
+    sent = len(dumps(habits))
+    for habit in habits:
+        sent += len(dumps([
+            dict(zip(PROGRESS_FIELDS, row))
+            for row in db.query(*[getattr(Progress, name) for name in PROGRESS_FIELDS]).filter(
+                Progress.habit_id == habit["id"], Progress.user_id == DEFAULT_USER_ID
+            ).order_by(Progress.date)
+        ]))
+    return sent
+
+
+def _delta(db, since: int) -> int:
+    # GET /sync pages until more is false; returns the bytes sent
+    sent = 0
+    while True:
+        page = get_changes(db, DEFAULT_USER_ID, since)
+        sent += len(dumps(page))
+        since = page["seq"]
+        if not page["more"]:
+            return sent
+
+
+def _timed(fn):
+    timings, result = [], None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def run(habit_counts=(50, 500), num_days: int = 365, change_counts=(10, 1000)):
+    rng = random.Random(11)
+    print(f"{'habits':>7} {'rows':>9} {'changes':>8} {'refetch ms':>11} {'refetch KB':>11} "
+          f"{'delta ms':>9} {'delta KB':>9}")
+    for num_habits in habit_counts:
+        engine, db = make_session()
+        db.add(User(id=DEFAULT_USER_ID, name="bench"))
+        seed(db, num_habits, num_days)
+        log_existing(db)
+        db.commit()
+        habit_ids = [habit_id for (habit_id,) in db.query(Habit.id)]
+        rows = db.query(Progress).count()
+
+        refetch_ms, refetch_bytes = _timed(lambda: _full_refetch(db))
+        for num_changes in change_counts:
+            # What the client missed while offline
+            since = db.query(func.max(Change.seq)).scalar()
+            entries = list({
+                (rng.choice(habit_ids), date.today() - timedelta(days=rng.randrange(num_days)))
+                for _ in range(num_changes)
+            })
+            db.execute(progress_upsert_statement(), [
+                {"habit_id": habit_id, "user_id": DEFAULT_USER_ID, "date": day,
+                 "completed": rng.randint(0, 1), "notes": None, "mood": None}
+                for habit_id, day in entries
+            ])
+            log_progress(db, DEFAULT_USER_ID, entries)
+            db.commit()
+
+            delta_ms, delta_bytes = _timed(lambda: _delta(db, since))
+            print(f"{num_habits:>7} {rows:>9} {len(entries):>8} {refetch_ms:>11.1f} {refetch_bytes / 1024:>11.1f} "
+                  f"{delta_ms:>9.2f} {delta_bytes / 1024:>9.1f}")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--habits", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--changes", type=int, nargs="+", default=[10, 1000])
+    args = parser.parse_args()
+    run(tuple(args.habits), args.days, tuple(args.changes))
@@ -0,0 +1,82 @@
+"""
+Per-user request cost as the number of users grows. Every user has the
+same data size, so with user-scoped queries and user-led indexes the
+latencies should stay flat while the total row count grows.
+
+    python -m benchmarks.tenancy [--users 1 10 100 1000] [--habits 10] [--days 180]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date
+
+import analytics
+import analytics_np
+from benchmarks.common import make_session, seed
+from completion_index import completion_index, get_heatmap_data as bitset_heatmap
+from models import User
+from stats import get_habits_with_stats
+
+SAMPLE_USERS = 20
+
+
+def _ms(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def _measure(db, user_id: int) -> dict:
+    completion_index.reset(user_id)
+    timings = {
+        "habits cold": _ms(lambda: get_habits_with_stats(db, user_id, date.today())),
+        "habits warm": _ms(lambda: get_habits_with_stats(db, user_id, date.today())),
+        "heatmap bitset": _ms(lambda: bitset_heatmap(db, user_id, 90)),
+        "heatmap sql": _ms(lambda: analytics.get_heatmap_data(db, user_id, 90)),
+    }
+    analytics.get_dashboard_data(db, user_id, 30)  # Brings habit_stats up to date
+    timings["dashboard sql"] = _ms(lambda: analytics.get_dashboard_data(db, user_id, 30))
+    if analytics_np.NUMPY_AVAILABLE:
+        timings["dashboard numpy"] = _ms(lambda: analytics_np.get_dashboard_data(db, user_id, 30))
+    return timings
+
+
+def run(user_counts=(1, 10, 100, 1000), num_habits: int = 10, num_days: int = 180):
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, db = make_session("sqlite:///" + os.path.join(tmp, "bench.db"))
+        users = 0
+        header = None
+
+        for target in user_counts:
+            # Grow the same database to the next size
+            while users < target:
+                users += 1
+                db.add(User(id=users, name=f"user {users}"))
+                seed(db, num_habits, num_days, rng_seed=users, user_id=users,
+                     categories=("health", "learning", "work", "general"))
+
+            sample = rng.sample(range(1, users + 1), min(SAMPLE_USERS, users))
+            runs = [_measure(db, user_id) for user_id in sample]
+            medians = {name: statistics.median(run[name] for run in runs) for name in runs[0]}
+
+            if header is None:
+                header = list(medians)
+                print(f"{'users':>6} {'rows':>10} " + " ".join(f"{name:>16}" for name in header) + "   (median ms)")
+            rows = users * num_habits * num_days
+            print(f"{users:>6} {rows:>10} " + " ".join(f"{medians[name]:>16.2f}" for name in header))
+
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--habits", type=int, default=10)
+    parser.add_argument("--days", type=int, default=180)
+    args = parser.parse_args()
+    run(tuple(args.users), args.habits, args.days)
@@ -0,0 +1,101 @@
+from typing import List, Dict, Sequence
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from models import Habit, Progress
+from schemas import ProgressBulkItem
+from stats import apply_progress_writes, read_completions
+from rollups import refresh_rollups
+from moods import classify_mood
+from change_log import log_progress
+
+# Rows written per transaction
+BULK_CHUNK_SIZE = 1000
+
+
+def progress_upsert_statement():
+    # Insert or overwrite the entry for that habit and day
+    stmt = sqlite_insert(Progress)
+    return stmt.on_conflict_do_update(
+        index_elements=[Progress.habit_id, Progress.date],
+        set_={
+            "completed": stmt.excluded.completed,
+            "notes": stmt.excluded.notes,
+            "mood": stmt.excluded.mood,
+        }
+    )
+
+
+def bulk_upsert_progress(
+    db: Session,
+    user_id: int,
+    items: Sequence[ProgressBulkItem],
+    chunk_size: int = BULK_CHUNK_SIZE
+) -> Dict:
+    """
+    Insert or overwrite many progress entries (one per habit per day).
+
+    Each chunk is one transaction: a lookup of which days already exist,
+    one executemany upsert with its change log entries, and the habit_stats
+    update for the rows it wrote. Rows for unknown habits (or habits of other users) are
+    reported and skipped.
+    """
+    habit_ids = {item.habit_id for item in items}
+    known = {
+        habit_id for (habit_id,) in
+        db.query(Habit.id).filter(Habit.id.in_(habit_ids), Habit.user_id == user_id)
+    } if habit_ids else set()
+
+    upsert = progress_upsert_statement()
+    results: List[Dict] = []
+    counts = {"inserted": 0, "updated": 0, "error": 0}
+
+    for start in range(0, len(items), chunk_size):
+        chunk = list(enumerate(items[start:start + chunk_size], start))
+        valid = [(i, item) for i, item in chunk if item.habit_id in known]
+        # Logged first: takes the write lock before the old values are read
+        log_progress(db, user_id, [(item.habit_id, item.date) for _, item in valid])
+        # completed of every key as of each item, for the habit_stats update
+        existing = read_completions(db, [(item.habit_id, item.date) for _, item in valid])
+        writes = []
+
+        for i, item in chunk:
+            key = (item.habit_id, item.date)
+            if item.habit_id not in known:
+                status, detail = "error", "Habit not found"
+            else:
+                # Repeats of a key within the request overwrite the earlier row
+                status, detail = ("updated" if key in existing else "inserted"), None
+                writes.append((item.habit_id, item.date, existing.get(key), item.completed))
+                existing[key] = item.completed
+
+            counts[status] += 1
+            results.append({
+                "index": i,
+                "habit_id": item.habit_id,
+                "date": item.date,
+                "status": status,
+                "detail": detail,
+            })
+
+        if valid:
+            db.execute(upsert, [
+                {
+                    "habit_id": item.habit_id,
+                    "user_id": user_id,
+                    "date": item.date,
+                    "completed": item.completed,
+                    "notes": item.notes,
+                    "mood": classify_mood(item.notes),
+                }
+                for _, item in valid
+            ])
+            refresh_rollups(db, [(item.habit_id, item.date) for _, item in valid])
+            apply_progress_writes(db, writes)
+            db.commit()
+
+    return {
+        "inserted": counts["inserted"],
+        "updated": counts["updated"],
+        "failed": counts["error"],
+        "results": results,
+    }
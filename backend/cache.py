@@ -0,0 +1,195 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from fastapi import Request, Response
+
+# =========================
+# ANALYTICS RESPONSE CACHE
+# =========================
+# In-process, per worker. Entries are tagged with the generation they were
+# computed in; every write bumps the generation, so older entries are never
+# served again and age out through LRU eviction. The TTL bounds staleness
+# for data that changes without a write (e.g. "today" rolling over).
+# Entries can belong to a scope (a user) with its own generation, so a
+# write only invalidates the writer's entries. The warm_cache job (jobs.py)
+# recomputes recently used entries before they expire or after a write.
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._scope_generations: Dict[Hashable, int] = {}
+        # (scope, key) -> (generation, expires_at, payload, etag, last_used)
+        self._entries: "OrderedDict[Hashable, Tuple[Tuple[int, int], float, Any, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _generation(self, scope: Hashable) -> Tuple[int, int]:
+        # Caller holds the lock
+        return self.generation, self._scope_generations.get(scope, 0)
+
+    def _lookup(self, key: Hashable, scope: Hashable) -> Tuple[Optional[Tuple[Any, str]], Tuple[int, int]]:
+        """
+        ((payload, etag) or None, current generation of the scope).
+        """
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generation(scope)
+            entry = self._entries.get((scope, key))
+            if entry and entry[0] == generation and entry[1] > now:
+                self._entries[(scope, key)] = entry[:4] + (now,)
+                self._entries.move_to_end((scope, key))
+                self.hits += 1
+                return (entry[2], entry[3]), generation
+            self.misses += 1
+            return None, generation
+
+    def _store(
+        self,
+        key: Hashable,
+        scope: Hashable,
+        generation: Tuple[int, int],
+        payload: Any,
+        last_used: Optional[float] = None
+    ) -> Tuple[Any, str]:
+        etag = make_etag(payload)
+        with self._lock:
+            # Don't store results that raced with a write
+            if generation == self._generation(scope):
+                now = time.monotonic()
+                expires_at = now + self.ttl_seconds
+                self._entries[(scope, key)] = (generation, expires_at, payload, etag, last_used or now)
+                self._entries.move_to_end((scope, key))
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return payload, etag
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Any],
+        scope: Hashable = None
+    ) -> Tuple[Any, str]:
+        """
+        Cached (payload, etag) for key within scope, calling compute() on a miss.
+        Computed outside the lock; concurrent misses may both compute.
+        """
+        cached, generation = self._lookup(key, scope)
+        if cached:
+            return cached
+        return self._store(key, scope, generation, compute())
+
+    async def get_or_compute_async(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]],
+        scope: Hashable = None
+    ) -> Tuple[Any, str]:
+        cached, generation = self._lookup(key, scope)
+        if cached:
+            return cached
+        return self._store(key, scope, generation, await compute())
+
+    def entries_to_warm(self, expiring_within: float, used_within: float) -> List[Tuple[Hashable, Hashable]]:
+        """
+        (scope, key) of the entries requested in the last used_within
+        seconds that are outdated by a write or expire within
+        expiring_within seconds.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                (scope, key)
+                for (scope, key), (generation, expires_at, _, _, last_used) in self._entries.items()
+                if last_used > now - used_within
+                and (generation != self._generation(scope) or expires_at < now + expiring_within)
+            ]
+
+    def refresh(self, key: Hashable, compute: Callable[[], Any], scope: Hashable = None) -> None:
+        """
+        Recompute and store an entry without counting a lookup. Keeps its
+        last use, so warming alone never keeps an entry alive.
+        """
+        with self._lock:
+            generation = self._generation(scope)
+            entry = self._entries.get((scope, key))
+        self._store(key, scope, generation, compute(), entry[4] if entry else None)
+
+    def invalidate(self, scope: Hashable = None) -> None:
+        """
+        Retire the entries of one scope (every entry if None).
+        """
+        with self._lock:
+            if scope is None:
+                self.generation += 1
+            else:
+                self._scope_generations[scope] = self._scope_generations.get(scope, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "generation": self.generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups * 100, 2) if lookups else 0,
+            }
+
+
+def make_etag(payload: Any) -> str:
+    body = json.dumps(payload, sort_keys=True, default=str).encode()
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+analytics_cache = ResponseCache()
+
+
+def _conditional(request: Request, response: Response, payload: Any, etag: str):
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return payload
+
+
+def cached_response(
+    request: Request,
+    response: Response,
+    key: Hashable,
+    compute: Callable[[], Any],
+    scope: Hashable = None
+):
+    """
+    Serve an endpoint result through analytics_cache with ETag support.
+    Returns the payload, or a bare 304 when the client's copy is current.
+    """
+    payload, etag = analytics_cache.get_or_compute(key, compute, scope)
+    return _conditional(request, response, payload, etag)
+
+
+async def cached_response_async(
+    request: Request,
+    response: Response,
+    key: Hashable,
+    compute: Callable[[], Awaitable[Any]],
+    scope: Hashable = None
+):
+    payload, etag = await analytics_cache.get_or_compute_async(key, compute, scope)
+    return _conditional(request, response, payload, etag)
@@ -0,0 +1,54 @@
+from datetime import date
+from typing import Iterable, Tuple
+
+from sqlalchemy import insert, literal, null, select
+from sqlalchemy.orm import Session
+
+from models import Change, Habit, Progress
+
+# =========================
+# CHANGE LOG
+# =========================
+# Append-only record of the habit and progress keys each write touched,
+# numbered by `changes.seq` (AUTOINCREMENT, so it never goes back, even
+# after deletes). Written inside the writer's own transaction, so a
+# rolled back write leaves no entry; GET /sync reads it (sync.py).
+# Progress writers log before reading the values they overwrite: the
+# INSERT opens the transaction and takes SQLite's write lock, so those
+# reads (and the habit_stats update built on them) see every earlier
+# commit and no later one.
+
+
+def log_habit(db: Session, user_id: int, habit_id: int, op: str = "upsert") -> None:
+    """
+    op: "upsert" (created or changed) or "delete".
+    """
+    db.execute(insert(Change), [
+        {"user_id": user_id, "entity": "habit", "op": op, "habit_id": habit_id, "date": None}
+    ])
+
+
+def log_progress(db: Session, user_id: int, entries: Iterable[Tuple[int, date]]) -> None:
+    """
+    entries: (habit_id, date) of upserted progress rows.
+    """
+    rows = [
+        {"user_id": user_id, "entity": "progress", "op": "upsert", "habit_id": habit_id, "date": day}
+        for habit_id, day in entries
+    ]
+    if rows:
+        db.execute(insert(Change), rows)
+
+
+def log_existing(db) -> None:
+    """
+    Log every habit and progress row as upserted, so since=0 is a full
+    sync. For the migration that added the log (db is its Connection).
+    """
+    columns = ["user_id", "entity", "op", "habit_id", "date"]
+    db.execute(insert(Change).from_select(columns, select(
+        Habit.user_id, literal("habit"), literal("upsert"), Habit.id, null()
+    ).order_by(Habit.id)))
+    db.execute(insert(Change).from_select(columns, select(
+        Progress.user_id, literal("progress"), literal("upsert"), Progress.habit_id, Progress.date
+    ).order_by(Progress.habit_id, Progress.date)))
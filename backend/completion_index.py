@@ -0,0 +1,284 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from models import Change, Habit, Progress
+
+# =========================
+# COMPLETION INDEX (bitsets)
+# =========================
+# In-process copy of the progress table as two bitmaps per habit, one bit
+# per day counted from an origin day (the habit's start_date, moved back
+# if earlier entries exist), partitioned by user:
+#   present - an entry exists for that day
+#   done    - the entry is completed
+# Python ints are the bitmaps, so a year of history costs ~46 bytes per
+# map. A user's habits are loaded from the database on first use. Writes
+# of this process are applied through record() / remove_habit() after
+# they commit; writes of other processes (workers, CLI scripts) are found
+# in the change log (change_log.py): each use compares the user's latest
+# changes.seq with the one the bitmaps reflect and applies the difference.
+
+MAX_USERS = 1000  # Users whose bitmaps are kept; the least recently used go first
+CATCH_UP_LIMIT = 10_000  # Log rows applied in place; more reloads the user
+RELOAD_SECONDS = 15 * 60  # Full reload after this, for writes that bypass the log
+
+
+class HabitBits:
+    __slots__ = ("origin", "present", "done")
+
+    def __init__(self, origin: int):
+        self.origin = origin  # date.toordinal() of bit 0
+        self.present = 0
+        self.done = 0
+
+    def set(self, day: int, completed: bool) -> None:
+        if day < self.origin:
+            shift = self.origin - day
+            self.present <<= shift
+            self.done <<= shift
+            self.origin = day
+
+        bit = 1 << (day - self.origin)
+        self.present |= bit
+        if completed:
+            self.done |= bit
+        else:
+            self.done &= ~bit
+
+    def window(self, start: int, end: int) -> int:
+        """
+        done bits for days [start, end], bit 0 = start.
+        """
+        mask = (1 << (end - start + 1)) - 1
+        if start >= self.origin:
+            return (self.done >> (start - self.origin)) & mask
+        return (self.done << (self.origin - start)) & mask
+
+    def streak_ending(self, day: int) -> int:
+        """
+        Consecutive completed days ending on day.
+        """
+        position = day - self.origin
+        if position < 0:
+            return 0
+        mask = (1 << (position + 1)) - 1
+        missing = ~self.done & mask
+        if not missing:
+            return position + 1
+        return position - (missing.bit_length() - 1)
+
+    def longest_streak(self) -> int:
+        # Each step keeps only bits that still have a set bit below them
+        bits, longest = self.done, 0
+        while bits:
+            bits &= bits << 1
+            longest += 1
+        return longest
+
+
+class UserBits:
+    __slots__ = ("habits", "seq", "loaded_at")
+
+    def __init__(self, habits: Dict[int, HabitBits], seq: int):
+        self.habits = habits
+        self.seq = seq  # changes.seq the bitmaps include
+        self.loaded_at = time.monotonic()
+
+
+class CompletionIndex:
+    def __init__(self):
+        # user_id -> UserBits, least recently used first
+        self._users: "OrderedDict[int, UserBits]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    # ---------- loading / sync ----------
+
+    def ensure_loaded(self, db: Session, user_id: int) -> None:
+        """
+        Load the user's bitmaps, or bring them up to date with the database.
+        """
+        seq = db.query(func.max(Change.seq)).filter(Change.user_id == user_id).scalar() or 0
+        with self._lock:
+            # The lock is held through the load, so writes that commit
+            # meanwhile are applied after it instead of being lost
+            user = self._users.get(user_id)
+            if user is None or user.loaded_at + RELOAD_SECONDS < time.monotonic():
+                user = self._load(db, user_id, seq)
+            elif user.seq < seq and not self._catch_up(db, user_id, user, seq):
+                user = self._load(db, user_id, seq)
+            # user.seq > seq: loaded by a request that began later
+
+            self._users[user_id] = user
+            self._users.move_to_end(user_id)
+            while len(self._users) > MAX_USERS:
+                self._users.popitem(last=False)
+
+    def _load(self, db: Session, user_id: int, seq: int) -> UserBits:
+        habits = {
+            habit_id: HabitBits(start_date.toordinal())
+            for habit_id, start_date in db.query(Habit.id, Habit.start_date).filter(
+                Habit.user_id == user_id
+            )
+            if start_date is not None
+        }
+        for habit_id, day, completed in db.query(
+            Progress.habit_id, Progress.date, Progress.completed
+        ).filter(Progress.user_id == user_id).yield_per(10000):
+            bits = habits.get(habit_id)
+            if bits is None:
+                bits = habits[habit_id] = HabitBits(day.toordinal())
+            bits.set(day.toordinal(), completed == 1)
+        return UserBits(habits, seq)
+
+    def _catch_up(self, db: Session, user_id: int, user: UserBits, seq: int) -> bool:
+        # Apply the rows logged in (user.seq, seq] as they are now; False
+        # if there are too many and a reload is cheaper
+        window = (Change.user_id == user_id, Change.seq > user.seq, Change.seq <= seq)
+        changes = db.query(Change.entity, Change.op, Change.habit_id).filter(*window).order_by(
+            Change.seq
+        ).limit(CATCH_UP_LIMIT + 1).all()
+        if len(changes) > CATCH_UP_LIMIT:
+            return False
+
+        # A deleted id may have been reused by a habit created later
+        habit_ids = {change.habit_id for change in changes if change.entity == "habit"}
+        for habit_id in habit_ids:
+            user.habits.pop(habit_id, None)
+        if habit_ids:
+            for habit_id, start_date in db.query(Habit.id, Habit.start_date).filter(
+                Habit.user_id == user_id, Habit.id.in_(habit_ids)
+            ):
+                if start_date is not None:
+                    user.habits[habit_id] = HabitBits(start_date.toordinal())
+
+        if any(change.entity == "progress" for change in changes):
+            # Same join as GET /sync: one unique index lookup per row
+            for habit_id, day, completed in db.query(
+                Progress.habit_id, Progress.date, Progress.completed
+            ).join(
+                Change, (Change.habit_id == Progress.habit_id) & (Change.date == Progress.date)
+            ).filter(*window, Change.entity == "progress", Progress.user_id == user_id).distinct():
+                bits = user.habits.get(habit_id)
+                if bits is None:
+                    bits = user.habits[habit_id] = HabitBits(day.toordinal())
+                bits.set(day.toordinal(), completed == 1)
+        user.seq = seq
+        return True
+
+    def record(self, user_id: int, entries: Iterable[Tuple[int, date, int]]) -> None:
+        """
+        Apply committed (habit_id, date, completed) upserts of one user.
+        """
+        with self._lock:
+            user = self._users.get(user_id)
+            if user is None:
+                return  # The first ensure_loaded() will read them from the database
+            habits = user.habits
+            for habit_id, day, completed in entries:
+                day = day.toordinal()
+                bits = habits.get(habit_id)
+                if bits is None:
+                    bits = habits[habit_id] = HabitBits(day)
+                bits.set(day, completed == 1)
+
+    def remove_habit(self, user_id: int, habit_id: int) -> None:
+        with self._lock:
+            user = self._users.get(user_id)
+            if user is not None:
+                user.habits.pop(habit_id, None)
+
+    def reset(self, user_id: Optional[int] = None) -> None:
+        """
+        Drop one user (everything if None); the next ensure_loaded() reloads
+        from the database.
+        """
+        with self._lock:
+            if user_id is None:
+                self._users = OrderedDict()
+            else:
+                self._users.pop(user_id, None)
+
+    def _bits(self, user_id: int, habit_id: int) -> Optional[HabitBits]:
+        user = self._users.get(user_id)
+        return user.habits.get(habit_id) if user is not None else None
+
+    # ---------- per-habit queries ----------
+
+    def counts(self, user_id: int, habit_id: int) -> Tuple[int, int]:
+        """
+        (total entries, completed entries) by popcount.
+        """
+        bits = self._bits(user_id, habit_id)
+        if bits is None:
+            return 0, 0
+        return bits.present.bit_count(), bits.done.bit_count()
+
+    def current_streak(self, user_id: int, habit_id: int, today: Optional[date] = None) -> int:
+        bits = self._bits(user_id, habit_id)
+        return bits.streak_ending((today or date.today()).toordinal()) if bits else 0
+
+    def longest_streak(self, user_id: int, habit_id: int) -> int:
+        bits = self._bits(user_id, habit_id)
+        return bits.longest_streak() if bits else 0
+
+    def completed_on(self, user_id: int, habit_id: int, day: date) -> bool:
+        bits = self._bits(user_id, habit_id)
+        if bits is None or day.toordinal() < bits.origin:
+            return False
+        return bool((bits.done >> (day.toordinal() - bits.origin)) & 1)
+
+    # ---------- across a user's habits ----------
+
+    def daily_completions(self, user_id: int, start_date: date, end_date: date) -> List[int]:
+        """
+        Completions per day for [start_date, end_date], index 0 = start_date.
+
+        Habit windows are summed as a bit-sliced counter: planes[i] holds
+        bit i of every day's count, and adding a habit is a ripple-carry
+        add over the planes, so the cost is per habit, not per row.
+        """
+        start, end = start_date.toordinal(), end_date.toordinal()
+        planes: List[int] = []
+
+        with self._lock:
+            user = self._users.get(user_id)
+            windows = [bits.window(start, end) for bits in user.habits.values()] if user is not None else []
+
+        for carry in windows:
+            i = 0
+            while carry:
+                if i == len(planes):
+                    planes.append(0)
+                planes[i], carry = planes[i] ^ carry, planes[i] & carry
+                i += 1
+
+        width = end - start + 1
+        counts = [0] * width
+        for i, plane in enumerate(planes):
+            # Bit k of the plane is day k; reversed binary string puts it at index k
+            for day, bit in enumerate(format(plane, f"0{width}b")[::-1]):
+                if bit == "1":
+                    counts[day] += 1 << i
+        return counts
+
+
+completion_index = CompletionIndex()
+
+
+def get_heatmap_data(db: Session, user_id: int, days: int = 90) -> Dict[str, int]:
+    """
+    Same payload as analytics.get_heatmap_data, from the bitmaps.
+    """
+    completion_index.ensure_loaded(db, user_id)
+    end_date = date.today()
+    start_date = end_date - timedelta(days=days)
+    counts = completion_index.daily_completions(user_id, start_date, end_date)
+
+    return {
+        (start_date + timedelta(days=i)).isoformat(): count
+        for i, count in enumerate(counts)
+    }
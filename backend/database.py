@@ -1,14 +1,78 @@
-from sqlalchemy import create_engine
+import os
+from typing import Dict, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from models import Base  # Import our models
+from schema import migrate
+
+# Database URL from the environment, SQLite file in the backend folder by default
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./habit_hero.db")
+
+# Applied to every new SQLite connection. WAL lets readers run while a
+# writer commits; busy_timeout makes writers wait for the lock instead of
+# failing with "database is locked". auto_vacuum only takes effect on a new
+# database (or after a VACUUM); INCREMENTAL lets the nightly optimize job
+# return free pages.
+SQLITE_PRAGMAS = {
+    "auto_vacuum": os.getenv("SQLITE_AUTO_VACUUM", "INCREMENTAL"),
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # negative = KiB (64 MiB)
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+# Connection pool (file databases only; in-memory SQLite uses a single connection)
+POOL_SETTINGS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+    "pool_pre_ping": False,
+}
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.split("://", 1)[1] in ("", "/"))
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: Dict) -> None:
+    """
+    Run PRAGMA statements on every connection the engine opens.
+    """
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+
+def create_db_engine(
+    url: str = SQLALCHEMY_DATABASE_URL,
+    pragmas: Optional[Dict] = None,
+    **pool_settings
+) -> Engine:
+    """
+    Engine with the SQLite tuning profile applied.
+    pragmas=None uses SQLITE_PRAGMAS, {} applies none; pool_settings
+    override POOL_SETTINGS.
+    """
+    kwargs = {}
+    if url.startswith("sqlite"):
+        kwargs["connect_args"] = {"check_same_thread": False}
+    if not _is_memory_sqlite(url):
+        kwargs.update(POOL_SETTINGS, **pool_settings)
+
+    engine = create_engine(url, **kwargs)
+    if url.startswith("sqlite"):
+        apply_sqlite_pragmas(engine, SQLITE_PRAGMAS if pragmas is None else pragmas)
+    return engine
 
-# SQLite database file (created in backend folder)
-SQLALCHEMY_DATABASE_URL = "sqlite:///./habit_hero.db"
 
 # Create engine (handles connection)
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+engine = create_db_engine()
 
 # Create session factory (like a "cursor" for queries)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -21,5 +85,26 @@ def get_db():
     finally:
         db.close()
 
-# Create all tables from models
-Base.metadata.create_all(bind=engine)
\ No newline at end of file
+# Optional async mode (ASYNC_DB=1, needs aiosqlite): same database file,
+# used by the /async/... endpoints in async_api.py
+ASYNC_DB_ENABLED = os.getenv("ASYNC_DB") == "1"
+async_engine = None
+AsyncSessionLocal = None
+
+if ASYNC_DB_ENABLED:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_async_engine(
+        SQLALCHEMY_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1),
+        **({} if _is_memory_sqlite(SQLALCHEMY_DATABASE_URL) else POOL_SETTINGS)
+    )
+    apply_sqlite_pragmas(async_engine.sync_engine, SQLITE_PRAGMAS)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Create all tables from models, then bring older database files up to date
+Base.metadata.create_all(bind=engine)
+migrate(engine)
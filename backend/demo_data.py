@@ -0,0 +1,208 @@
+import random
+from typing import Dict, Optional
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from models import Habit, DEFAULT_USER_ID
+from stats import refresh_habit_stats
+from rollups import rebuild_rollups
+from moods import classify_mood
+from change_log import log_habit
+
+# =========================
+# DEMO / LOAD-TEST DATA
+# =========================
+
+DEMO_HABITS = [
+    {"name": "Morning Run", "category": "health"},
+    {"name": "Meditate 10 Minutes", "category": "health"},
+    {"name": "Drink 8 Glasses of Water", "category": "health"},
+    {"name": "Stretching / Mobility", "category": "health"},
+
+    {"name": "Read 30 Pages", "category": "learning"},
+    {"name": "Practice Coding", "category": "learning"},
+    {"name": "Watch Educational Video", "category": "learning"},
+
+    {"name": "Deep Work Session", "category": "work"},
+    {"name": "Review Daily Tasks", "category": "work"},
+    {"name": "Plan Tomorrow", "category": "work"},
+
+    {"name": "Journal Gratitude", "category": "general"},
+    {"name": "Call or Text a Friend", "category": "general"},
+]
+
+# Category realism
+CATEGORY_BASE_RATE = {
+    "health": 0.82,
+    "learning": 0.74,
+    "work": 0.78,
+    "general": 0.70,
+}
+
+MOTIVATIONAL_NOTES = [
+    "Felt great!",
+    "Very productive",
+    "Good focus today",
+    "Energy was high",
+    "Happy with progress",
+]
+
+STRUGGLE_NOTES = [
+    "Busy day",
+    "Low energy",
+    "Missed due to work",
+    "Not feeling well",
+    "Will try tomorrow",
+]
+
+# Progress rows per transaction
+DEMO_CHUNK_SIZE = 50_000
+
+INSERT_PROGRESS = (
+    "INSERT INTO progress (habit_id, user_id, date, completed, notes, mood) VALUES (?, ?, ?, ?, ?, ?)"
+)
+LOG_PROGRESS = (
+    "INSERT INTO changes (user_id, entity, op, habit_id, date) VALUES (?, 'progress', 'upsert', ?, ?)"
+)
+
+# Stored mood of every possible note, classified once
+NOTE_MOODS = {notes: classify_mood(notes) for notes in ["", *MOTIVATIONAL_NOTES, *STRUGGLE_NOTES]}
+
+
+def _insert_progress(conn, chunk) -> None:
+    # Progress rows and their change log entries, in the same transaction
+    conn.exec_driver_sql(INSERT_PROGRESS, chunk)
+    conn.exec_driver_sql(LOG_PROGRESS, [(row[1], row[0], row[2]) for row in chunk])
+
+
+def generate_demo_data(
+    db: Session,
+    user_id: int = DEFAULT_USER_ID,
+    num_habits: int = len(DEMO_HABITS),
+    num_days: Optional[int] = None,
+    category_rates: Optional[Dict[str, float]] = None,
+    note_probability: float = 0.25,
+    missed_note_probability: float = 0.20,
+    seed: int = 42,
+    chunk_size: int = DEMO_CHUNK_SIZE
+) -> Dict[str, int]:
+    """
+    Insert num_habits habits for user_id with past progress ending yesterday.
+
+    num_days=None gives every habit a random 30–60 day history (the
+    original demo data); otherwise every habit gets exactly num_days.
+    Days that are neither completed nor noted are not stored. The same
+    arguments always produce the same rows.
+
+    Progress rows go in as plain tuples through the driver's executemany,
+    one transaction per chunk_size rows, instead of one ORM object per row.
+    """
+    rng = random.Random(seed)
+    rates = {**CATEGORY_BASE_RATE, **(category_rates or {})}
+    end_date = date.today() - timedelta(days=1)  # ❗ yesterday only
+
+    habits = []
+    for i in range(num_habits):
+        template = DEMO_HABITS[i % len(DEMO_HABITS)]
+        length = num_days if num_days is not None else rng.randint(30, 60)
+        habits.append({
+            "user_id": user_id,
+            "name": template["name"] if i < len(DEMO_HABITS) else f"{template['name']} #{i // len(DEMO_HABITS) + 1}",
+            "frequency": "daily",
+            "category": template["category"],
+            "start_date": end_date - timedelta(days=length),
+        })
+
+    # Ids come back from the database (in input order), so habits created
+    # through the API at the same time can't collide with these
+    ids = db.scalars(insert(Habit).returning(Habit.id, sort_by_parameter_order=True), habits).all()
+    for habit, habit_id in zip(habits, ids):
+        habit["id"] = habit_id
+    for habit in habits:
+        log_habit(db, user_id, habit["id"])
+    db.commit()
+
+    conn = db.connection()
+    chunk = []
+    rows = 0
+
+    # SQLite stores dates as ISO strings; format each calendar day once
+    first_day = min((habit["start_date"] for habit in habits), default=end_date)
+    day_strings = [
+        (first_day + timedelta(days=i)).isoformat()
+        for i in range((end_date - first_day).days + 1)
+    ]
+
+    for habit in habits:
+        offset = (habit["start_date"] - first_day).days
+        base_rate = rates[habit["category"]]
+
+        for current in day_strings[offset:]:
+            completed = rng.random() < base_rate
+
+            notes = ""
+            if completed and rng.random() < note_probability:
+                notes = rng.choice(MOTIVATIONAL_NOTES)
+            elif not completed and rng.random() < missed_note_probability:
+                notes = rng.choice(STRUGGLE_NOTES)
+
+            # Save only meaningful entries
+            if completed or notes:
+                chunk.append((habit["id"], user_id, current, 1 if completed else 0, notes, NOTE_MOODS[notes]))
+                if len(chunk) >= chunk_size:
+                    _insert_progress(conn, chunk)
+                    db.commit()
+                    conn = db.connection()
+                    rows += len(chunk)
+                    chunk = []
+
+    if chunk:
+        _insert_progress(conn, chunk)
+        rows += len(chunk)
+
+    rebuild_rollups(db, user_id)
+    refresh_habit_stats(db, [habit["id"] for habit in habits])
+    db.commit()
+
+    return {"habits": len(habits), "progress_rows": rows}
+
+
+if __name__ == "__main__":
+    # python demo_data.py --habits 10000 --days 730 --seed 7
+    import argparse
+    import time
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Generate demo / load-test data")
+    parser.add_argument("--user", type=int, default=DEFAULT_USER_ID, help="owner of the data (must exist)")
+    parser.add_argument("--habits", type=int, default=len(DEMO_HABITS))
+    parser.add_argument("--days", type=int, default=None, help="history per habit (default: random 30–60)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--note-probability", type=float, default=0.25)
+    parser.add_argument("--missed-note-probability", type=float, default=0.20)
+    parser.add_argument("--rate", action="append", default=[], metavar="CATEGORY=RATE",
+                        help="completion rate override, e.g. --rate health=0.9")
+    args = parser.parse_args()
+
+    category_rates = {}
+    for override in args.rate:
+        category, rate = override.split("=")
+        category_rates[category] = float(rate)
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        result = generate_demo_data(
+            db,
+            user_id=args.user,
+            num_habits=args.habits,
+            num_days=args.days,
+            category_rates=category_rates,
+            note_probability=args.note_probability,
+            missed_note_probability=args.missed_note_probability,
+            seed=args.seed,
+        )
+        elapsed = time.perf_counter() - start
+        print(f"{result['habits']} habits, {result['progress_rows']} progress rows in {elapsed:.1f}s")
+    finally:
+        db.close()
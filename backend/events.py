@@ -0,0 +1,287 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from datetime import date
+from typing import AsyncIterator, Deque, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+import analytics
+from completion_index import completion_index
+from fast_json import dumps
+from stats import get_habits_with_stats
+
+# =========================
+# LIVE EVENTS (SSE)
+# =========================
+# GET /events streams a user's changes as server-sent events, so the
+# frontend patches its state instead of refetching the habit list and the
+# dashboard. write_hooks publishes once a write has committed; the bus
+# fans out to one bounded asyncio.Queue per open stream on the app's event
+# loop, so an idle connection costs a queue and a suspended coroutine, not
+# a thread. Payloads are only built for users with a stream open (or open
+# within LINGER_SECONDS, so a client reconnecting with Last-Event-ID gets
+# what it missed).
+
+QUEUE_SIZE = 256  # Events a slow client may fall behind before it is told to reload
+HISTORY_SIZE = 256  # Recent events per user kept for Last-Event-ID replay
+LINGER_SECONDS = 60.0
+KEEPALIVE_SECONDS = 15.0  # Comment line on idle streams; also notices dead connections
+RETRY_MS = 3000  # EventSource reconnect delay
+MAX_EVENT_ENTRIES = 500  # Larger writes (bulk imports) send "reload" instead
+
+RELOAD = "reload"
+KEEPALIVE = object()  # Queued to every stream each KEEPALIVE_SECONDS
+
+
+class Event(NamedTuple):
+    seq: int
+    type: str
+    data: bytes  # JSON
+
+
+class EventBus:
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Event ids are "<epoch>-<seq>"; a restarted server has a new epoch,
+        # so ids from before the restart are never mistaken for current ones
+        self._epoch = format(time.time_ns(), "x")
+        self._seq = itertools.count(1)
+        self._last_seq = 0
+        self._streams: Dict[int, Set[asyncio.Queue]] = {}
+        # user_id -> monotonic time until which events are built and kept
+        # (infinity while a stream is open)
+        self._listening: Dict[int, float] = {}
+        self._history: Dict[int, Deque[Event]] = {}
+        # Replay is complete for Last-Event-ID seqs >= this (per user)
+        self._complete_from: Dict[int, int] = {}
+        self._next_sweep = 0.0
+        self._keepalive: Optional[asyncio.Task] = None
+        self.published = 0
+        self.overflows = 0
+
+    # ---------- lifecycle (FastAPI lifespan) ----------
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._keepalive = asyncio.create_task(self._send_keepalives(), name="events:keepalive")
+
+    def stop(self) -> None:
+        """
+        End every open stream.
+        """
+        self._loop = None
+        if self._keepalive is not None:
+            self._keepalive.cancel()
+            self._keepalive = None
+        for queues in self._streams.values():
+            for queue in queues:
+                self._put(queue, None)
+
+    # ---------- publishing (any thread) ----------
+
+    def has_listeners(self, user_id: int) -> bool:
+        return self._listening.get(user_id, 0.0) > time.monotonic()
+
+    def publish(self, user_id: int, type_: str, data: Dict) -> None:
+        """
+        Queue an event for user_id's streams. Thread-safe; serialized here,
+        in the publishing thread, and handed to the event loop.
+        """
+        loop = self._loop
+        if loop is None or not self.has_listeners(user_id):
+            return
+        try:
+            loop.call_soon_threadsafe(self._dispatch, user_id, type_, dumps(data))
+        except RuntimeError:
+            pass  # Loop closed (shutting down)
+
+    def reload(self, user_id: Optional[int] = None) -> None:
+        """
+        Tell clients to refetch everything; None = every user.
+        """
+        loop = self._loop
+        if loop is None:
+            return
+        for listener in ([user_id] if user_id is not None else list(self._listening)):
+            self.publish(listener, RELOAD, {})
+
+    # ---------- event loop side ----------
+
+    def _dispatch(self, user_id: int, type_: str, data: bytes) -> None:
+        if not self.has_listeners(user_id):
+            return
+        event = Event(next(self._seq), type_, data)
+        self._last_seq = event.seq
+        self.published += 1
+
+        history = self._history[user_id]
+        if len(history) == history.maxlen:
+            self._complete_from[user_id] = history[0].seq
+        history.append(event)
+        for queue in self._streams.get(user_id, ()):
+            self._put(queue, event)
+
+    async def _send_keepalives(self) -> None:
+        # One timer for all streams, rather than a timeout on every queue read
+        while True:
+            await asyncio.sleep(KEEPALIVE_SECONDS)
+            for queues in self._streams.values():
+                for queue in queues:
+                    if queue.empty():
+                        queue.put_nowait(KEEPALIVE)
+
+    def _put(self, queue: asyncio.Queue, event: Optional[Event]) -> None:
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The client stopped reading: drop its backlog, have it reload
+            self.overflows += 1
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(event if event is None else Event(self._last_seq, RELOAD, b"{}"))
+
+    def _replay(self, user_id: int, last_event_id: str) -> Optional[List[Event]]:
+        # Events after last_event_id, or None if some may be gone
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self._epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        if seq > self._last_seq or seq < self._complete_from[user_id]:
+            return None
+        return [event for event in self._history[user_id] if event.seq > seq]
+
+    def subscribe(self, user_id: int, last_event_id: Optional[str] = None) -> asyncio.Queue:
+        self._sweep()
+        if not self.has_listeners(user_id):
+            # New, or its events were skipped since its last stream closed
+            self._history[user_id] = deque(maxlen=HISTORY_SIZE)
+            self._complete_from[user_id] = self._last_seq
+        self._listening[user_id] = float("inf")
+
+        queue: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+        if last_event_id:
+            replay = self._replay(user_id, last_event_id)
+            for event in replay if replay is not None else [Event(self._last_seq, RELOAD, b"{}")]:
+                queue.put_nowait(event)
+        self._streams.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        queues = self._streams.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._streams[user_id]
+            self._listening[user_id] = time.monotonic() + LINGER_SECONDS
+
+    def _sweep(self) -> None:
+        # Forget users whose linger ran out, at most once per LINGER_SECONDS
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + LINGER_SECONDS
+        for user_id, until in list(self._listening.items()):
+            if until <= now:
+                del self._listening[user_id]
+                del self._history[user_id]
+                del self._complete_from[user_id]
+
+    def _encode(self, event: Event) -> bytes:
+        return b"id: %s-%d\nevent: %s\ndata: %s\n\n" % (
+            self._epoch.encode(), event.seq, event.type.encode(), event.data
+        )
+
+    async def stream(self, user_id: int, last_event_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        """
+        The text/event-stream body for one client, until it disconnects.
+        """
+        queue = self.subscribe(user_id, last_event_id)
+        try:
+            yield b"retry: %d\n\n" % RETRY_MS
+            while True:
+                event = await queue.get()
+                if event is None:
+                    return
+                yield b": keepalive\n\n" if event is KEEPALIVE else self._encode(event)
+        finally:
+            self.unsubscribe(user_id, queue)
+
+    # ---------- introspection ----------
+
+    def status(self) -> Dict:
+        return {
+            "streams": sum(len(queues) for queues in self._streams.values()),
+            "users": len(self._streams),
+            "published": self.published,
+            "overflows": self.overflows,
+        }
+
+    def render_metrics(self) -> str:
+        """
+        Open streams and event counters, Prometheus text format.
+        """
+        status = self.status()
+        lines = []
+        for name, kind, value, help_text in (
+            ("habit_hero_event_streams", "gauge", status["streams"], "Open /events streams"),
+            ("habit_hero_events_published_total", "counter", status["published"], "Events published to streams"),
+            ("habit_hero_event_overflows_total", "counter", status["overflows"], "Streams told to reload after falling behind"),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+event_bus = EventBus()
+
+
+# =========================
+# EVENT PAYLOADS
+# =========================
+# Shaped like the responses the client already holds: habit rows as in
+# GET /habits/, totals as in GET /analytics/dashboard.
+
+def _dashboard_totals(db: Session, user_id: int) -> Dict:
+    return {
+        "overall_success_rate": round(analytics.get_overall_success_rate(db, user_id), 2),
+        "longest_streak": analytics.get_longest_streak(db, user_id),
+        "category_progress": analytics.get_category_progress(db, user_id),
+    }
+
+
+def progress_event(db: Session, user_id: int, entries: List[Tuple[int, date, int]]) -> Tuple[str, Dict]:
+    """
+    "progress": the written entries, the affected habits' new streak and
+    success rate, the user's completions on the written days (completion
+    trend / heatmap) and the new dashboard totals.
+    """
+    if len(entries) > MAX_EVENT_ENTRIES:
+        return RELOAD, {}
+    days = sorted({day for _, day, _ in entries})
+    completion_index.ensure_loaded(db, user_id)
+    completions = completion_index.daily_completions(user_id, days[0], days[-1])
+    return "progress", {
+        "entries": [
+            {"habit_id": habit_id, "date": day, "completed": completed}
+            for habit_id, day, completed in entries
+        ],
+        "habits": get_habits_with_stats(
+            db, user_id, date.today(), fields=["id", "current_streak", "success_rate"],
+            habit_ids=sorted({habit_id for habit_id, _, _ in entries})
+        ),
+        "completions": {day.isoformat(): completions[(day - days[0]).days] for day in days},
+        **_dashboard_totals(db, user_id),
+    }
+
+
+def habit_created_event(db: Session, user_id: int, habit_id: int) -> Tuple[str, Dict]:
+    return "habit_created", {
+        "habit": get_habits_with_stats(db, user_id, date.today(), habit_ids=[habit_id])[0],
+        **_dashboard_totals(db, user_id),
+    }
+
+
+def habit_deleted_event(db: Session, user_id: int, habit_id: int) -> Tuple[str, Dict]:
+    return "habit_deleted", {"habit_id": habit_id, **_dashboard_totals(db, user_id)}
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+from typing import Iterator, Optional, Sequence
+from sqlalchemy import select
+from datetime import date
+from database import SessionLocal
+from models import Habit, Progress
+
+# Rows fetched from SQLite (and written to the response) per batch
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _encode(columns: Sequence[str], batches: Iterator[Sequence[tuple]], fmt: str) -> Iterator[str]:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for rows in batches:
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        # Header only when there were no rows
+        if buffer.tell():
+            yield buffer.getvalue()
+    else:
+        for rows in batches:
+            yield "".join(
+                json.dumps(dict(zip(columns, row)), default=str) + "\n"
+                for row in rows
+            )
+
+
+def _stream(statement, fmt: str) -> Iterator[str]:
+    """
+    Run statement and yield the encoded rows batch by batch, so memory use
+    stays flat however many rows match. Uses its own session because the
+    response body is produced after the endpoint has returned.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        yield from _encode(list(result.keys()), result.partitions(), fmt)
+    finally:
+        db.close()
+
+
+def export_progress(
+    user_id: int,
+    fmt: str = "ndjson",
+    habit_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> Iterator[str]:
+    statement = select(
+        Progress.id, Progress.habit_id, Progress.date, Progress.completed, Progress.notes
+    ).where(Progress.user_id == user_id).order_by(Progress.habit_id, Progress.date)
+
+    if habit_id is not None:
+        statement = statement.where(Progress.habit_id == habit_id)
+    if start_date is not None:
+        statement = statement.where(Progress.date >= start_date)
+    if end_date is not None:
+        statement = statement.where(Progress.date <= end_date)
+
+    return _stream(statement, fmt)
+
+
+def export_habits(user_id: int, fmt: str = "ndjson", category: Optional[str] = None) -> Iterator[str]:
+    statement = select(
+        Habit.id, Habit.name, Habit.frequency, Habit.category, Habit.start_date
+    ).where(Habit.user_id == user_id).order_by(Habit.id)
+
+    if category is not None:
+        statement = statement.where(Habit.category == category)
+
+    return _stream(statement, fmt)
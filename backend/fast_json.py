@@ -0,0 +1,39 @@
+import json
+from datetime import date
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # Optional dependency; the stdlib encoder is the fallback
+    orjson = None
+
+# =========================
+# FAST JSON RESPONSES
+# =========================
+# List endpoints build plain dicts from column tuples and return them in a
+# FastJSONResponse, which skips FastAPI's per-row response_model
+# validation and jsonable_encoder pass. The response_model stays on the
+# route, so the OpenAPI schema is unchanged; the endpoint is responsible
+# for producing rows of that shape.
+
+
+def _default(value: Any):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Compact UTF-8 JSON; dates as ISO strings.
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,206 @@
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# =========================
+# REQUEST INSTRUMENTATION
+# =========================
+# SQLAlchemy cursor hooks add every statement's duration to the stats of
+# the request that issued it (found through a context variable, which
+# follows the request into threadpool workers). The middleware reports
+# them in a Server-Timing header and a JSON log line, and feeds the
+# per-route histograms served by /debug/metrics.
+
+logger = logging.getLogger("habit_hero.requests")
+
+SLOWEST_KEPT = 3  # Slowest statements reported per request
+
+# Histogram bucket upper bounds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250)
+
+
+class RequestStats:
+    __slots__ = ("query_count", "db_time", "slowest")
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0  # seconds
+        self.slowest: List[Tuple[float, str]] = []
+
+    def add(self, duration: float, statement: str) -> None:
+        self.query_count += 1
+        self.db_time += duration
+        if len(self.slowest) < SLOWEST_KEPT or duration > self.slowest[-1][0]:
+            self.slowest.append((duration, statement))
+            self.slowest.sort(key=lambda item: -item[0])
+            del self.slowest[SLOWEST_KEPT:]
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+# ---------- SQLAlchemy hooks ----------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.add(duration, statement)
+
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ---------- Histograms ----------
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last = +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def lines(self, name: str, labels: str) -> List[str]:
+        lines, cumulative = [], 0
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.total:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class RouteMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], Dict] = {}
+
+    def observe(self, method: str, route: str, status: int, duration: float, stats: RequestStats) -> None:
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = {
+                    "duration": Histogram(DURATION_BUCKETS),
+                    "db_time": Histogram(DURATION_BUCKETS),
+                    "queries": Histogram(QUERY_BUCKETS),
+                    "errors": 0,
+                }
+            metrics["duration"].observe(duration)
+            metrics["db_time"].observe(stats.db_time)
+            metrics["queries"].observe(stats.query_count)
+            if status >= 500:
+                metrics["errors"] += 1
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format.
+        """
+        families = [
+            ("habit_hero_request_duration_seconds", "duration", "Request latency"),
+            ("habit_hero_request_db_seconds", "db_time", "Time spent in SQL per request"),
+            ("habit_hero_request_queries", "queries", "SQL statements per request"),
+        ]
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = []
+            for name, key, help_text in families:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (method, route), metrics in routes:
+                    lines += metrics[key].lines(name, f'method="{method}",route="{route}"')
+
+            lines += [
+                "# HELP habit_hero_request_errors_total Responses with status >= 500",
+                "# TYPE habit_hero_request_errors_total counter",
+            ]
+            for (method, route), metrics in routes:
+                lines.append(f'habit_hero_request_errors_total{{method="{method}",route="{route}"}} {metrics["errors"]}')
+
+        return "\n".join(lines) + "\n"
+
+
+route_metrics = RouteMetrics()
+
+
+# ---------- Middleware ----------
+
+class TimingMiddleware:
+    """
+    Plain ASGI rather than @app.middleware("http"), which runs every
+    request in an extra task and pipes the body through a buffer; with
+    thousands of open /events streams that doubled their memory and the
+    CPU per published event. Timings are taken when the response starts.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                duration = time.perf_counter() - start
+                server_timing = (
+                    f'db;dur={stats.db_time * 1000:.2f};desc="{stats.query_count} queries", '
+                    f"app;dur={duration * 1000:.2f}"
+                )
+                message = {**message, "headers": [*message.get("headers", ()), (b"server-timing", server_timing.encode())]}
+                _report(scope, message["status"], duration, stats)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+
+
+def _report(scope, status: int, duration: float, stats: RequestStats) -> None:
+    # Route template ("/progress/{habit_id}") keeps the label set small
+    route = scope.get("route")
+    route_path = route.path if route is not None else "unmatched"
+    route_metrics.observe(scope["method"], route_path, status, duration, stats)
+
+    logger.info(json.dumps({
+        "method": scope["method"],
+        "route": route_path,
+        "path": scope["path"],
+        "status": status,
+        "duration_ms": round(duration * 1000, 2),
+        "db_ms": round(stats.db_time * 1000, 2),
+        "queries": stats.query_count,
+        "slowest": [
+            {"ms": round(seconds * 1000, 2), "sql": " ".join(statement.split())[:200]}
+            for seconds, statement in stats.slowest
+        ],
+    }))
@@ -0,0 +1,116 @@
+import os
+from datetime import time
+from typing import Callable, Dict
+
+from sqlalchemy.orm import Session
+
+import analytics
+import analytics_np
+import rollups
+from ai_logic import suggestion_index
+from cache import analytics_cache
+from completion_index import get_heatmap_data as bitset_heatmap
+from database import SessionLocal, engine
+from moods import get_mood_trend
+from scheduler import Job, Scheduler
+from stats import close_out_streaks
+from suggestions import MAX_AGE_SECONDS as SUGGESTIONS_MAX_AGE
+from sync import compact_changes
+
+# =========================
+# MAINTENANCE JOBS
+# =========================
+# What the scheduler runs (scheduler.py). BACKGROUND_JOBS=0 turns them off,
+# e.g. on all but one worker when running several.
+
+BACKGROUND_JOBS_ENABLED = os.getenv("BACKGROUND_JOBS", "1") == "1"
+
+WARM_EXPIRING_WITHIN = 90  # seconds; one warm_cache interval plus margin
+WARM_USED_WITHIN = 15 * 60  # Only entries someone requested lately
+
+# Recompute a cached endpoint result from its cache key: key[0] names the
+# endpoint, the rest are its arguments (see the cached_response calls)
+CACHE_WARMERS: Dict[str, Callable] = {
+    "dashboard": lambda db, user_id, days, engine: (
+        analytics_np.get_dashboard_data if engine == "numpy" else analytics.get_dashboard_data
+    )(db, user_id, days),
+    "heatmap": lambda db, user_id, days, engine: {
+        "bitset": bitset_heatmap,
+        "sql": analytics.get_heatmap_data,
+        "numpy": analytics_np.get_heatmap,
+    }[engine](db, user_id, days),
+    "mood-trend": lambda db, user_id, weeks, habit_id: get_mood_trend(db, user_id, weeks, habit_id),
+    "category-trend": lambda db, user_id, days: rollups.get_category_trend(db, user_id, days),
+    "trend": lambda db, user_id, granularity, range_, habit_id, category: rollups.get_trend(
+        db, user_id, granularity, range_, habit_id, category
+    ),
+}
+
+
+def _with_session(func: Callable[[Session], Dict]) -> Callable[[], Dict]:
+    def run():
+        db = SessionLocal()
+        try:
+            return func(db)
+        finally:
+            db.close()
+    return run
+
+
+def rebuild_rollups(db: Session) -> Dict:
+    rows = rollups.rebuild_all_rollups(db)
+    # Picks up writes made elsewhere, which cached results don't reflect
+    analytics_cache.invalidate()
+    return {"rows": rows}
+
+
+def close_streaks(db: Session) -> Dict:
+    refreshed = close_out_streaks(db)
+    # Every cached streak is a day old now; warm_cache recomputes the used ones
+    analytics_cache.invalidate()
+    return {"habits": refreshed}
+
+
+def warm_cache(db: Session) -> Dict:
+    warmed = 0
+    for user_id, key in analytics_cache.entries_to_warm(WARM_EXPIRING_WITHIN, WARM_USED_WITHIN):
+        build = CACHE_WARMERS.get(key[0])
+        if build is not None:
+            analytics_cache.refresh(key, lambda: build(db, user_id, *key[1:]), scope=user_id)
+            warmed += 1
+    return {"warmed": warmed}
+
+
+def rebuild_suggestions(db: Session) -> Dict:
+    suggestion_index.build(db)
+    return {"entries": len(suggestion_index)}
+
+
+def optimize_database() -> Dict:
+    """
+    PRAGMA optimize (refreshes planner statistics where needed), and with
+    auto_vacuum=INCREMENTAL hands free pages back to the filesystem.
+    """
+    if engine.dialect.name != "sqlite":
+        return {"skipped": engine.dialect.name}
+    with engine.begin() as conn:
+        conn.exec_driver_sql("PRAGMA optimize")
+        free_pages = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        incremental = conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2
+        if incremental:
+            conn.exec_driver_sql("PRAGMA incremental_vacuum").fetchall()
+        return {
+            "free_pages": free_pages,
+            "pages_released": free_pages - conn.exec_driver_sql("PRAGMA freelist_count").scalar() if incremental else 0,
+        }
+
+
+scheduler = Scheduler()
+scheduler.add(Job("rollups_rebuild", _with_session(rebuild_rollups), at=time(0, 10)))
+scheduler.add(Job("close_streaks", _with_session(close_streaks), at=time(0, 0, 5)))
+scheduler.add(Job("warm_cache", _with_session(warm_cache), every=60))
+# Rebuilt before it ages out, so requests never build it themselves
+scheduler.add(Job("suggestions", _with_session(rebuild_suggestions), every=SUGGESTIONS_MAX_AGE * 0.8, run_on_start=True))
+# Before optimize, which hands the pages it frees back
+scheduler.add(Job("compact_changes", _with_session(compact_changes), at=time(2, 30)))
+scheduler.add(Job("optimize", optimize_database, at=time(3, 0)))
@@ -1,25 +1,65 @@
-import random  # Add at top imports
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from datetime import date, timedelta
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from datetime import date
 from typing import List, Dict, Any, Optional
 
-from database import get_db
-from models import Habit, Progress
+from database import get_db, ASYNC_DB_ENABLED, engine, async_engine
+from models import Habit, Progress, User
 from schemas import (
+    UserCreate,
+    UserResponse,
     HabitCreate,
     HabitResponse,
     HabitWithStatsResponse,   # ✅ ADD THIS
     ProgressCreate,
-    ProgressResponse
+    ProgressResponse,
+    ProgressBulkRequest,
+    ProgressBulkResponse,
+    SyncChangesResponse,
+    SyncRequest,
+    SyncResponse
 )
-from ai_logic import get_habit_suggestions, get_motivational_quote
-from analytics import get_completion_trend, get_category_progress, get_overall_success_rate, get_longest_streak
-from pydantic import BaseModel
+from ai_logic import get_habit_suggestions, get_motivational_quote, get_motivational_quotes
+from analytics import get_dashboard_data
+from stats import get_habits_with_stats, apply_progress_writes, read_completions, HABIT_LIST_FIELDS
+from cache import analytics_cache, cached_response
+import write_hooks
+from demo_data import generate_demo_data
+import completion_index
+from bulk import bulk_upsert_progress
+from moods import classify_mood, get_mood_trend
+from pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, parse_fields, take_page, page_headers
+from export import export_progress, export_habits, MEDIA_TYPES
+from pydantic import BaseModel, Field
 
 from fastapi.middleware.cors import CORSMiddleware
-
-app = FastAPI(title="Habit Hero API", description="Track your habits!")
+from fastapi.responses import StreamingResponse, PlainTextResponse
+from fast_json import FastJSONResponse
+from instrumentation import instrument_engine, TimingMiddleware, route_metrics
+from users import get_current_user_id, get_stream_user_id, get_user_habit
+from jobs import BACKGROUND_JOBS_ENABLED, scheduler
+from events import event_bus
+from rollups import (
+    RANGE_PATTERN, get_category_trend, get_trend, refresh_rollups
+)
+from change_log import log_habit, log_progress
+from sync import MAX_SYNC_PAGE_SIZE, SYNC_PAGE_SIZE, apply_operations, get_changes, remove_habit
+from contextlib import asynccontextmanager
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Rollups, streak close-out, cache warming, SQLite upkeep (jobs.py)
+    if BACKGROUND_JOBS_ENABLED:
+        scheduler.start()
+    # /events streams are fed from the request threads through this loop
+    event_bus.start()
+    yield
+    event_bus.stop()
+    await scheduler.stop()
+
+app = FastAPI(title="Habit Hero API", description="Track your habits!", lifespan=lifespan)
 
 # CORS — allow frontend
 app.add_middleware(
@@ -28,131 +68,113 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", NEXT_CURSOR_HEADER],
 )
 
+# Per-request SQL count / timing: Server-Timing header, log line, /debug/metrics
+instrument_engine(engine)
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
+app.add_middleware(TimingMiddleware)
+
+# Async versions of the hot endpoints under /async/... (opt-in)
+if ASYNC_DB_ENABLED:
+    from async_api import router as async_router
+    app.include_router(async_router)
+
 # For AI suggestions request
 class SuggestionRequest(BaseModel):
     target_category: Optional[str] = None
     num_suggestions: int = 3
 
+# For batched motivation (None = every habit of the user)
+class MotivationBatchRequest(BaseModel):
+    habit_ids: Optional[List[int]] = Field(default=None, max_length=1000)
+
 
 # ============ DEMO DATA SEED (Safe — only if empty) ============
 @app.post("/seed-demo-data")
-def seed_demo_data(db: Session = Depends(get_db)):
-    # Prevent duplicate demo seeding
-    if db.query(Habit).count() >= 10:
+def seed_demo_data(
+    # Sized to finish within a request; larger sets: python demo_data.py
+    habits: int = Query(default=12, ge=1, le=1000),
+    days: Optional[int] = Query(default=None, ge=1, le=365),
+    seed: int = 42,
+    force: bool = False,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    # Prevent duplicate demo seeding (force=true to add a load-test set anyway)
+    if not force and db.query(Habit).filter(Habit.user_id == user_id).count() >= 10:
         return {"message": "Sufficient data already exists"}
 
-    random.seed(42)
+    result = generate_demo_data(db, user_id, num_habits=habits, num_days=days, seed=seed)
+    write_hooks.data_reloaded(user_id)
 
-    habits_data = [
-        {"name": "Morning Run", "category": "health"},
-        {"name": "Meditate 10 Minutes", "category": "health"},
-        {"name": "Drink 8 Glasses of Water", "category": "health"},
-        {"name": "Stretching / Mobility", "category": "health"},
-
-        {"name": "Read 30 Pages", "category": "learning"},
-        {"name": "Practice Coding", "category": "learning"},
-        {"name": "Watch Educational Video", "category": "learning"},
-
-        {"name": "Deep Work Session", "category": "work"},
-        {"name": "Review Daily Tasks", "category": "work"},
-        {"name": "Plan Tomorrow", "category": "work"},
-
-        {"name": "Journal Gratitude", "category": "general"},
-        {"name": "Call or Text a Friend", "category": "general"},
-    ]
-
-    today = date.today()
-    end_date = today - timedelta(days=1)  # ❗ yesterday only
+    if habits == 12 and days is None:
+        return {
+            "message": "Demo data seeded: 12 habits with 30–60 days of realistic past progress"
+        }
+    return {
+        "message": f"Demo data seeded: {result['habits']} habits, {result['progress_rows']} progress rows",
+        **result
+    }
 
-    habits = []
+from analytics import get_heatmap_data
+import analytics_np
 
-    # Create habits
-    for h in habits_data:
-        start_date = end_date - timedelta(days=random.randint(30, 60))
+def _analytics_engine(engine: str) -> str:
+    # "sql" = analytics.py queries, "numpy" = analytics_np.py arrays,
+    # "bitset" = completion_index.py bitmaps
+    if engine == "numpy" and not analytics_np.NUMPY_AVAILABLE:
+        raise HTTPException(status_code=400, detail="numpy engine is not installed")
+    return engine
 
-        habit = Habit(
-            name=h["name"],
-            frequency="daily",
-            category=h["category"],
-            start_date=start_date,
-        )
-        db.add(habit)
-        habits.append(habit)
+@app.get("/analytics/heatmap")
+def heatmap(
+    request: Request,
+    response: Response,
+    days: int = Query(default=90, ge=1, le=3660),
+    engine: str = Query(default="bitset", pattern="^(bitset|sql|numpy)$"),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    build = {
+        "bitset": completion_index.get_heatmap_data,
+        "sql": get_heatmap_data,
+        "numpy": analytics_np.get_heatmap,
+    }[_analytics_engine(engine)]
+    return cached_response(
+        request, response, ("heatmap", days, engine),
+        lambda: build(db, user_id, days),
+        scope=user_id
+    )
 
-    db.commit()
 
-    # Category realism
-    category_base_rate = {
-        "health": 0.82,
-        "learning": 0.74,
-        "work": 0.78,
-        "general": 0.70,
-    }
 
-    motivational_notes = [
-        "Felt great!",
-        "Very productive",
-        "Good focus today",
-        "Energy was high",
-        "Happy with progress",
-    ]
-
-    struggle_notes = [
-        "Busy day",
-        "Low energy",
-        "Missed due to work",
-        "Not feeling well",
-        "Will try tomorrow",
-    ]
-
-    # Create past progress
-    for habit in habits:
-        current = habit.start_date
-        base_rate = category_base_rate[habit.category]
-
-        while current <= end_date:
-            completed = random.random() < base_rate
-
-            notes = ""
-            if completed and random.random() < 0.25:
-                notes = random.choice(motivational_notes)
-            elif not completed and random.random() < 0.20:
-                notes = random.choice(struggle_notes)
-
-            # Save only meaningful entries
-            if completed or notes:
-                db.add(
-                    Progress(
-                        habit_id=habit.id,
-                        date=current,
-                        completed=1 if completed else 0,
-                        notes=notes,
-                    )
-                )
-
-            current += timedelta(days=1)
+# ============ USERS ============
+@app.post("/users/", response_model=UserResponse)
+def create_user(user: UserCreate, db: Session = Depends(get_db)):
+    # Send the returned id as X-User-Id to act as this user
+    if db.query(User).filter(User.name == user.name).first():
+        raise HTTPException(status_code=400, detail="User already exists")
 
+    db_user = User(name=user.name)
+    db.add(db_user)
     db.commit()
-
-    return {
-        "message": "Demo data seeded: 12 habits with 30–60 days of realistic past progress"
-    }
-
-from analytics import get_heatmap_data
-
-@app.get("/analytics/heatmap")
-def heatmap(db: Session = Depends(get_db)):
-    return get_heatmap_data(db)
-
+    db.refresh(db_user)
+    return db_user
 
 
 # ============ CORE ENDPOINTS ============
 @app.post("/habits/", response_model=HabitResponse)
-def create_habit(habit: HabitCreate, db: Session = Depends(get_db)):
+def create_habit(
+    habit: HabitCreate,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
     # ✅ Prevent duplicates (case-insensitive)
     existing = db.query(Habit).filter(
+        Habit.user_id == user_id,
         Habit.name.ilike(habit.name),
         Habit.category.ilike(habit.category)
     ).first()
@@ -163,9 +185,12 @@ def create_habit(habit: HabitCreate, db: Session = Depends(get_db)):
             detail="Habit already exists in this category"
         )
 
-    db_habit = Habit(**habit.dict())
+    db_habit = Habit(**habit.dict(), user_id=user_id)
     db.add(db_habit)
+    db.flush()
+    log_habit(db, user_id, db_habit.id)
     db.commit()
+    write_hooks.habit_created(db, user_id, db_habit.id)
     db.refresh(db_habit)
     return db_habit
 
@@ -179,53 +204,40 @@ from ai_logic import calculate_streak
 
 @app.get("/habits/", response_model=List[HabitWithStatsResponse])
 def read_habits(
+    response: Response,
     selected_date: date = Query(default=date.today()),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(default=None, description="Comma-separated, e.g. id,name,completed_today"),
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
-    habits = db.query(Habit).all()
-    response = []
-
-    for habit in habits:
-        total = db.query(Progress).filter(
-            Progress.habit_id == habit.id
-        ).count()
-
-        completed = db.query(Progress).filter(
-            Progress.habit_id == habit.id,
-            Progress.completed == 1
-        ).count()
-
-        success_rate = round((completed / total) * 100, 2) if total > 0 else 0
-
-        completed_on_date = db.query(Progress).filter(
-            Progress.habit_id == habit.id,
-            Progress.date == selected_date,
-            Progress.completed == 1
-        ).first() is not None
-
-        response.append({
-            "id": habit.id,
-            "name": habit.name,
-            "frequency": habit.frequency,
-            "category": habit.category,
-            "start_date": habit.start_date,
-            "current_streak": calculate_streak(db, habit.id),
-            "success_rate": success_rate,
-            "completed_today": completed_on_date   # ← dynamic now
-        })
-
-    return response
+    # No limit = every habit (what the frontend expects); with a limit the
+    # next page's cursor is in the X-Next-Cursor header
+    selected = parse_fields(fields, HABIT_LIST_FIELDS)
+    habits = get_habits_with_stats(
+        db, user_id, selected_date,
+        after_id=decode_cursor(cursor, int),
+        limit=limit + 1 if limit else None,
+        fields=selected
+    )
+    habits = take_page(habits, limit, lambda habit: habit["id"], response)
+    # Rows are already plain dicts: encode them directly instead of
+    # validating each one against response_model (kept for the docs)
+    return FastJSONResponse(habits, headers=page_headers(response))
 
 
 @app.get("/progress/by-date/{habit_id}")
 def get_progress_by_date(
     habit_id: int,
     target_date: date,
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     progress = db.query(Progress).filter(
         Progress.habit_id == habit_id,
-        Progress.date == target_date
+        Progress.date == target_date,
+        Progress.user_id == user_id
     ).first()
 
     return {
@@ -241,33 +253,46 @@ def update_progress(
     target_date: date,
     completed: int = 1,
     notes: str = "",
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
-    entry = db.query(Progress).filter(
-        Progress.habit_id == habit_id,
-        Progress.date == target_date
-    ).first()
-
-    if entry:
-        entry.completed = completed
-        entry.notes = notes
-    else:
-        db.add(Progress(
-            habit_id=habit_id,
-            date=target_date,
-            completed=completed,
-            notes=notes
-        ))
-
+    get_user_habit(db, user_id, habit_id)
+    # Logged first: takes the write lock before the old value is read
+    log_progress(db, user_id, [(habit_id, target_date)])
+    before = read_completions(db, [(habit_id, target_date)]).get((habit_id, target_date))
+
+    # Insert or overwrite the entry for that day in one statement
+    stmt = sqlite_insert(Progress).values(
+        habit_id=habit_id,
+        user_id=user_id,
+        date=target_date,
+        completed=completed,
+        notes=notes,
+        mood=classify_mood(notes)
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[Progress.habit_id, Progress.date],
+        set_={
+            "completed": stmt.excluded.completed,
+            "notes": stmt.excluded.notes,
+            "mood": stmt.excluded.mood,
+        }
+    ))
+
+    refresh_rollups(db, [(habit_id, target_date)])
+    apply_progress_writes(db, [(habit_id, target_date, before, completed)])
     db.commit()
+    write_hooks.progress_committed(db, user_id, [(habit_id, target_date, completed)])
     return {"message": "Progress updated"}
 
 
 @app.post("/progress/", response_model=ProgressResponse)
-def create_progress(progress: ProgressCreate, db: Session = Depends(get_db)):
-    habit = db.query(Habit).filter(Habit.id == progress.habit_id).first()
-    if not habit:
-        raise HTTPException(status_code=404, detail="Habit not found")
+def create_progress(
+    progress: ProgressCreate,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    get_user_habit(db, user_id, progress.habit_id)
 
     today = date.today()
 
@@ -285,64 +310,282 @@ def create_progress(progress: ProgressCreate, db: Session = Depends(get_db)):
 
     db_progress = Progress(
         habit_id=progress.habit_id,
+        user_id=user_id,
         completed=progress.completed,
         notes=progress.notes,
+        mood=classify_mood(progress.notes),
         date=today
     )
 
     db.add(db_progress)
-    db.commit()
+    try:
+        log_progress(db, user_id, [(progress.habit_id, today)])
+        refresh_rollups(db, [(progress.habit_id, today)])
+        apply_progress_writes(db, [(progress.habit_id, today, None, progress.completed)])
+        db.commit()
+    except IntegrityError:
+        # Another request logged today between the check and the insert
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Progress already logged for today"
+        )
+    write_hooks.progress_committed(db, user_id, [(progress.habit_id, today, progress.completed)])
     db.refresh(db_progress)
     return db_progress
 
-@app.delete("/habits/{habit_id}")
-def delete_habit(habit_id: int, db: Session = Depends(get_db)):
-    habit = db.query(Habit).filter(Habit.id == habit_id).first()
-
-    if not habit:
-        raise HTTPException(status_code=404, detail="Habit not found")
-
-    # Delete related progress first
-    db.query(Progress).filter(
-        Progress.habit_id == habit_id
-    ).delete()
+@app.post("/progress/bulk", response_model=ProgressBulkResponse)
+def create_progress_bulk(
+    request: ProgressBulkRequest,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    result = bulk_upsert_progress(db, user_id, request.items)
+    write_hooks.progress_committed(db, user_id, [
+        (item.habit_id, item.date, item.completed)
+        for item, outcome in zip(request.items, result["results"])
+        if outcome["status"] != "error"
+    ])
+    return result
 
-    db.delete(habit)
+@app.delete("/habits/{habit_id}")
+def delete_habit(
+    habit_id: int,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    habit = get_user_habit(db, user_id, habit_id)
+    remove_habit(db, habit)
     db.commit()
+    write_hooks.habit_deleted(db, user_id, habit_id)
 
     return {"message": "Habit deleted successfully"}
 
 
 
+PROGRESS_FIELDS = ("id", "habit_id", "date", "completed", "notes")
+
 @app.get("/progress/{habit_id}", response_model=List[ProgressResponse])
-def read_progress(habit_id: int, db: Session = Depends(get_db)):
-    progress = db.query(Progress).filter(Progress.habit_id == habit_id).all()
-    if not progress:
+def read_progress(
+    habit_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(default=None, description="Comma-separated, e.g. date,completed"),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    # Ordered by date, paged on the (habit_id, date) unique index
+    selected = parse_fields(fields, PROGRESS_FIELDS)
+    names = ["date"] + [name for name in selected if name != "date"] if selected else list(PROGRESS_FIELDS)
+    after = decode_cursor(cursor, date.fromisoformat)
+
+    query = db.query(*[getattr(Progress, name) for name in names]).filter(
+        Progress.habit_id == habit_id,
+        Progress.user_id == user_id
+    ).order_by(Progress.date)
+    if after is not None:
+        query = query.filter(Progress.date > after)
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    progress = take_page([dict(zip(names, row)) for row in query], limit, lambda row: row["date"], response)
+    if not progress and after is None:
         raise HTTPException(status_code=404, detail="No progress found")
-    return progress
+    return FastJSONResponse(progress, headers=page_headers(response))
 
 @app.post("/ai/suggest-habits")
-def suggest_habits(request: SuggestionRequest, db: Session = Depends(get_db)):
-    suggestions = get_habit_suggestions(db, request.target_category, request.num_suggestions)
+def suggest_habits(
+    request: SuggestionRequest,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    suggestions = get_habit_suggestions(db, user_id, request.target_category, request.num_suggestions)
     return {"suggestions": suggestions}
 
+@app.post("/ai/motivation/batch")
+def get_motivation_batch(
+    request: MotivationBatchRequest,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    # One call for every habit card: quotes in request order (or habit id
+    # order), ids that aren't the user's habits listed in not_found
+    owned = db.query(Habit.id).filter(Habit.user_id == user_id)
+    if request.habit_ids is not None:
+        owned = owned.filter(Habit.id.in_(request.habit_ids))
+    owned = {habit_id for (habit_id,) in owned}
+
+    requested = sorted(owned) if request.habit_ids is None else list(dict.fromkeys(request.habit_ids))
+    habit_ids = [habit_id for habit_id in requested if habit_id in owned]
+    quotes = get_motivational_quotes(db, habit_ids)
+
+    return {
+        "quotes": [{"habit_id": habit_id, **quotes[habit_id]} for habit_id in habit_ids],
+        "not_found": [habit_id for habit_id in requested if habit_id not in owned],
+    }
+
 @app.get("/ai/motivation/{habit_id}")
-def get_motivation(habit_id: int, db: Session = Depends(get_db)):
+def get_motivation(
+    habit_id: int,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    get_user_habit(db, user_id, habit_id)
     return get_motivational_quote(db, habit_id)
 
 @app.get("/analytics/dashboard")
-def get_dashboard_analytics(db: Session = Depends(get_db)):
-    return {
-        "completion_trend": get_completion_trend(db),
-        "category_progress": get_category_progress(db),
-        "overall_success_rate": round(get_overall_success_rate(db), 2),
-        "longest_streak": get_longest_streak(db),
-    }
+def get_dashboard_analytics(
+    request: Request,
+    response: Response,
+    days: int = Query(default=30, ge=1, le=3660),
+    engine: str = Query(default="sql", pattern="^(sql|numpy)$"),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    build = analytics_np.get_dashboard_data if _analytics_engine(engine) == "numpy" else get_dashboard_data
+    return cached_response(
+        request, response, ("dashboard", days, engine),
+        lambda: build(db, user_id, days),
+        scope=user_id
+    )
+
+@app.get("/analytics/mood-trend")
+def mood_trend(
+    request: Request,
+    response: Response,
+    weeks: int = Query(default=12, ge=1, le=520),
+    habit_id: Optional[int] = None,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    # Mood counts per week and per habit, from the stored mood column
+    return cached_response(
+        request, response, ("mood-trend", weeks, habit_id),
+        lambda: get_mood_trend(db, user_id, weeks, habit_id),
+        scope=user_id
+    )
+
+@app.get("/analytics/category-trend")
+def category_trend(
+    request: Request,
+    response: Response,
+    days: int = Query(default=30, ge=1, le=3660),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    # Entries / completions per day and category, from the daily rollups
+    return cached_response(
+        request, response, ("category-trend", days),
+        lambda: get_category_trend(db, user_id, days),
+        scope=user_id
+    )
+
+@app.get("/analytics/trend")
+def trend(
+    request: Request,
+    response: Response,
+    granularity: str = Query(default="week", pattern="^(day|week|month|year)$"),
+    range_: str = Query(default="26w", alias="range", pattern=RANGE_PATTERN),
+    habit_id: Optional[int] = None,
+    category: Optional[str] = None,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    # Entries / completions per week, month, ... from the period rollups
+    if habit_id is not None:
+        get_user_habit(db, user_id, habit_id)
+    try:
+        return cached_response(
+            request, response, ("trend", granularity, range_, habit_id, category),
+            lambda: get_trend(db, user_id, granularity, range_, habit_id, category),
+            scope=user_id
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+@app.get("/analytics/cache")
+def analytics_cache_stats():
+    return analytics_cache.stats()
+
+@app.get("/debug/metrics", response_class=PlainTextResponse)
+def debug_metrics():
+    # Prometheus scrape target: per-route latency, DB time and query count histograms
+    return PlainTextResponse(
+        route_metrics.render() + scheduler.render_metrics() + event_bus.render_metrics(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+@app.get("/jobs")
+def job_status():
+    # Background job schedule, last run, failures and run times
+    return scheduler.status()
+
+@app.post("/jobs/{name}/run")
+async def run_job(name: str):
+    if name not in scheduler.jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return await scheduler.run_now(name)
+
+@app.get("/events")
+async def events(
+    last_event_id: Optional[str] = Header(default=None),
+    user_id: int = Depends(get_stream_user_id)
+):
+    # Server-sent events: the user's changes as they commit (events.py).
+    # A reconnecting EventSource sends Last-Event-ID and gets what it missed
+    return StreamingResponse(
+        event_bus.stream(user_id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ============ OFFLINE SYNC ============
+@app.get("/sync", response_model=SyncChangesResponse)
+def read_changes(
+    since: int = Query(default=0, ge=0),
+    limit: int = Query(default=SYNC_PAGE_SIZE, ge=1, le=MAX_SYNC_PAGE_SIZE),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    # Habits and progress changed after the `since` seq (sync.py); call
+    # again with the returned seq while `more` is true
+    return FastJSONResponse(get_changes(db, user_id, since, limit))
+
+
+@app.post("/sync", response_model=SyncResponse)
+def sync_operations(
+    request: SyncRequest,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    # Replay a client's queued writes; op_ids already applied are skipped
+    result = apply_operations(db, user_id, request.operations)
+
+    applied = [outcome for outcome in result["results"] if outcome["status"] == "applied"]
+    deleted = {outcome["habit_id"] for outcome in applied if outcome["type"] == "delete_habit"}
+    for outcome in applied:
+        if outcome["type"] == "create_habit" and outcome["habit_id"] not in deleted:
+            write_hooks.habit_created(db, user_id, outcome["habit_id"])
+        elif outcome["type"] == "delete_habit":
+            write_hooks.habit_deleted(db, user_id, outcome["habit_id"])
+    write_hooks.progress_committed(db, user_id, [
+        (outcome["habit_id"], date.fromisoformat(outcome["date"]), outcome["completed"])
+        for outcome in applied
+        if outcome["type"] == "progress" and outcome["habit_id"] not in deleted
+    ])
+    return result
 
 @app.get("/analytics/heatmap/{habit_id}")
-def habit_heatmap(habit_id: int, db: Session = Depends(get_db)):
+def habit_heatmap(
+    habit_id: int,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
     data = db.query(Progress).filter(
-        Progress.habit_id == habit_id
+        Progress.habit_id == habit_id,
+        Progress.user_id == user_id
     ).all()
 
     return {
@@ -350,6 +593,33 @@ def habit_heatmap(habit_id: int, db: Session = Depends(get_db)):
     }
 
 
+# ============ EXPORT (streamed, constant memory) ============
+def _export_response(rows, name: str, fmt: str) -> StreamingResponse:
+    return StreamingResponse(
+        rows,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+    )
+
+@app.get("/export/progress")
+def export_progress_history(
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$"),
+    habit_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    user_id: int = Depends(get_current_user_id)
+):
+    rows = export_progress(user_id, format, habit_id, start_date, end_date)
+    return _export_response(rows, "progress", format)
+
+@app.get("/export/habits")
+def export_habit_list(
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$"),
+    category: Optional[str] = None,
+    user_id: int = Depends(get_current_user_id)
+):
+    return _export_response(export_habits(user_id, format, category), "habits", format)
+
 
 @app.get("/")
 def read_root():
@@ -1,14 +1,33 @@
-from sqlalchemy import Column, Integer, String, Date, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text, ForeignKey, Index, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import date
 
 Base = declarative_base()
 
+# Owner of data created before users existed, and of requests without X-User-Id
+DEFAULT_USER_ID = 1
+
+class User(Base):
+    __tablename__ = "users"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True)
+
+    # Relationship: One user has many habits
+    habits = relationship("Habit", back_populates="user")
+
 class Habit(Base):
     __tablename__ = "habits"
+    __table_args__ = (
+        # A user's habits in id order (list, pages)
+        Index("ix_habits_user", "user_id"),
+        # Per-user category breakdowns and duplicate checks
+        Index("ix_habits_user_category", "user_id", "category"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, default=DEFAULT_USER_ID)
     name = Column(String, index=True)  # e.g., "Run 5km"
     frequency = Column(String, default="daily")  # "daily", "weekly", etc.
     category = Column(String, default="general")  # "health", "work", "learning"
@@ -16,15 +35,97 @@ class Habit(Base):
 
     # Relationship: One habit has many progress entries
     progress_entries = relationship("Progress", back_populates="habit")
+    user = relationship("User", back_populates="habits")
+
+# Case-insensitive name lookups within a user (suggestion exclusions); an
+# expression index, so it is declared on the columns after the class
+Index("ix_habits_user_name_lower", Habit.user_id, func.lower(Habit.name))
 
 class Progress(Base):
     __tablename__ = "progress"
+    __table_args__ = (
+        # One entry per habit per day; also serves habit + date lookups
+        Index("uq_progress_habit_date", "habit_id", "date", unique=True),
+        # Trend / heatmap: one user's completions per day over a date range
+        Index("ix_progress_user_date_completed", "user_id", "date", "completed"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     habit_id = Column(Integer, ForeignKey("habits.id"))
+    # Copy of the habit's owner, so per-user range scans don't join habits
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, default=DEFAULT_USER_ID)
     date = Column(Date, default=date.today)  # Date of the entry
     completed = Column(Integer, default=0)  # 1 if completed, 0 if not
     notes = Column(Text, nullable=True)  # Optional notes/mood
+    mood = Column(String, nullable=True)  # Classified from notes on write (moods.py), NULL without notes
 
     # Relationship: Back to the habit
-    habit = relationship("Habit", back_populates="progress_entries")
\ No newline at end of file
+    habit = relationship("Habit", back_populates="progress_entries")
+
+class HabitStats(Base):
+    __tablename__ = "habit_stats"
+
+    # One summary row per habit, refreshed whenever its progress changes
+    habit_id = Column(Integer, ForeignKey("habits.id"), primary_key=True)
+    total = Column(Integer, default=0)  # All progress entries
+    completed = Column(Integer, default=0)  # Entries with completed == 1
+    current_streak = Column(Integer, default=0)  # As of the `as_of` day
+    longest_streak = Column(Integer, default=0)
+    last_completed_date = Column(Date, nullable=True)
+    as_of = Column(Date)  # Day current_streak was computed for
+
+class HabitPeriod(Base):
+    __tablename__ = "habit_periods"
+    __table_args__ = (
+        # A user's periods over a range (category refresh, trend)
+        Index("ix_habit_periods_user", "user_id", "granularity", "period_start"),
+    )
+
+    # A habit's progress entries per day / week / month (rollups.py)
+    habit_id = Column(Integer, ForeignKey("habits.id"), primary_key=True)
+    granularity = Column(String, primary_key=True)  # "day", "week", "month"
+    period_start = Column(Date, primary_key=True)  # Monday for weeks, the 1st for months
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    total = Column(Integer, default=0)  # All progress entries
+    completed = Column(Integer, default=0)  # Entries with completed == 1
+
+class CategoryPeriod(Base):
+    __tablename__ = "category_periods"
+
+    # Sum of habit_periods over a user's habits in one category
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    granularity = Column(String, primary_key=True)
+    period_start = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True)
+    total = Column(Integer, default=0)
+    completed = Column(Integer, default=0)
+
+class Change(Base):
+    __tablename__ = "changes"
+    __table_args__ = (
+        # A user's changes after a sequence number (GET /sync)
+        Index("ix_changes_user_seq", "user_id", "seq"),
+        # Changes to one key (compaction)
+        Index("ix_changes_user_key", "user_id", "entity", "habit_id", "date", "op"),
+        # AUTOINCREMENT: sequence numbers are never reused, even after compaction
+        {"sqlite_autoincrement": True},
+    )
+
+    # Append-only log of habit and progress writes (change_log.py). Only the key
+    # is logged; readers send the row as it is now.
+    seq = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    entity = Column(String, nullable=False)  # "habit" or "progress"
+    op = Column(String, nullable=False)  # "upsert" or "delete"
+    habit_id = Column(Integer, nullable=False)  # No foreign key: deletions stay logged
+    date = Column(Date, nullable=True)  # Progress entries only
+
+class SyncOperation(Base):
+    __tablename__ = "sync_operations"
+
+    # Client operation ids POST /sync has applied, with their results, so a
+    # retried batch is answered instead of applied twice
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    op_id = Column(String, primary_key=True)
+    result = Column(Text, nullable=False)  # JSON
+    created_at = Column(DateTime, nullable=False)
@@ -0,0 +1,88 @@
+from typing import Dict, Optional
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from models import Progress
+from ai_logic import analyze_mood, MOOD_RULES
+
+# =========================
+# STORED MOODS
+# =========================
+# Every write path stores classify_mood(notes) in progress.mood, so mood
+# analytics are GROUP BYs over that column instead of re-scanning notes.
+# Existing rows are classified by backfill_moods() (schema migration 3,
+# and `python moods.py backfill --all` after MOOD_RULES changes).
+
+MOODS = tuple(MOOD_RULES)
+
+
+def classify_mood(notes: Optional[str]) -> Optional[str]:
+    """
+    Mood to store for an entry: None without notes, else analyze_mood().
+    """
+    return analyze_mood(notes) if notes else None
+
+
+def backfill_moods(conn, reclassify: bool = False) -> int:
+    """
+    Classify stored notes in one UPDATE, with classify_mood registered as
+    an SQLite function. Only rows with notes and no mood unless
+    reclassify. Runs in the caller's transaction; returns rows updated.
+    """
+    conn.connection.driver_connection.create_function(
+        "classify_mood", 1, classify_mood, deterministic=True
+    )
+    where = "" if reclassify else " WHERE mood IS NULL AND notes IS NOT NULL AND notes != ''"
+    return conn.execute(text("UPDATE progress SET mood = classify_mood(notes)" + where)).rowcount
+
+
+def _week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())  # Monday
+
+
+def get_mood_trend(db: Session, user_id: int, weeks: int = 12, habit_id: Optional[int] = None) -> Dict:
+    """
+    Mood counts of the user's entries over the last `weeks` weeks (Monday
+    to Sunday, the current week included), per week and per habit.
+    """
+    start_date = _week_start(date.today()) - timedelta(weeks=weeks - 1)
+    end_date = start_date + timedelta(weeks=weeks)  # Exclusive
+    # SQLite: forward to Sunday (same day if Sunday), back six days
+    week = func.date(Progress.date, "weekday 0", "-6 days")
+
+    query = db.query(
+        Progress.habit_id, week, Progress.mood, func.count(Progress.id)
+    ).filter(
+        Progress.user_id == user_id,
+        Progress.date >= start_date,
+        Progress.date < end_date,
+        Progress.mood.isnot(None)
+    )
+    if habit_id is not None:
+        query = query.filter(Progress.habit_id == habit_id)
+
+    by_week = {
+        (start_date + timedelta(weeks=i)).isoformat(): dict.fromkeys(MOODS, 0)
+        for i in range(weeks)
+    }
+    by_habit: Dict[int, Dict[str, int]] = {}
+    for row_habit_id, week_start, mood, count in query.group_by(Progress.habit_id, week, Progress.mood):
+        by_week[week_start][mood] += count
+        by_habit.setdefault(row_habit_id, dict.fromkeys(MOODS, 0))[mood] += count
+
+    return {
+        "weeks": [{"week_start": week_start, **counts} for week_start, counts in by_week.items()],
+        "habits": [{"habit_id": h, **counts} for h, counts in sorted(by_habit.items())],
+    }
+
+
+if __name__ == "__main__":
+    # python moods.py backfill [--all]
+    import sys
+    from database import engine
+
+    if len(sys.argv) < 2 or sys.argv[1] != "backfill":
+        sys.exit("usage: python moods.py backfill [--all]")
+    with engine.begin() as conn:
+        updated = backfill_moods(conn, reclassify="--all" in sys.argv)
+    print(f"Classified {updated} progress rows")
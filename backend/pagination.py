@@ -0,0 +1,68 @@
+import base64
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, Response
+
+# =========================
+# KEYSET PAGINATION / FIELD SELECTION
+# =========================
+# A page is "rows after the last key of the previous page", so every page
+# costs one index range scan no matter how deep it is (no OFFSET). The
+# cursor is that last key, opaque to clients; the next one is sent in the
+# X-Next-Cursor header so list bodies keep their shape.
+
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(key: Any) -> str:
+    raw = json.dumps(key, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], parse: Callable[[Any], Any]) -> Any:
+    """
+    Last key of the previous page, or None for the first page.
+    """
+    if cursor is None:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return parse(json.loads(raw))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """
+    "id,name" -> ["id", "name"] (None = every field), 400 on unknown names.
+    """
+    if fields is None:
+        return None
+    selected = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in allowed]
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields selected"
+        )
+    return selected
+
+
+def take_page(rows: List, limit: Optional[int], key: Callable[[Any], Any], response: Response) -> List:
+    """
+    Trim rows (fetched with limit + 1) to the page and set the next cursor.
+    """
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key(rows[-1]))
+    return rows
+
+
+def page_headers(response: Response) -> Dict[str, str]:
+    """
+    The cursor header set by take_page, for endpoints that build their own response.
+    """
+    cursor = response.headers.get(NEXT_CURSOR_HEADER)
+    return {NEXT_CURSOR_HEADER: cursor} if cursor else {}
@@ -0,0 +1,441 @@
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy import and_, case, delete, func, insert, literal, or_, select
+from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from models import CategoryPeriod, Habit, HabitPeriod, Progress, User
+
+# =========================
+# PERIOD ROLLUPS
+# =========================
+# habit_periods / category_periods hold progress entry counts per day,
+# week (Monday-based) and month, for every habit and every user's habit
+# category. Writes refresh the periods they touched inside their own
+# transaction (like habit_stats), so trends over years and the streaks of
+# weekly / monthly habits read a few hundred rollup rows instead of every
+# progress row. The nightly rollups_rebuild job recomputes them all.
+
+GRANULARITIES = ("day", "week", "month")
+# Habit.frequency -> the period its streaks and success rate count in;
+# anything else counts in days
+FREQUENCY_PERIODS = {"weekly": "week", "monthly": "month"}
+
+# The same periods as SQLite expressions over progress.date
+_PERIOD_SQL = {
+    "day": Progress.date,
+    "week": func.date(Progress.date, "weekday 0", "-6 days"),
+    "month": func.date(Progress.date, "start of month"),
+}
+
+
+def period_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    if granularity == "year":
+        return day.replace(month=1, day=1)
+    return day
+
+
+def next_period(start: date, granularity: str) -> date:
+    if granularity == "week":
+        return start + timedelta(weeks=1)
+    if granularity == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    if granularity == "year":
+        return start.replace(year=start.year + 1)
+    return start + timedelta(days=1)
+
+
+def _in_ranges(model, ranges: Dict[str, Tuple[date, date]]):
+    # Periods of each granularity between the first and last start, inclusive
+    return or_(*(
+        and_(model.granularity == granularity, model.period_start.between(first, last))
+        for granularity, (first, last) in ranges.items()
+    ))
+
+
+# ---------- maintenance ----------
+
+def _refresh_habit(db: Session, habit_id: int, user_id: int, ranges: Dict[str, Tuple[date, date]]) -> None:
+    # One read of the habit's entries covering every range, bucketed here
+    first = min(first for first, _ in ranges.values())
+    end = max(next_period(last, granularity) for granularity, (_, last) in ranges.items())
+    counts: Dict[Tuple[str, date], List[int]] = {}
+    for day, completed in db.query(Progress.date, Progress.completed).filter(
+        Progress.habit_id == habit_id, Progress.date >= first, Progress.date < end
+    ):
+        for granularity, (low, high) in ranges.items():
+            start = period_start(day, granularity)
+            if low <= start <= high:
+                bucket = counts.setdefault((granularity, start), [0, 0])
+                bucket[0] += 1
+                bucket[1] += completed == 1
+
+    db.execute(delete(HabitPeriod).where(HabitPeriod.habit_id == habit_id, _in_ranges(HabitPeriod, ranges)))
+    if counts:
+        db.execute(insert(HabitPeriod), [
+            {"habit_id": habit_id, "granularity": granularity, "period_start": start,
+             "user_id": user_id, "total": total, "completed": completed}
+            for (granularity, start), (total, completed) in counts.items()
+        ])
+
+
+def _refresh_category(db: Session, user_id: int, category: str, ranges: Dict[str, Tuple[date, date]]) -> None:
+    # One statement pair per granularity: with the ranges OR-ed together the
+    # planner only narrows habit_periods by user, reading all of their rows
+    for granularity, (first, last) in ranges.items():
+        db.execute(delete(CategoryPeriod).where(
+            CategoryPeriod.user_id == user_id,
+            CategoryPeriod.granularity == granularity,
+            CategoryPeriod.period_start.between(first, last),
+            CategoryPeriod.category == category
+        ))
+        db.execute(insert(CategoryPeriod).from_select(
+            ["user_id", "granularity", "period_start", "category", "total", "completed"],
+            select(
+                HabitPeriod.user_id, HabitPeriod.granularity, HabitPeriod.period_start, Habit.category,
+                func.sum(HabitPeriod.total), func.sum(HabitPeriod.completed),
+            ).join(Habit, Habit.id == HabitPeriod.habit_id).where(
+                HabitPeriod.user_id == user_id,
+                HabitPeriod.granularity == granularity,
+                HabitPeriod.period_start.between(first, last),
+                Habit.category == category
+            ).group_by(HabitPeriod.period_start)
+        ))
+
+
+def refresh_rollups(db: Session, entries: Iterable[Tuple[int, date]]) -> None:
+    """
+    Recompute the periods containing the written (habit_id, date) entries,
+    for the habits and their categories. Runs inside the caller's
+    transaction, after the progress rows are written; the caller commits.
+    """
+    days_by_habit: Dict[int, List[date]] = defaultdict(list)
+    for habit_id, day in entries:
+        days_by_habit[habit_id].append(day)
+    if not days_by_habit:
+        return
+    db.flush()
+
+    category_ranges: Dict[Tuple[int, str], Dict[str, Tuple[date, date]]] = {}
+    for habit_id, user_id, category in db.query(Habit.id, Habit.user_id, Habit.category).filter(
+        Habit.id.in_(list(days_by_habit))
+    ):
+        days = days_by_habit[habit_id]
+        ranges = {
+            granularity: (period_start(min(days), granularity), period_start(max(days), granularity))
+            for granularity in GRANULARITIES
+        }
+        _refresh_habit(db, habit_id, user_id, ranges)
+
+        merged = category_ranges.setdefault((user_id, category), {})
+        for granularity, (first, last) in ranges.items():
+            low, high = merged.get(granularity, (first, last))
+            merged[granularity] = (min(low, first), max(high, last))
+
+    for (user_id, category), ranges in category_ranges.items():
+        _refresh_category(db, user_id, category, ranges)
+
+
+def delete_habit_rollups(db: Session, habit_id: int) -> None:
+    """
+    Drop a habit's periods and take them out of its category's.
+    Call before the habit row is deleted; the caller commits.
+    """
+    user_id, category = db.query(Habit.user_id, Habit.category).filter(Habit.id == habit_id).one()
+    ranges = {
+        granularity: (first, last)
+        for granularity, first, last in db.query(
+            HabitPeriod.granularity, func.min(HabitPeriod.period_start), func.max(HabitPeriod.period_start)
+        ).filter(HabitPeriod.habit_id == habit_id).group_by(HabitPeriod.granularity)
+    }
+    db.execute(delete(HabitPeriod).where(HabitPeriod.habit_id == habit_id))
+    if ranges:
+        _refresh_category(db, user_id, category, ranges)
+
+
+def rebuild_rollups(db, user_id: Optional[int] = None) -> None:
+    """
+    Recompute every period of one user (all users if None) from progress.
+    db is a Session or a Connection (schema migration); the caller commits.
+    """
+    for model in (CategoryPeriod, HabitPeriod):
+        stale = delete(model)
+        db.execute(stale if user_id is None else stale.where(model.user_id == user_id))
+
+    for granularity, start in _PERIOD_SQL.items():
+        source = select(
+            Progress.habit_id, literal(granularity), start, Progress.user_id,
+            func.count(Progress.id), func.sum(case((Progress.completed == 1, 1), else_=0)),
+        ).group_by(Progress.habit_id, start)
+        if user_id is not None:
+            source = source.where(Progress.user_id == user_id)
+        db.execute(insert(HabitPeriod).from_select(
+            ["habit_id", "granularity", "period_start", "user_id", "total", "completed"], source
+        ))
+
+    source = select(
+        HabitPeriod.user_id, HabitPeriod.granularity, HabitPeriod.period_start, Habit.category,
+        func.sum(HabitPeriod.total), func.sum(HabitPeriod.completed),
+    ).join(Habit, Habit.id == HabitPeriod.habit_id).group_by(
+        HabitPeriod.user_id, HabitPeriod.granularity, HabitPeriod.period_start, Habit.category
+    )
+    if user_id is not None:
+        source = source.where(HabitPeriod.user_id == user_id)
+    db.execute(insert(CategoryPeriod).from_select(
+        ["user_id", "granularity", "period_start", "category", "total", "completed"], source
+    ))
+
+
+def rebuild_all_rollups(db: Session) -> int:
+    """
+    rebuild_rollups for every user, one transaction each.
+    Returns the number of habit_periods rows.
+    """
+    for (user_id,) in db.query(User.id).all():
+        rebuild_rollups(db, user_id)
+        db.commit()
+    return db.query(HabitPeriod).count()
+
+
+def check_rollups(db: Session) -> List[Dict]:
+    """
+    Compare stored habit and category periods against a recompute from
+    progress. Returns one entry per mismatching row (empty = consistent).
+    """
+    habits = {habit_id: (user_id, category) for habit_id, user_id, category in db.query(
+        Habit.id, Habit.user_id, Habit.category
+    )}
+    expected_habits: Dict[Tuple, List[int]] = {}
+    expected_categories: Dict[Tuple, List[int]] = {}
+    for habit_id, day, completed in db.query(Progress.habit_id, Progress.date, Progress.completed):
+        user_id, category = habits[habit_id]
+        for granularity in GRANULARITIES:
+            start = period_start(day, granularity)
+            for counts in (
+                expected_habits.setdefault((habit_id, granularity, start), [0, 0]),
+                expected_categories.setdefault((user_id, granularity, start, category), [0, 0]),
+            ):
+                counts[0] += 1
+                counts[1] += completed == 1
+
+    problems = []
+    for table, expected, stored in (
+        ("habit_periods", expected_habits, db.query(
+            HabitPeriod.habit_id, HabitPeriod.granularity, HabitPeriod.period_start,
+            HabitPeriod.total, HabitPeriod.completed
+        )),
+        ("category_periods", expected_categories, db.query(
+            CategoryPeriod.user_id, CategoryPeriod.granularity, CategoryPeriod.period_start,
+            CategoryPeriod.category, CategoryPeriod.total, CategoryPeriod.completed
+        )),
+    ):
+        for *key, total, completed in stored:
+            counts = expected.pop(tuple(key), None)
+            if counts != [total, completed]:
+                problems.append({"table": table, "key": key, "stored": [total, completed], "expected": counts})
+        for key, counts in expected.items():
+            problems.append({"table": table, "key": list(key), "stored": None, "expected": counts})
+    return problems
+
+
+# ---------- frequency-aware habit stats ----------
+
+class PeriodStats(NamedTuple):
+    current_streak: int  # Consecutive completed periods up to now
+    longest_streak: int
+    periods: int  # Periods with any entry
+    completed_periods: int  # Periods with a completed entry
+
+
+def get_period_stats(
+    db: Session,
+    granularities: Dict[int, str],
+    today: Optional[date] = None
+) -> Dict[int, PeriodStats]:
+    """
+    Streaks and period counts of habits measured in their own periods
+    (habit_id -> "week" / "month"). The current period is still open, so
+    while it isn't completed the current streak runs up to the one before.
+    """
+    if not granularities:
+        return {}
+    today = today or date.today()
+    rows = db.query(
+        HabitPeriod.habit_id, HabitPeriod.granularity, HabitPeriod.period_start, HabitPeriod.completed
+    ).filter(
+        HabitPeriod.habit_id.in_(list(granularities)),
+        HabitPeriod.granularity.in_(set(granularities.values()))
+    ).order_by(HabitPeriod.habit_id, HabitPeriod.period_start)
+
+    periods: Dict[int, List[Tuple[date, int]]] = defaultdict(list)
+    for habit_id, granularity, start, completed in rows:
+        if granularity == granularities[habit_id]:
+            periods[habit_id].append((start, completed))
+
+    stats = {}
+    for habit_id, granularity in granularities.items():
+        done = [start for start, completed in periods.get(habit_id, ()) if completed > 0]
+
+        longest = run = 0
+        previous = None
+        for start in done:
+            run = run + 1 if previous is not None and next_period(previous, granularity) == start else 1
+            longest = max(longest, run)
+            previous = start
+
+        done_set = set(done)
+        current, cursor = 0, period_start(today, granularity)
+        if cursor not in done_set:
+            cursor = period_start(cursor - timedelta(days=1), granularity)
+        while cursor in done_set:
+            current += 1
+            cursor = period_start(cursor - timedelta(days=1), granularity)
+
+        stats[habit_id] = PeriodStats(current, longest, len(periods.get(habit_id, ())), len(done))
+    return stats
+
+
+# ---------- trends ----------
+
+TREND_GRANULARITIES = ("day", "week", "month", "year")
+MAX_TREND_PERIODS = 3660
+RANGE_PATTERN = r"^([1-9][0-9]{0,3})([dwmy])$"  # e.g. 90d, 26w, 12m, 3y
+
+
+def _range_back(today: date, range_: str) -> date:
+    # today minus the range; months are clamped to the month's length
+    amount, unit = re.match(RANGE_PATTERN, range_).groups()
+    amount = int(amount)
+    if unit == "d":
+        return today - timedelta(days=amount)
+    if unit == "w":
+        return today - timedelta(weeks=amount)
+    year, month = divmod(today.year * 12 + today.month - 1 - amount * (12 if unit == "y" else 1), 12)
+    first = date(year, month + 1, 1)
+    month_length = (next_period(first, "month") - first).days
+    return first.replace(day=min(today.day, month_length))
+
+
+def get_trend(
+    db: Session,
+    user_id: int,
+    granularity: str = "week",
+    range_: str = "26w",
+    habit_id: Optional[int] = None,
+    category: Optional[str] = None
+) -> Dict:
+    """
+    Entries, completions and success rate of the periods starting after
+    today minus range_ (12m = this month and the 11 before), zero-filled,
+    from the rollups. Years are summed from months.
+
+    Covers the whole user, one habit (habit_id) or one category; the
+    user-wide form also breaks every period down by category. Raises
+    ValueError when the range holds more than MAX_TREND_PERIODS.
+    """
+    today = date.today()
+    first = next_period(period_start(_range_back(today, range_), granularity), granularity)
+    last = period_start(today, granularity)
+
+    buckets: Dict[date, Dict] = {}
+    cursor = first
+    while cursor <= last:
+        if len(buckets) == MAX_TREND_PERIODS:
+            raise ValueError(f"range holds more than {MAX_TREND_PERIODS} {granularity} periods")
+        buckets[cursor] = {"total": 0, "completed": 0}
+        cursor = next_period(cursor, granularity)
+
+    stored = "month" if granularity == "year" else granularity
+    if habit_id is not None:
+        model = HabitPeriod
+        rows = db.query(HabitPeriod.period_start, literal(None), HabitPeriod.total, HabitPeriod.completed).filter(
+            HabitPeriod.habit_id == habit_id
+        )
+    else:
+        model = CategoryPeriod
+        rows = db.query(CategoryPeriod.period_start, CategoryPeriod.category, CategoryPeriod.total, CategoryPeriod.completed).filter(
+            CategoryPeriod.user_id == user_id
+        )
+        if category is not None:
+            rows = rows.filter(CategoryPeriod.category == category)
+    # Stored periods starting in [first, the end of last): for years, the
+    # months of the current year after January too
+    rows = rows.filter(
+        model.granularity == stored,
+        model.period_start >= first,
+        model.period_start < next_period(last, granularity)
+    )
+
+    breakdown = habit_id is None and category is None
+    for start, row_category, total, completed in rows:
+        bucket = buckets[period_start(start, granularity)]
+        bucket["total"] += total
+        bucket["completed"] += completed
+        if breakdown:
+            counts = bucket.setdefault("categories", {}).setdefault(row_category, {"total": 0, "completed": 0})
+            counts["total"] += total
+            counts["completed"] += completed
+
+    periods = []
+    for start, bucket in buckets.items():
+        period = {
+            "start": start.isoformat(),
+            "total": bucket["total"],
+            "completed": bucket["completed"],
+            "success_rate": round(bucket["completed"] / bucket["total"] * 100, 2) if bucket["total"] else 0.0,
+        }
+        if breakdown:
+            period["categories"] = bucket.get("categories", {})
+        periods.append(period)
+
+    return {"granularity": granularity, "range": range_, "periods": periods}
+
+
+def get_category_trend(db: Session, user_id: int, days: int = 30) -> Dict:
+    """
+    Entries and completions per category for each of the last `days`
+    days (today included), zero-filled. Days without entries have no
+    categories.
+    """
+    end_date = date.today()
+    start_date = end_date - timedelta(days=days - 1)
+    rows = db.query(CategoryPeriod.period_start, CategoryPeriod.category, CategoryPeriod.total, CategoryPeriod.completed).filter(
+        CategoryPeriod.user_id == user_id,
+        CategoryPeriod.granularity == "day",
+        CategoryPeriod.period_start >= start_date,
+        CategoryPeriod.period_start <= end_date
+    )
+
+    by_day = {start_date + timedelta(days=offset): {} for offset in range(days)}
+    for day, category, total, completed in rows:
+        by_day[day][category] = {"total": total, "completed": completed}
+
+    return {
+        "days": [{"date": day.isoformat(), "categories": categories} for day, categories in by_day.items()]
+    }
+
+
+if __name__ == "__main__":
+    # python rollups.py rebuild | check
+    import sys
+    from database import SessionLocal
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    db = SessionLocal()
+    try:
+        if command == "rebuild":
+            print(f"Rebuilt rollups: {rebuild_all_rollups(db)} habit periods")
+        elif command == "check":
+            problems = check_rollups(db)
+            for problem in problems[:50]:
+                print(problem)
+            print("Rollups are consistent" if not problems else f"{len(problems)} problem(s)")
+            sys.exit(1 if problems else 0)
+        else:
+            sys.exit("usage: python rollups.py [rebuild|check]")
+    finally:
+        db.close()
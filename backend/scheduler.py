@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from datetime import datetime, time as time_of_day, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from instrumentation import Histogram
+
+# =========================
+# BACKGROUND JOBS
+# =========================
+# Periodic maintenance off the request path. Every job gets an asyncio
+# task in the app's event loop that sleeps until the job is due and runs
+# it (synchronous, like the rest of the data layer) in a worker thread,
+# retrying failures with exponential backoff. Started and stopped by the
+# FastAPI lifespan (main.py); the jobs themselves are in jobs.py.
+
+logger = logging.getLogger("habit_hero.jobs")
+
+# Histogram bucket upper bounds, seconds
+JOB_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class Job:
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        every: Optional[float] = None,
+        at: Optional[time_of_day] = None,
+        run_on_start: bool = False,
+        retries: int = 2,
+        retry_delay: float = 5.0
+    ):
+        """
+        Runs func every `every` seconds, or daily at local time `at`.
+        A failed run is retried `retries` times, waiting retry_delay,
+        then twice as long, and so on.
+        """
+        if (every is None) == (at is None):
+            raise ValueError("A job needs exactly one of every / at")
+        self.name = name
+        self.func = func
+        self.every = every
+        self.at = at
+        self.run_on_start = run_on_start
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+        self.runs = 0
+        self.failures = 0  # Runs that failed after all retries
+        self.retried = 0
+        self.running = False
+        self.next_run: Optional[datetime] = None
+        self.last_started: Optional[datetime] = None
+        self.last_duration: Optional[float] = None  # seconds
+        self.last_status: Optional[str] = None  # "ok" / "failed"
+        self.last_error: Optional[str] = None
+        self.last_result: Any = None
+        self.durations = Histogram(JOB_BUCKETS)
+        self._lock = threading.Lock()  # One run at a time (schedule vs manual trigger)
+
+    def next_after(self, now: datetime) -> datetime:
+        if self.every is not None:
+            return now + timedelta(seconds=self.every)
+        due = datetime.combine(now.date(), self.at)
+        return due if due > now else due + timedelta(days=1)
+
+    def run(self) -> Dict:
+        """
+        One run with retries, in the calling thread. Returns status().
+        """
+        with self._lock:
+            self.running = True
+            self.last_started = datetime.now()
+            start = time.perf_counter()
+            attempt = 0
+            try:
+                while True:
+                    try:
+                        self.last_result = self.func()
+                        self.last_status, self.last_error = "ok", None
+                        break
+                    except Exception as exc:
+                        self.last_error = f"{type(exc).__name__}: {exc}"
+                        logger.warning("job %s attempt %d failed: %s", self.name, attempt + 1, self.last_error)
+                        if attempt >= self.retries:
+                            self.last_status = "failed"
+                            self.failures += 1
+                            break
+                        time.sleep(self.retry_delay * 2 ** attempt)
+                        attempt += 1
+                        self.retried += 1
+            finally:
+                self.last_duration = time.perf_counter() - start
+                self.durations.observe(self.last_duration)
+                self.runs += 1
+                self.running = False
+
+        logger.info(json.dumps({
+            "job": self.name,
+            "status": self.last_status,
+            "attempts": attempt + 1,
+            "duration_ms": round(self.last_duration * 1000, 2),
+            "result": self.last_result,
+        }, default=str))
+        return self.status()
+
+    def status(self) -> Dict:
+        return {
+            "name": self.name,
+            "schedule": f"every {self.every:g}s" if self.every is not None else f"daily at {self.at.isoformat()}",
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "retries": self.retried,
+            "last_status": self.last_status,
+            "last_started": self.last_started.isoformat(timespec="seconds") if self.last_started else None,
+            "last_duration_ms": round(self.last_duration * 1000, 2) if self.last_duration is not None else None,
+            "last_error": self.last_error,
+            "last_result": self.last_result,
+            "next_run": self.next_run.isoformat(timespec="seconds") if self.next_run else None,
+        }
+
+
+class Scheduler:
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def add(self, job: Job) -> Job:
+        self.jobs[job.name] = job
+        return job
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def _loop(self, job: Job) -> None:
+        if job.run_on_start:
+            await asyncio.to_thread(job.run)
+        while True:
+            job.next_run = job.next_after(datetime.now())
+            await asyncio.sleep(max((job.next_run - datetime.now()).total_seconds(), 0))
+            await asyncio.to_thread(job.run)
+
+    def start(self) -> None:
+        """
+        Schedule every job on the running event loop.
+        """
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._loop(job), name=f"job:{job.name}")
+                for job in self.jobs.values()
+            ]
+
+    async def stop(self) -> None:
+        # A run already in its worker thread finishes on its own
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job in self.jobs.values():
+            job.next_run = None
+
+    async def run_now(self, name: str) -> Dict:
+        return await asyncio.to_thread(self.jobs[name].run)
+
+    def status(self) -> Dict:
+        return {
+            "running": self.running,
+            "jobs": [job.status() for job in self.jobs.values()],
+        }
+
+    def render_metrics(self) -> str:
+        """
+        Job run-time histograms and failure counters, Prometheus text format.
+        """
+        lines = [
+            "# HELP habit_hero_job_duration_seconds Background job run time, retries included",
+            "# TYPE habit_hero_job_duration_seconds histogram",
+        ]
+        for job in self.jobs.values():
+            lines += job.durations.lines("habit_hero_job_duration_seconds", f'job="{job.name}"')
+        for name, attribute, help_text in (
+            ("habit_hero_job_failures_total", "failures", "Job runs that failed after all retries"),
+            ("habit_hero_job_retries_total", "retried", "Job attempts retried after an error"),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for job in self.jobs.values():
+                lines.append(f'{name}{{job="{job.name}"}} {getattr(job, attribute)}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,201 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+# =========================
+# SCHEMA MIGRATIONS
+# =========================
+# create_all() only creates missing tables, so indexes and constraints added
+# to existing tables are applied here. The applied version is stored in
+# SQLite's PRAGMA user_version; every step must be safe to run on a fresh
+# database that create_all() already built.
+
+
+def _progress_indexes(conn) -> None:
+    # Keep the newest entry when a habit has several rows for the same day,
+    # otherwise the unique index cannot be created
+    conn.execute(text("""
+        DELETE FROM progress WHERE id NOT IN (
+            SELECT MAX(id) FROM progress GROUP BY habit_id, date
+        )
+    """))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_progress_habit_date "
+        "ON progress (habit_id, date)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_progress_date_completed "
+        "ON progress (date, completed)"
+    ))
+    # Counts may have included removed duplicates; rows refill lazily
+    conn.execute(text("DELETE FROM habit_stats"))
+
+
+def _user_tenancy(conn) -> None:
+    # users itself comes from create_all(); everything existing so far
+    # belongs to the default user
+    conn.execute(text("INSERT OR IGNORE INTO users (id, name) VALUES (1, 'default')"))
+    for table in ("habits", "progress"):
+        columns = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))}
+        if "user_id" not in columns:
+            # No REFERENCES clause: SQLite rejects it with a non-NULL default
+            # when foreign keys are enforced
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN user_id INTEGER NOT NULL DEFAULT 1"))
+
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_habits_user ON habits (user_id)"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_habits_user_category ON habits (user_id, category)"
+    ))
+    # Replaced by the user-led index
+    conn.execute(text("DROP INDEX IF EXISTS ix_progress_date_completed"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_progress_user_date_completed "
+        "ON progress (user_id, date, completed)"
+    ))
+
+
+def _progress_mood(conn) -> None:
+    columns = {row[1] for row in conn.execute(text("PRAGMA table_info(progress)"))}
+    if "mood" not in columns:
+        conn.execute(text("ALTER TABLE progress ADD COLUMN mood VARCHAR"))
+
+    # Classify the notes already stored (imported here: moods pulls in the
+    # models and AI rules, which this module otherwise doesn't need)
+    from moods import backfill_moods
+    backfill_moods(conn)
+
+
+def _habit_name_index(conn) -> None:
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_habits_user_name_lower ON habits (user_id, lower(name))"
+    ))
+
+
+def _period_rollups(conn) -> None:
+    # Replaced by category_periods (granularity "day")
+    conn.execute(text("DROP TABLE IF EXISTS category_days"))
+
+    # Fill habit_periods / category_periods from the existing progress
+    from rollups import rebuild_rollups
+    rebuild_rollups(conn)
+
+
+def _change_log(conn) -> None:
+    # changes itself comes from create_all(); log what exists, so a client
+    # syncing from seq 0 receives everything
+    from change_log import log_existing
+    log_existing(conn)
+
+
+MIGRATIONS = [
+    _progress_indexes,  # version 1
+    _user_tenancy,  # version 2
+    _progress_mood,  # version 3
+    _habit_name_index,  # version 4
+    _period_rollups,  # version 5
+    _change_log,  # version 6
+]
+
+
+def get_version(conn) -> int:
+    return conn.execute(text("PRAGMA user_version")).scalar()
+
+
+def migrate(engine: Engine) -> int:
+    """
+    Apply pending migrations in order. Returns the resulting version.
+    """
+    with engine.begin() as conn:
+        version = get_version(conn)
+        for step in MIGRATIONS[version:]:
+            step(conn)
+            version += 1
+            conn.execute(text(f"PRAGMA user_version = {version}"))
+    return version
+
+
+# =========================
+# QUERY PLAN CHECKS
+# =========================
+# Hot lookups that must be served by an index. A plan line starting with
+# "SCAN progress", "SCAN habits" or "SCAN changes" means SQLite walks the whole table.
+
+HOT_QUERIES = {
+    "progress by habit and date": (
+        "SELECT * FROM progress WHERE habit_id = :habit_id AND date = :date",
+        {"habit_id": 1, "date": "2025-01-01"},
+    ),
+    "progress history of a habit": (
+        "SELECT * FROM progress WHERE habit_id = :habit_id ORDER BY date",
+        {"habit_id": 1},
+    ),
+    "page of a habit's progress": (
+        "SELECT * FROM progress WHERE habit_id = :habit_id AND date > :after ORDER BY date LIMIT 101",
+        {"habit_id": 1, "after": "2025-01-01"},
+    ),
+    "completed habits on a date": (
+        "SELECT DISTINCT habit_id FROM progress WHERE user_id = :user_id AND date = :date AND completed = 1",
+        {"user_id": 1, "date": "2025-01-01"},
+    ),
+    "completions per day in a range": (
+        "SELECT date, COUNT(*) FROM progress "
+        "WHERE user_id = :user_id AND date BETWEEN :start AND :end AND completed = 1 GROUP BY date",
+        {"user_id": 1, "start": "2025-01-01", "end": "2025-01-31"},
+    ),
+    "a user's moods per habit and week": (
+        "SELECT habit_id, date(date, 'weekday 0', '-6 days') AS week, mood, COUNT(*) FROM progress "
+        "WHERE user_id = :user_id AND date >= :start AND date < :end AND mood IS NOT NULL "
+        "GROUP BY habit_id, week, mood",
+        {"user_id": 1, "start": "2025-01-06", "end": "2025-03-31"},
+    ),
+    "a user's history": (
+        "SELECT habit_id, date, completed FROM progress WHERE user_id = :user_id",
+        {"user_id": 1},
+    ),
+    "a user's habit names": (
+        "SELECT lower(name) FROM habits WHERE user_id = :user_id",
+        {"user_id": 1},
+    ),
+    "a user's changes after a seq": (
+        "SELECT * FROM changes WHERE user_id = :user_id AND seq > :since ORDER BY seq LIMIT 1001",
+        {"user_id": 1, "since": 0},
+    ),
+    "progress changed in a range of seqs": (
+        "SELECT DISTINCT progress.* FROM progress JOIN changes "
+        "ON changes.habit_id = progress.habit_id AND changes.date = progress.date "
+        "WHERE changes.user_id = :user_id AND changes.seq > :since AND changes.seq <= :seq "
+        "AND changes.entity = 'progress' AND progress.user_id = :user_id",
+        {"user_id": 1, "since": 0, "seq": 1000},
+    ),
+}
+
+
+def check_query_plans(engine: Engine) -> dict:
+    """
+    EXPLAIN QUERY PLAN every hot query.
+    Returns {name: plan lines} for the queries that full-scan a table.
+    """
+    regressions = {}
+    with engine.connect() as conn:
+        for name, (sql, params) in HOT_QUERIES.items():
+            plan = [row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql), params)]
+            if any(line.startswith(("SCAN progress", "SCAN habits", "SCAN changes")) for line in plan):
+                regressions[name] = plan
+    return regressions
+
+
+if __name__ == "__main__":
+    # python schema.py migrate | check-plans
+    import sys
+    from database import engine
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "migrate"
+    if command == "migrate":
+        print(f"Schema version: {migrate(engine)}")
+    elif command == "check-plans":
+        regressions = check_query_plans(engine)
+        for name, plan in regressions.items():
+            print(f"{name}: {' | '.join(plan)}")
+        print("All hot queries use an index" if not regressions else f"{len(regressions)} query plan regression(s)")
+        sys.exit(1 if regressions else 0)
+    else:
+        sys.exit("usage: python schema.py [migrate|check-plans]")
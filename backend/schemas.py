@@ -1,6 +1,17 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date
-from typing import Optional
+from typing import Literal, Optional, List
+
+# For creating a user (POST /users/)
+class UserCreate(BaseModel):
+    name: str
+
+class UserResponse(BaseModel):
+    id: int
+    name: str
+
+    class Config:
+        from_attributes = True
 
 # For creating a habit
 class HabitCreate(BaseModel):
@@ -55,3 +66,66 @@ class HabitWithStatsResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+# For bulk progress ingestion (POST /progress/bulk)
+class ProgressBulkItem(BaseModel):
+    habit_id: int
+    date: date
+    completed: int = 1
+    notes: Optional[str] = None
+
+class ProgressBulkRequest(BaseModel):
+    items: List[ProgressBulkItem] = Field(..., max_length=50000)
+
+class ProgressBulkResult(BaseModel):
+    index: int  # Position in the request
+    habit_id: int
+    date: date
+    status: str  # "inserted", "updated" or "error"
+    detail: Optional[str] = None
+
+class ProgressBulkResponse(BaseModel):
+    inserted: int
+    updated: int
+    failed: int
+    results: List[ProgressBulkResult]
+
+# For offline sync (GET /sync, POST /sync). Optional fields named "date"
+# would shadow the type with their default, so these use an alias
+DateType = date
+
+class SyncChangesResponse(BaseModel):
+    since: int
+    seq: int  # Pass as since for the next call
+    more: bool
+    deleted_habits: List[int]  # Apply first: their progress goes too
+    habits: List[HabitResponse]
+    progress: List[ProgressResponse]
+
+class SyncOperationItem(BaseModel):
+    op_id: str = Field(..., min_length=1, max_length=128)  # Client-generated, unique per user
+    type: Literal["progress", "create_habit", "delete_habit"]
+    habit: Optional[HabitCreate] = None  # create_habit
+    habit_id: Optional[int] = None  # progress / delete_habit
+    habit_op_id: Optional[str] = None  # Or the op_id of the habit's create_habit
+    completed: int = 1  # progress
+    notes: Optional[str] = None
+    date: Optional[DateType] = None
+
+class SyncRequest(BaseModel):
+    operations: List[SyncOperationItem] = Field(..., max_length=1000)
+
+class SyncOperationResult(BaseModel):
+    op_id: str
+    type: str
+    status: str  # "applied", "duplicate" (applied by an earlier request) or "error"
+    habit_id: Optional[int] = None
+    date: Optional[DateType] = None
+    completed: Optional[int] = None
+    detail: Optional[str] = None
+
+class SyncResponse(BaseModel):
+    applied: int
+    duplicates: int
+    failed: int
+    results: List[SyncOperationResult]
@@ -0,0 +1,406 @@
+from collections import defaultdict
+from typing import List, Dict, Iterable, Optional, Tuple
+from sqlalchemy import func, case, or_, tuple_
+from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from models import Habit, Progress, HabitStats
+from streaks import get_streaks
+from completion_index import completion_index
+from rollups import FREQUENCY_PERIODS, get_period_stats
+
+# =========================
+# HABIT STATS (materialized)
+# =========================
+
+STAT_FIELDS = ("total", "completed", "current_streak", "longest_streak", "last_completed_date")
+RUN_CHUNK = 64  # Days read per step when walking a run of completed days
+
+
+def _compute_stats(
+    db: Session,
+    habit_ids: Optional[Iterable[int]] = None,
+    today: Optional[date] = None
+) -> Dict[int, Dict]:
+    """
+    Full recompute from the progress table (all habits if habit_ids is None).
+    """
+    today = today or date.today()
+
+    habits = db.query(Habit.id)
+    counts = db.query(
+        Progress.habit_id,
+        func.count(Progress.id),
+        func.sum(case((Progress.completed == 1, 1), else_=0)),
+        func.max(case((Progress.completed == 1, Progress.date))),
+    )
+    if habit_ids is not None:
+        habit_ids = list(habit_ids)
+        habits = habits.filter(Habit.id.in_(habit_ids))
+        counts = counts.filter(Progress.habit_id.in_(habit_ids))
+
+    counts = {row[0]: row[1:] for row in counts.group_by(Progress.habit_id).all()}
+    streaks = get_streaks(db, habit_ids, today)
+
+    stats = {}
+    for (habit_id,) in habits.all():
+        total, completed, last_completed = counts.get(habit_id, (0, 0, None))
+        current, longest = streaks.get(habit_id, (0, 0))
+
+        stats[habit_id] = {
+            "habit_id": habit_id,
+            "total": total,
+            "completed": completed or 0,
+            "current_streak": current,
+            "longest_streak": longest,
+            "last_completed_date": last_completed,
+            "as_of": today,
+        }
+
+    return stats
+
+
+def refresh_habit_stats(db: Session, habit_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Recompute the habit_stats rows of the given habits (all if None).
+    Runs inside the caller's transaction; the caller commits.
+    """
+    if habit_ids is not None:
+        habit_ids = list(habit_ids)
+
+    # Make pending writes visible to the recompute (autoflush is off)
+    db.flush()
+
+    # Deleted before computing: the DELETE takes the write lock, so no
+    # other writer's progress lands between the recompute and the insert
+    stale = db.query(HabitStats)
+    if habit_ids is not None:
+        stale = stale.filter(HabitStats.habit_id.in_(habit_ids))
+    stale.delete(synchronize_session=False)
+
+    stats = _compute_stats(db, habit_ids)
+    db.bulk_insert_mappings(HabitStats, list(stats.values()))
+
+
+def read_completions(db: Session, keys: Iterable[Tuple[int, date]]) -> Dict[Tuple[int, date], int]:
+    """
+    completed of the existing progress rows among (habit_id, date) keys,
+    read before a write overwrites them (for apply_progress_writes); keys
+    without a row are left out. Read after the write has taken the lock
+    (log_progress first), so a concurrent writer can't change them before
+    the caller commits.
+    """
+    keys = set(keys)
+    if not keys:
+        return {}
+    return {
+        (habit_id, day): completed or 0
+        for habit_id, day, completed in db.query(Progress.habit_id, Progress.date, Progress.completed).filter(
+            tuple_(Progress.habit_id, Progress.date).in_(keys)
+        )
+    }
+
+
+def _run_length(db: Session, habit_id: int, start: date, step: int) -> int:
+    # Consecutive completed days from start on, backwards (step=-1) or
+    # forwards (step=1): a walk along uq_progress_habit_date that stops
+    # at the first gap, so it costs the run's length, not the history's
+    order = Progress.date.desc() if step < 0 else Progress.date.asc()
+    length, expected = 0, start
+    while True:
+        beyond = Progress.date <= expected if step < 0 else Progress.date >= expected
+        days = [day for (day,) in db.query(Progress.date).filter(
+            Progress.habit_id == habit_id, Progress.completed == 1, beyond
+        ).order_by(order).limit(RUN_CHUNK)]
+        for day in days:
+            if day != expected:
+                return length
+            length += 1
+            expected += timedelta(days=step)
+        if len(days) < RUN_CHUNK:
+            return length
+
+
+def _last_completed(db: Session, habit_id: int) -> Optional[date]:
+    return db.query(Progress.date).filter(
+        Progress.habit_id == habit_id, Progress.completed == 1
+    ).order_by(Progress.date.desc()).limit(1).scalar()
+
+
+def apply_progress_writes(
+    db: Session,
+    writes: Iterable[Tuple[int, date, Optional[int], int]],
+    today: Optional[date] = None
+) -> None:
+    """
+    Update the habit_stats rows of upserted progress rows from the change,
+    inside the caller's transaction (the caller commits).
+
+    writes: (habit_id, date, completed before the write or None for a new
+    row, completed after), in write order. Counts and the last completed
+    day move by the difference. A day that became completed extends or
+    joins the runs next to it, measured by walking them. A day that
+    stopped being completed splits its run: current_streak is cut, and
+    longest_streak only needs a full recompute if that run was the longest.
+    Weekly / monthly habits read their streaks from the rollups, which the
+    caller refreshed first. Habits without a row for today are recomputed.
+    """
+    today = today or date.today()
+    # Net change per row: first value before, last value after
+    changes: Dict[int, Dict[date, List]] = defaultdict(dict)
+    for habit_id, day, before, after in writes:
+        change = changes[habit_id].setdefault(day, [before, after])
+        change[1] = after
+    if not changes:
+        return
+
+    # Make the writes visible to the walks below (autoflush is off)
+    db.flush()
+    rows = {
+        row.habit_id: row
+        for row in db.query(HabitStats).populate_existing().filter(HabitStats.habit_id.in_(list(changes)))
+    }
+    periods = {
+        habit_id: FREQUENCY_PERIODS[frequency]
+        for habit_id, frequency in db.query(Habit.id, Habit.frequency).filter(
+            Habit.id.in_(list(changes)), Habit.frequency.in_(list(FREQUENCY_PERIODS))
+        )
+    }
+    period_stats = get_period_stats(db, periods, today) if periods else {}
+
+    recompute = []
+    for habit_id, days in changes.items():
+        row = rows.get(habit_id)
+        if row is None or row.as_of != today:
+            recompute.append(habit_id)
+            continue
+
+        done = [day for day, (before, after) in days.items() if before != 1 and after == 1]
+        undone = [day for day, (before, after) in days.items() if before == 1 and after != 1]
+        row.total += sum(1 for before, _ in days.values() if before is None)
+        row.completed += len(done) - len(undone)
+
+        if row.last_completed_date in undone:
+            row.last_completed_date = _last_completed(db, habit_id)
+        elif done:
+            row.last_completed_date = max(filter(None, [row.last_completed_date, *done]))
+
+        if habit_id in periods:
+            stats = period_stats[habit_id]
+            row.current_streak, row.longest_streak = stats.current_streak, stats.longest_streak
+            continue
+        if undone and (done or len(undone) > 1):
+            # Runs were split and changed elsewhere in one batch: the
+            # pieces no longer tell the old lengths
+            recompute.append(habit_id)
+            continue
+
+        for day in done:
+            # The run now holding day, with the state after every write
+            first = day - timedelta(days=_run_length(db, habit_id, day - timedelta(days=1), -1))
+            last = day + timedelta(days=_run_length(db, habit_id, day + timedelta(days=1), 1))
+            row.longest_streak = max(row.longest_streak, (last - first).days + 1)
+            if first <= today <= last:
+                row.current_streak = (today - first).days + 1
+
+        if undone:
+            day = undone[0]
+            left = _run_length(db, habit_id, day - timedelta(days=1), -1)
+            right = _run_length(db, habit_id, day + timedelta(days=1), 1)
+            if left + 1 + right >= row.longest_streak:
+                recompute.append(habit_id)  # Another run may be as long
+            elif day <= today <= day + timedelta(days=right):
+                row.current_streak = (today - day).days
+
+    if recompute:
+        # Drop the half-updated rows, or flushing them would undo the recompute
+        for habit_id in recompute:
+            if habit_id in rows:
+                db.expunge(rows[habit_id])
+        refresh_habit_stats(db, recompute)
+
+
+def delete_habit_stats(db: Session, habit_id: int) -> None:
+    db.query(HabitStats).filter(HabitStats.habit_id == habit_id).delete()
+
+
+def load_habit_stats(db: Session, user_id: int) -> Dict[int, HabitStats]:
+    """
+    The user's habit_stats rows keyed by habit_id.
+
+    Rows that are missing (habit created before the table existed, or with
+    no progress yet) or whose current streak was computed on an earlier
+    day are refreshed first, in one batch.
+    """
+    today = date.today()
+    missing = db.query(Habit.id).outerjoin(
+        HabitStats, HabitStats.habit_id == Habit.id
+    ).filter(
+        Habit.user_id == user_id,
+        or_(HabitStats.habit_id.is_(None), HabitStats.as_of != today)
+    ).all()
+
+    if missing:
+        refresh_habit_stats(db, [habit_id for (habit_id,) in missing])
+        db.commit()
+
+    rows = db.query(HabitStats).join(Habit, Habit.id == HabitStats.habit_id).filter(
+        Habit.user_id == user_id
+    )
+    return {row.habit_id: row for row in rows}
+
+
+def close_out_streaks(db: Session, batch_size: int = 500) -> int:
+    """
+    Refresh every habit_stats row computed before today, and create the
+    missing ones, batch_size habits per transaction, so the first request
+    of the day doesn't. Returns the number of habits refreshed.
+    """
+    today = date.today()
+    stale = [habit_id for (habit_id,) in db.query(Habit.id).outerjoin(
+        HabitStats, HabitStats.habit_id == Habit.id
+    ).filter(
+        or_(HabitStats.habit_id.is_(None), HabitStats.as_of != today)
+    )]
+
+    for start in range(0, len(stale), batch_size):
+        refresh_habit_stats(db, stale[start:start + batch_size])
+        db.commit()
+    return len(stale)
+
+
+def rebuild_habit_stats(db: Session) -> int:
+    """
+    Drop and recompute every habit_stats row. Returns the row count.
+    """
+    db.query(HabitStats).delete()
+    refresh_habit_stats(db)
+    db.commit()
+    return db.query(HabitStats).count()
+
+
+def check_habit_stats(db: Session) -> List[Dict]:
+    """
+    Compare stored habit_stats against a full recompute.
+    Returns one entry per mismatching habit (empty list = consistent).
+    """
+    stored = {row.habit_id: row for row in db.query(HabitStats).all()}
+    mismatches = []
+
+    for habit_id, expected in _compute_stats(db).items():
+        row = stored.pop(habit_id, None)
+        if row is None:
+            mismatches.append({"habit_id": habit_id, "problem": "missing"})
+            continue
+
+        # A row computed on an earlier day is only stale, not wrong
+        fields = STAT_FIELDS if row.as_of == expected["as_of"] else STAT_FIELDS[:2]
+        diff = {
+            field: {"stored": getattr(row, field), "expected": expected[field]}
+            for field in fields
+            if getattr(row, field) != expected[field]
+        }
+        if diff:
+            mismatches.append({"habit_id": habit_id, "problem": "mismatch", "fields": diff})
+
+    for habit_id in stored:
+        mismatches.append({"habit_id": habit_id, "problem": "orphaned"})
+
+    return mismatches
+
+
+# =========================
+# HABIT LIST
+# =========================
+
+HABIT_COLUMNS = ("id", "name", "frequency", "category", "start_date")
+HABIT_STAT_COLUMNS = ("current_streak", "success_rate", "completed_today")
+HABIT_LIST_FIELDS = HABIT_COLUMNS + HABIT_STAT_COLUMNS
+
+
+def get_habits_with_stats(
+    db: Session,
+    user_id: int,
+    selected_date: date,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+    habit_ids: Optional[List[int]] = None
+) -> List[Dict]:
+    """
+    The user's habits with stats (HabitWithStatsResponse shape), ordered by id.
+    Counts, streaks and the selected day come from the in-memory
+    completion index, so the only query is the habit list itself.
+
+    after_id / limit select a keyset page (limit rows with id > after_id);
+    fields restricts the keys returned (id is always included), and only
+    the columns and stats it names are read or computed; habit_ids
+    restricts the rows to those habits. Weekly / monthly habits count
+    their streak and success rate in weeks / months, read from the period
+    rollups in one extra query.
+    """
+    fields = ["id"] + [name for name in fields if name != "id"] if fields else list(HABIT_LIST_FIELDS)
+    stat_fields = [name for name in fields if name in HABIT_STAT_COLUMNS]
+    if stat_fields:
+        completion_index.ensure_loaded(db, user_id)
+
+    # id is the page key and the index lookup key; stats depend on frequency
+    columns = [name for name in fields if name in HABIT_COLUMNS]
+    if stat_fields and "frequency" not in columns:
+        columns.append("frequency")
+    query = db.query(*[getattr(Habit, name) for name in columns]).filter(
+        Habit.user_id == user_id
+    ).order_by(Habit.id)
+    if after_id is not None:
+        query = query.filter(Habit.id > after_id)
+    if habit_ids is not None:
+        query = query.filter(Habit.id.in_(habit_ids))
+    if limit is not None:
+        query = query.limit(limit)
+    today = date.today()
+
+    rows = query.all()
+    period_stats = get_period_stats(db, {
+        row.id: FREQUENCY_PERIODS[row.frequency]
+        for row in rows if row.frequency in FREQUENCY_PERIODS
+    }, today) if {"current_streak", "success_rate"} & set(stat_fields) else {}
+
+    response = []
+    for row in rows:
+        habit = dict(zip(columns, row))
+        periods = period_stats.get(row.id)
+        if "current_streak" in stat_fields:
+            habit["current_streak"] = (
+                periods.current_streak if periods else completion_index.current_streak(user_id, row.id, today)
+            )
+        if "success_rate" in stat_fields:
+            total, completed = (
+                (periods.periods, periods.completed_periods) if periods else completion_index.counts(user_id, row.id)
+            )
+            habit["success_rate"] = round((completed / total) * 100, 2) if total > 0 else 0.0
+        if "completed_today" in stat_fields:
+            habit["completed_today"] = completion_index.completed_on(user_id, row.id, selected_date)
+        response.append({name: habit[name] for name in fields})
+
+    return response
+
+
+if __name__ == "__main__":
+    # python stats.py rebuild | check
+    import sys
+    from database import SessionLocal
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    db = SessionLocal()
+    try:
+        if command == "rebuild":
+            print(f"Rebuilt habit_stats: {rebuild_habit_stats(db)} rows")
+        elif command == "check":
+            problems = check_habit_stats(db)
+            for problem in problems:
+                print(problem)
+            print("habit_stats is consistent" if not problems else f"{len(problems)} problem(s)")
+            sys.exit(1 if problems else 0)
+        else:
+            sys.exit("usage: python stats.py [rebuild|check]")
+    finally:
+        db.close()
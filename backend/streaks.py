@@ -0,0 +1,90 @@
+from typing import Dict, Iterable, NamedTuple, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from datetime import date
+from models import Habit, Progress
+from rollups import FREQUENCY_PERIODS, get_period_stats
+
+
+class Streak(NamedTuple):
+    # In days; in weeks / months for weekly / monthly habits (rollups.py)
+    current: int  # consecutive completed days ending today
+    longest: int  # longest run of completed days ever
+
+
+def _completion_runs(db: Session, habit_ids: Optional[Iterable[int]] = None):
+    """
+    Runs of consecutive completed days as (habit_id, first_day, last_day, length).
+
+    Gaps-and-islands: within one habit, julianday(date) - row_number() is
+    constant across consecutive dates, so grouping on it yields one row
+    per run in a single query.
+    """
+    days = select(Progress.habit_id, Progress.date).where(Progress.completed == 1)
+    if habit_ids is not None:
+        days = days.where(Progress.habit_id.in_(list(habit_ids)))
+    days = days.distinct().subquery()
+
+    numbered = select(
+        days.c.habit_id,
+        days.c.date,
+        (
+            func.julianday(days.c.date)
+            - func.row_number().over(
+                partition_by=days.c.habit_id,
+                order_by=days.c.date
+            )
+        ).label("island"),
+    ).subquery()
+
+    return db.execute(
+        select(
+            numbered.c.habit_id,
+            func.min(numbered.c.date),
+            func.max(numbered.c.date),
+            func.count(),
+        ).group_by(numbered.c.habit_id, numbered.c.island)
+    ).all()
+
+
+def get_streaks(
+    db: Session,
+    habit_ids: Optional[Iterable[int]] = None,
+    today: Optional[date] = None,
+    by_frequency: bool = True
+) -> Dict[int, Streak]:
+    """
+    Current + longest streak for many habits (all habits if habit_ids is None).
+    Habits without any completed day are left out; treat them as Streak(0, 0).
+    by_frequency=False counts every habit in days.
+    """
+    today = today or date.today()
+    streaks: Dict[int, Streak] = {}
+    if habit_ids is not None:
+        habit_ids = list(habit_ids)
+
+    # Weekly / monthly habits count their periods, from the rollups
+    periodic = db.query(Habit.id, Habit.frequency).filter(Habit.frequency.in_(list(FREQUENCY_PERIODS)))
+    if habit_ids is not None:
+        periodic = periodic.filter(Habit.id.in_(habit_ids))
+    periodic = {habit_id: FREQUENCY_PERIODS[frequency] for habit_id, frequency in periodic} if by_frequency else {}
+    for habit_id, stats in get_period_stats(db, periodic, today).items():
+        if stats.longest_streak:
+            streaks[habit_id] = Streak(stats.current_streak, stats.longest_streak)
+
+    for habit_id, first_day, last_day, length in _completion_runs(db, habit_ids):
+        if habit_id in periodic:
+            continue
+        current, longest = streaks.get(habit_id, (0, 0))
+
+        # Count only up to today, same as walking back from today
+        if first_day <= today <= last_day:
+            current = (today - first_day).days + 1
+
+        streaks[habit_id] = Streak(current, max(longest, length))
+
+    return streaks
+
+
+def get_streak(db: Session, habit_id: int, today: Optional[date] = None) -> Streak:
+    return get_streaks(db, [habit_id], today).get(habit_id, Streak(0, 0))
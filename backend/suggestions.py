@@ -0,0 +1,155 @@
+import heapq
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Set
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models import Habit, HabitStats
+
+# =========================
+# SUGGESTION INDEX
+# =========================
+# Catalog of suggestable habits, keyed by normalized (lowercased) name:
+# the curated lists plus habits tracked by at least MIN_TRACKERS users
+# (so one user's private habit names are never shown to others). For
+# each entry it keeps how many users track it, their combined success
+# rate, and how often it is tracked together with every other entry.
+# Built from the habits + habit_stats tables in one pass and rebuilt when
+# older than MAX_AGE_SECONDS; requests only rank what is in memory.
+
+MIN_TRACKERS = 3
+MAX_AGE_SECONDS = 300
+SUCCESS_WEIGHT = 0.5
+
+
+def normalize(name: str) -> str:
+    return name.lower()
+
+
+class CatalogEntry(NamedTuple):
+    name: str  # Display name
+    category: str
+    rank: int  # Curated order first, then by popularity
+    users: int  # Users tracking it
+    success: float  # Smoothed completion rate over all trackers
+
+
+class SuggestionIndex:
+    def __init__(self, catalog: Dict[str, List[str]], max_age_seconds: float = MAX_AGE_SECONDS):
+        self.catalog = catalog
+        self.max_age_seconds = max_age_seconds
+        self.built_at: Optional[float] = None
+        self._entries: Dict[str, CatalogEntry] = {}
+        self._base_scores: Dict[str, Dict[str, float]] = {}  # category -> {key: score without affinity}
+        self._affinity: Dict[str, Dict[str, Dict[str, float]]] = {}  # key -> category -> {other: share}
+        self._lock = threading.Lock()
+
+    # ---------- building ----------
+
+    def build(self, db: Session) -> None:
+        rows = db.query(
+            Habit.user_id, Habit.name, Habit.category, HabitStats.total, HabitStats.completed
+        ).outerjoin(HabitStats, HabitStats.habit_id == Habit.id)
+
+        users_by_name: Dict[str, Set[int]] = {}
+        names_by_user: Dict[int, Set[str]] = {}
+        spellings: Dict[str, Counter] = {}
+        categories: Dict[str, Counter] = {}
+        totals: Counter = Counter()
+        completed: Counter = Counter()
+
+        for user_id, name, category, total, done in rows:
+            key = normalize(name)
+            users_by_name.setdefault(key, set()).add(user_id)
+            names_by_user.setdefault(user_id, set()).add(key)
+            spellings.setdefault(key, Counter())[name] += 1
+            categories.setdefault(key, Counter())[category] += 1
+            totals[key] += total or 0
+            completed[key] += done or 0
+
+        def entry(key: str, name: str, category: str, rank: int) -> CatalogEntry:
+            return CatalogEntry(
+                name, category, rank,
+                len(users_by_name.get(key, ())),
+                (completed[key] + 1) / (totals[key] + 2),
+            )
+
+        entries: Dict[str, CatalogEntry] = {}
+        for category, names in self.catalog.items():
+            for name in names:
+                entries.setdefault(normalize(name), entry(normalize(name), name, category, len(entries)))
+
+        popular = sorted(
+            (key for key, users in users_by_name.items() if len(users) >= MIN_TRACKERS and key not in entries),
+            key=lambda key: (-len(users_by_name[key]), key)
+        )
+        for key in popular:
+            name = spellings[key].most_common(1)[0][0]
+            category = categories[key].most_common(1)[0][0]
+            entries[key] = entry(key, name, category, len(entries))
+
+        # Share of each entry's trackers who also track another entry,
+        # grouped by the other entry's category (the one a request ranks)
+        cooccurrence: Dict[str, Counter] = {}
+        for names in names_by_user.values():
+            tracked = [key for key in names if key in entries]
+            for key in tracked:
+                counts = cooccurrence.setdefault(key, Counter())
+                for other in tracked:
+                    if other != key:
+                        counts[other] += 1
+        affinity: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for key, counts in cooccurrence.items():
+            users = entries[key].users
+            for other, count in counts.items():
+                affinity.setdefault(key, {}).setdefault(entries[other].category, {})[other] = count / users
+
+        base_scores: Dict[str, Dict[str, float]] = {}
+        for key, catalog_entry in entries.items():
+            base_scores.setdefault(catalog_entry.category, {})[key] = SUCCESS_WEIGHT * catalog_entry.success
+
+        with self._lock:
+            self._entries, self._base_scores, self._affinity = entries, base_scores, affinity
+            self.built_at = time.monotonic()
+
+    def ensure_built(self, db: Session) -> None:
+        if self.built_at is None or time.monotonic() - self.built_at > self.max_age_seconds:
+            self.build(db)
+
+    # ---------- queries ----------
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def has_category(self, category: Optional[str]) -> bool:
+        return category in self._base_scores
+
+    def top_k(self, category: str, existing: Set[str], k: int) -> List[CatalogEntry]:
+        """
+        Best k entries of category that are not in existing (normalized
+        names of the user's habits). Score = SUCCESS_WEIGHT * success plus,
+        for each of the user's habits, the share of its trackers who also
+        track the entry. Ties keep catalog order.
+        """
+        with self._lock:
+            entries, base_scores, affinity = self._entries, self._base_scores, self._affinity
+
+        scores = dict(base_scores.get(category, {}))
+        for key in existing:
+            for other, share in affinity.get(key, {}).get(category, {}).items():
+                scores[other] += share
+        for key in existing:
+            scores.pop(key, None)
+
+        best = heapq.nlargest(max(k, 0), scores.items(), key=lambda item: (item[1], -entries[item[0]].rank))
+        return [entries[key] for key, _ in best]
+
+
+def user_habit_names(db: Session, user_id: int) -> Set[str]:
+    """
+    Normalized names of the user's habits, read from the
+    (user_id, lower(name)) index alone.
+    """
+    # SQLite's lower() is ASCII-only; normalizing again matches Python's
+    return {normalize(name) for (name,) in db.query(func.lower(Habit.name)).filter(Habit.user_id == user_id)}
@@ -0,0 +1,258 @@
+import json
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+
+from bulk import progress_upsert_statement
+from change_log import log_habit, log_progress
+from models import Change, Habit, Progress, SyncOperation, User
+from moods import classify_mood
+from rollups import delete_habit_rollups, refresh_rollups
+from schemas import SyncOperationItem
+from stats import apply_progress_writes, delete_habit_stats, read_completions
+
+# =========================
+# CHANGE LOG / OFFLINE SYNC
+# =========================
+# Every habit and progress write appends the key it wrote to `changes`
+# (change_log.py), numbered by a sequence that only grows. A client
+# coming back online asks GET /sync?since=<last seq it saw> for the rows
+# changed after that, so reconnecting costs as much as the changes, not the
+# data; it replays its queued writes through POST /sync, whose client
+# generated operation ids make retries harmless. The compact_changes job
+# drops log rows that a later change to the same key supersedes.
+
+SYNC_PAGE_SIZE = 1000  # Log rows per GET /sync page
+MAX_SYNC_PAGE_SIZE = 5000
+OPERATION_RETENTION_DAYS = 30  # How long POST /sync remembers an operation id
+
+HABIT_FIELDS = ("id", "name", "frequency", "category", "start_date")
+PROGRESS_FIELDS = ("id", "habit_id", "date", "completed", "notes")
+
+
+def remove_habit(db: Session, habit: Habit) -> None:
+    """
+    Delete a habit with its progress, stats and rollups, and log it.
+    The caller commits.
+    """
+    db.query(Progress).filter(Progress.habit_id == habit.id).delete()
+    delete_habit_stats(db, habit.id)
+    delete_habit_rollups(db, habit.id)
+    db.delete(habit)
+    db.flush()  # Later lookups in the transaction must not find it
+    log_habit(db, habit.user_id, habit.id, "delete")
+
+
+# ---------- GET /sync ----------
+
+def get_changes(db: Session, user_id: int, since: int = 0, limit: int = SYNC_PAGE_SIZE) -> Dict:
+    """
+    The user's rows changed after `since`, as they are now, from the next
+    `limit` log rows. `seq` is the since for the next call; `more` says
+    whether there is one. Habits whose id was deleted in this range are
+    in deleted_habits (their progress with them); apply those first, as
+    SQLite may have given the id to a newer habit in `habits`.
+    """
+    changes = db.query(Change.seq, Change.entity, Change.op, Change.habit_id, Change.date).filter(
+        Change.user_id == user_id, Change.seq > since
+    ).order_by(Change.seq).limit(limit + 1).all()
+    more = len(changes) > limit
+    changes = changes[:limit]
+
+    seq = changes[-1].seq if changes else since
+    habit_ids = {change.habit_id for change in changes if change.entity == "habit"}
+    deleted = {change.habit_id for change in changes if change.entity == "habit" and change.op == "delete"}
+
+    habits = [
+        dict(zip(HABIT_FIELDS, row))
+        for row in db.query(*[getattr(Habit, name) for name in HABIT_FIELDS]).filter(
+            Habit.user_id == user_id, Habit.id.in_(habit_ids)
+        ).order_by(Habit.id)
+    ] if habit_ids else []
+    existing = {habit["id"] for habit in habits}
+
+    # Joined to the page's log rows, so each row is found through
+    # uq_progress_habit_date (an IN list of keys scans the user's progress).
+    # Keys whose row is gone belong to deleted habits, reported above
+    progress = [
+        dict(zip(PROGRESS_FIELDS, row))
+        for row in db.query(*[getattr(Progress, name) for name in PROGRESS_FIELDS]).join(
+            Change, (Change.habit_id == Progress.habit_id) & (Change.date == Progress.date)
+        ).filter(
+            Change.user_id == user_id,
+            Change.seq > since,
+            Change.seq <= seq,
+            Change.entity == "progress",
+            Progress.user_id == user_id
+        ).distinct().order_by(Progress.habit_id, Progress.date)
+    ] if any(change.entity == "progress" for change in changes) else []
+
+    return {
+        "since": since,
+        "seq": seq,
+        "more": more,
+        "deleted_habits": sorted(deleted | (habit_ids - existing)),
+        "habits": habits,
+        "progress": progress,
+    }
+
+
+# ---------- POST /sync ----------
+
+class _OperationError(Exception):
+    pass
+
+
+def _resolve_habit(db: Session, user_id: int, item: SyncOperationItem, created: Dict[str, int]) -> int:
+    if item.habit_op_id is not None:
+        if item.habit_op_id not in created:
+            raise _OperationError("Unknown habit_op_id")
+        habit_id = created[item.habit_op_id]
+    elif item.habit_id is not None:
+        habit_id = item.habit_id
+    else:
+        raise _OperationError("habit_id or habit_op_id is required")
+    if db.query(Habit.id).filter(Habit.id == habit_id, Habit.user_id == user_id).first() is None:
+        raise _OperationError("Habit not found")
+    return habit_id
+
+
+def _apply(db: Session, user_id: int, item: SyncOperationItem, created: Dict[str, int],
+           pending: List[Tuple[int, date, Optional[int], int]]) -> Dict:
+    # One operation, without committing; returns its result. Every check
+    # comes before the first write, so a failed operation leaves nothing
+    if item.type == "create_habit":
+        if item.habit is None:
+            raise _OperationError("habit is required")
+        duplicate = db.query(Habit.id).filter(
+            Habit.user_id == user_id,
+            Habit.name.ilike(item.habit.name),
+            Habit.category.ilike(item.habit.category)
+        ).first()
+        if duplicate is not None:
+            raise _OperationError("Habit already exists in this category")
+        habit = Habit(**item.habit.dict(), user_id=user_id)
+        db.add(habit)
+        db.flush()
+        log_habit(db, user_id, habit.id)
+        created[item.op_id] = habit.id
+        return {"habit_id": habit.id}
+
+    habit_id = _resolve_habit(db, user_id, item, created)
+
+    if item.type == "delete_habit":
+        pending[:] = [entry for entry in pending if entry[0] != habit_id]
+        remove_habit(db, db.get(Habit, habit_id))
+        return {"habit_id": habit_id}
+
+    if item.date is None:
+        raise _OperationError("date is required")
+    # Logged first: takes the write lock before the old value is read
+    log_progress(db, user_id, [(habit_id, item.date)])
+    before = read_completions(db, [(habit_id, item.date)]).get((habit_id, item.date))
+    db.execute(progress_upsert_statement(), [{
+        "habit_id": habit_id,
+        "user_id": user_id,
+        "date": item.date,
+        "completed": item.completed,
+        "notes": item.notes,
+        "mood": classify_mood(item.notes),
+    }])
+    pending.append((habit_id, item.date, before, item.completed))
+    return {"habit_id": habit_id, "date": item.date.isoformat(), "completed": item.completed}
+
+
+def apply_operations(db: Session, user_id: int, items: Sequence[SyncOperationItem], retry: bool = True) -> Dict:
+    """
+    Apply a client's queued writes in order, in one transaction. An
+    operation whose op_id was applied before (a retried batch) is not
+    applied again: its stored result comes back with status "duplicate".
+    Failed operations change nothing and are not remembered, so they can
+    be retried. Progress operations for a habit created offline name it by
+    its create_habit op_id (habit_op_id).
+    """
+    op_ids = {item.op_id for item in items} | {item.habit_op_id for item in items if item.habit_op_id}
+    done = {
+        op_id: json.loads(result)
+        for op_id, result in db.query(SyncOperation.op_id, SyncOperation.result).filter(
+            SyncOperation.user_id == user_id, SyncOperation.op_id.in_(op_ids)
+        )
+    }
+    created = {op_id: result["habit_id"] for op_id, result in done.items() if result["type"] == "create_habit"}
+
+    results: List[Dict] = []
+    # Progress written: (habit_id, date, completed before, after), for the rollups / stats
+    pending: List[Tuple[int, date, Optional[int], int]] = []
+    now = datetime.now()
+    for item in items:
+        if item.op_id in done:
+            results.append({**done[item.op_id], "status": "duplicate"})
+            continue
+        try:
+            result = {"op_id": item.op_id, "type": item.type, **_apply(db, user_id, item, created, pending)}
+        except _OperationError as exc:
+            results.append({"op_id": item.op_id, "type": item.type, "status": "error", "detail": str(exc)})
+            continue
+        db.add(SyncOperation(user_id=user_id, op_id=item.op_id, result=json.dumps(result), created_at=now))
+        done[item.op_id] = result
+        results.append({**result, "status": "applied"})
+
+    refresh_rollups(db, [(habit_id, day) for habit_id, day, _, _ in pending])
+    apply_progress_writes(db, pending)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request (the same batch, retried) applied some of
+        # these first; now they are answered as duplicates
+        db.rollback()
+        if not retry:
+            raise
+        return apply_operations(db, user_id, items, retry=False)
+
+    statuses = [result["status"] for result in results]
+    return {
+        "applied": statuses.count("applied"),
+        "duplicates": statuses.count("duplicate"),
+        "failed": statuses.count("error"),
+        "results": results,
+    }
+
+
+# ---------- maintenance ----------
+
+def compact_changes(db: Session) -> Dict:
+    """
+    Drop log rows superseded by a later change to the same key, and the
+    progress rows of habits deleted since, one user per transaction. Any
+    since still gets every key changed after it. Also forgets POST /sync
+    operation ids older than OPERATION_RETENTION_DAYS.
+    """
+    removed = 0
+    deletion = aliased(Change)
+    for (user_id,) in db.query(User.id).all():
+        latest = select(func.max(Change.seq)).where(Change.user_id == user_id).group_by(
+            Change.entity, Change.habit_id, Change.date, Change.op
+        )
+        removed += db.execute(delete(Change).where(
+            Change.user_id == user_id, Change.seq.not_in(latest)
+        )).rowcount
+        habit_deleted_at = select(func.max(deletion.seq)).where(
+            deletion.user_id == user_id,
+            deletion.entity == "habit",
+            deletion.habit_id == Change.habit_id,
+            deletion.date.is_(None),
+            deletion.op == "delete"
+        ).scalar_subquery()
+        removed += db.execute(delete(Change).where(
+            Change.user_id == user_id, Change.entity == "progress", Change.seq < habit_deleted_at
+        )).rowcount
+        db.commit()
+
+    forgotten = db.execute(delete(SyncOperation).where(
+        SyncOperation.created_at < datetime.now() - timedelta(days=OPERATION_RETENTION_DAYS)
+    )).rowcount
+    db.commit()
+    return {"removed": removed, "operations_forgotten": forgotten}
@@ -0,0 +1,64 @@
+from typing import Optional
+from fastapi import Depends, Header, HTTPException, Query
+from sqlalchemy.orm import Session
+from database import SessionLocal, get_db, get_async_db
+from models import User, Habit, DEFAULT_USER_ID
+
+# =========================
+# CURRENT USER
+# =========================
+# Requests name their user in the X-User-Id header; without it they act as
+# the default user, which owns all data from before users existed (and is
+# what the frontend uses). Every query below the endpoints is scoped by
+# the resulting user_id.
+
+USER_HEADER = "X-User-Id"
+
+
+def get_current_user_id(
+    x_user_id: Optional[int] = Header(default=None),
+    db: Session = Depends(get_db)
+) -> int:
+    user_id = DEFAULT_USER_ID if x_user_id is None else x_user_id
+    if db.get(User, user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user_id
+
+
+def get_stream_user_id(
+    x_user_id: Optional[int] = Header(default=None),
+    user_id: Optional[int] = Query(default=None)
+) -> int:
+    # For GET /events: EventSource can't set headers, so ?user_id= works
+    # too. Checked on its own short-lived session: one from get_db would
+    # stay checked out for as long as the stream is open.
+    user_id = x_user_id if x_user_id is not None else user_id
+    user_id = DEFAULT_USER_ID if user_id is None else user_id
+    db = SessionLocal()
+    try:
+        if db.get(User, user_id) is None:
+            raise HTTPException(status_code=404, detail="User not found")
+    finally:
+        db.close()
+    return user_id
+
+
+async def get_current_user_id_async(
+    x_user_id: Optional[int] = Header(default=None),
+    db=Depends(get_async_db)
+) -> int:
+    # Same check for the /async/... endpoints, on the AsyncSession
+    user_id = DEFAULT_USER_ID if x_user_id is None else x_user_id
+    if await db.get(User, user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user_id
+
+
+def get_user_habit(db: Session, user_id: int, habit_id: int) -> Habit:
+    """
+    The user's habit, or 404 (also for habits of other users).
+    """
+    habit = db.query(Habit).filter(Habit.id == habit_id, Habit.user_id == user_id).first()
+    if not habit:
+        raise HTTPException(status_code=404, detail="Habit not found")
+    return habit
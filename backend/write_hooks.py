@@ -0,0 +1,49 @@
+from typing import Iterable, Optional, Tuple
+from datetime import date
+from sqlalchemy.orm import Session
+from cache import analytics_cache
+from completion_index import completion_index
+from events import event_bus, habit_created_event, habit_deleted_event, progress_event
+
+# =========================
+# AFTER-COMMIT HOOKS
+# =========================
+# In-process state derived from the database (response cache, completion
+# index) is updated here, once a write has committed, and only for the
+# user who wrote; then the change is published to the user's open /events
+# streams (events.py). habit_stats and the period rollups are not: they
+# are refreshed inside the write's own transaction (stats.py, rollups.py).
+# db is the writing request's session, used to build the event payload.
+
+
+def progress_committed(db: Session, user_id: int, entries: Iterable[Tuple[int, date, int]]) -> None:
+    """
+    entries: (habit_id, date, completed) of every upserted progress row.
+    """
+    entries = list(entries)
+    completion_index.record(user_id, entries)
+    analytics_cache.invalidate(user_id)
+    if entries and event_bus.has_listeners(user_id):
+        event_bus.publish(user_id, *progress_event(db, user_id, entries))
+
+
+def habit_created(db: Session, user_id: int, habit_id: int) -> None:
+    analytics_cache.invalidate(user_id)
+    if event_bus.has_listeners(user_id):
+        event_bus.publish(user_id, *habit_created_event(db, user_id, habit_id))
+
+
+def habit_deleted(db: Session, user_id: int, habit_id: int) -> None:
+    completion_index.remove_habit(user_id, habit_id)
+    analytics_cache.invalidate(user_id)
+    if event_bus.has_listeners(user_id):
+        event_bus.publish(user_id, *habit_deleted_event(db, user_id, habit_id))
+
+
+def data_reloaded(user_id: Optional[int] = None) -> None:
+    """
+    After writes too large to replay (demo seeding, imports); None = all users.
+    """
+    completion_index.reset(user_id)
+    analytics_cache.invalidate(user_id)
+    event_bus.reload(user_id)
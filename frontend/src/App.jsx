@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React from 'react';
 import Navigation from './components/Navigation';
 import Dashboard from './components/dashboard';
 import HabitForm from './components/HabitForm';
@@ -6,26 +6,21 @@ import HabitList from './components/HabitList';
 import AISuggestions from './components/AISuggestions';
 import { TabPanel } from 'react-tabs';
 
+// The tabs keep themselves current through GET /events (see subscribeEvents)
 function App() {
-  const [refreshTrigger, setRefreshTrigger] = useState(0);
-
-  const handleRefresh = () => {
-    setRefreshTrigger(prev => prev + 1);
-  };
-
   return (
     <Navigation>
       <TabPanel>
-        <Dashboard refreshTrigger={refreshTrigger} />
+        <Dashboard />
       </TabPanel>
       <TabPanel>
-        <HabitList onProgressLogged={handleRefresh} />
+        <HabitList />
       </TabPanel>
       <TabPanel>
-        <HabitForm onHabitAdded={handleRefresh} />
+        <HabitForm />
       </TabPanel>
       <TabPanel>
-        <AISuggestions onHabitAdded={handleRefresh} />
+        <AISuggestions />
       </TabPanel>
     </Navigation>
   );
@@ -75,4 +75,32 @@ export const fetchMotivation = async (habitId) => {
   const response = await fetch(`${API_BASE_URL}/ai/motivation/${habitId}`);
   if (!response.ok) throw new Error('Failed to fetch motivation');
   return response.json();
-};
\ No newline at end of file
+};
+// Live updates from GET /events. handlers maps an event type (progress,
+// habit_created, habit_deleted, reload) to a callback taking its payload.
+// Every subscriber shares one EventSource, which reconnects on its own and
+// resumes from the last event id. Returns an unsubscribe function.
+const EVENT_TYPES = ['progress', 'habit_created', 'habit_deleted', 'reload'];
+const eventSubscribers = new Set();
+let eventSource = null;
+
+export const subscribeEvents = (handlers) => {
+  if (!eventSource) {
+    eventSource = new EventSource(`${API_BASE_URL}/events`);
+    EVENT_TYPES.forEach(type =>
+      eventSource.addEventListener(type, (event) => {
+        const payload = JSON.parse(event.data);
+        eventSubscribers.forEach(subscriber => subscriber[type] && subscriber[type](payload));
+      })
+    );
+  }
+  eventSubscribers.add(handlers);
+
+  return () => {
+    eventSubscribers.delete(handlers);
+    if (eventSubscribers.size === 0) {
+      eventSource.close();
+      eventSource = null;
+    }
+  };
+};
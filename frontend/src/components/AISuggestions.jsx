@@ -2,7 +2,7 @@ import React, { useState } from 'react';
 import { fetchAISuggestions, createHabit } from '../api';
 import { toast } from 'react-toastify';
 
-const AISuggestions = ({ onHabitAdded }) => {
+const AISuggestions = () => {
   const [suggestions, setSuggestions] = useState([]);
   const [loading, setLoading] = useState(false);
   const [category, setCategory] = useState('');
@@ -27,7 +27,6 @@ const AISuggestions = ({ onHabitAdded }) => {
         start_date: new Date().toISOString().split('T')[0]
       });
       toast.success(`Added "${suggestion.name}"!`);
-      if (onHabitAdded) onHabitAdded();
     } catch (err) {
       toast.error('Failed to add');
     }
@@ -12,7 +12,7 @@ import {
   Legend,
   Filler,
 } from 'chart.js';
-import { fetchDashboardAnalytics } from '../api';
+import { fetchDashboardAnalytics, subscribeEvents } from '../api';
 import { toast, ToastContainer } from 'react-toastify';
 import 'react-toastify/dist/ReactToastify.css';
 import bgImage from '../assets/Dashboard1.jpg';
@@ -147,10 +147,19 @@ const styles = {
   },
 };
 
-const Dashboard = ({ refreshTrigger }) => {
+// Totals every change event carries, in the /analytics/dashboard shape
+const patchTotals = (prev, event) => prev && {
+  ...prev,
+  overall_success_rate: event.overall_success_rate,
+  longest_streak: event.longest_streak,
+  category_progress: event.category_progress,
+};
+
+const Dashboard = () => {
   const [data, setData] = useState(null);
   const [loading, setLoading] = useState(true);
   const [selectedCategory, setSelectedCategory] = useState('all');
+  const [reloads, setReloads] = useState(0);
 
   useEffect(() => {
     const loadData = async () => {
@@ -164,7 +173,22 @@ const Dashboard = ({ refreshTrigger }) => {
       }
     };
     loadData();
-  }, [refreshTrigger]);
+  }, [reloads]);
+
+  // Patch in changes as they happen instead of refetching
+  useEffect(() => subscribeEvents({
+    progress: (event) => setData(prev => prev && {
+      ...patchTotals(prev, event),
+      completion_trend: prev.completion_trend.map(day =>
+        day.date in event.completions
+          ? { ...day, completions: event.completions[day.date] }
+          : day
+      ),
+    }),
+    habit_created: (event) => setData(prev => patchTotals(prev, event)),
+    habit_deleted: (event) => setData(prev => patchTotals(prev, event)),
+    reload: () => setReloads(prev => prev + 1),
+  }), []);
 
   if (loading) {
     return (
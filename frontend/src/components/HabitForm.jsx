@@ -3,7 +3,7 @@ import { createHabit, fetchCategories } from '../api';
 import { toast, ToastContainer } from 'react-toastify';
 import 'react-toastify/dist/ReactToastify.css';
 
-const HabitForm = ({ onHabitAdded }) => {
+const HabitForm = () => {
   const today = new Date().toISOString().split('T')[0];
 
   const [categories, setCategories] = useState([]);
@@ -62,8 +62,6 @@ const HabitForm = ({ onHabitAdded }) => {
       });
 
       setCustomCategory(false);
-
-      if (onHabitAdded) onHabitAdded();
     } catch (err) {
       toast.error(err.message || 'Failed to add habit');
     }
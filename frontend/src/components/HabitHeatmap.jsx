@@ -1,4 +1,5 @@
 import React, { useEffect, useState } from 'react';
+import { subscribeEvents } from '../api';
 
 /* ===== GitHub-style color scale ===== */
 const COLORS = [
@@ -19,6 +20,7 @@ const getColor = (count) => {
 
 const HabitHeatmap = () => {
   const [data, setData] = useState({});
+  const [reloads, setReloads] = useState(0);
 
   useEffect(() => {
     const loadHeatmap = async () => {
@@ -32,7 +34,19 @@ const HabitHeatmap = () => {
     };
 
     loadHeatmap();
-  }, []);
+  }, [reloads]);
+
+  // Completions per written day, for the days on the map
+  useEffect(() => subscribeEvents({
+    progress: (event) => setData(prev => {
+      const next = { ...prev };
+      Object.entries(event.completions).forEach(([day, count]) => {
+        if (day in next) next[day] = count;
+      });
+      return next;
+    }),
+    reload: () => setReloads(prev => prev + 1),
+  }), []);
 
   return (
     <div
@@ -1,13 +1,14 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { toast } from 'react-toastify';
 import {
   fetchHabits,
   createProgress,
   deleteHabit,
-  fetchMotivation
+  fetchMotivation,
+  subscribeEvents
 } from '../api';
 
-const HabitList = ({ onProgressLogged }) => {
+const HabitList = () => {
   const [habits, setHabits] = useState([]);
   const [loading, setLoading] = useState(true);
   const [selectedDate, setSelectedDate] = useState(
@@ -29,9 +30,34 @@ const HabitList = ({ onProgressLogged }) => {
     setLoading(false);
   };
 
+  const [reloads, setReloads] = useState(0);
   useEffect(() => {
     loadHabits();
-  }, [selectedDate]);
+  }, [selectedDate, reloads]);
+
+  // Patch in changes made in other tabs and devices instead of refetching
+  const selectedDateRef = useRef(selectedDate);
+  selectedDateRef.current = selectedDate;
+  useEffect(() => subscribeEvents({
+    progress: (event) => {
+      const stats = Object.fromEntries(event.habits.map(habit => [habit.id, habit]));
+      const selected = Object.fromEntries(
+        event.entries
+          .filter(entry => entry.date === selectedDateRef.current)
+          .map(entry => [entry.habit_id, entry.completed === 1])
+      );
+      setHabits(prev => prev.map(habit => ({
+        ...habit,
+        ...stats[habit.id],
+        ...(habit.id in selected ? { completed_today: selected[habit.id] } : {})
+      })));
+    },
+    habit_created: (event) => setHabits(prev =>
+      prev.some(habit => habit.id === event.habit.id) ? prev : [...prev, event.habit]
+    ),
+    habit_deleted: (event) => setHabits(prev => prev.filter(habit => habit.id !== event.habit_id)),
+    reload: () => setReloads(prev => prev + 1),
+  }), []);
 
   const handleDone = async (habitId) => {
     try {
@@ -44,7 +70,6 @@ const HabitList = ({ onProgressLogged }) => {
       toast.success('Marked as done!');
       setNotes(prev => ({ ...prev, [habitId]: '' }));
       loadHabits();
-      if (onProgressLogged) onProgressLogged();
     } catch (err) {
       toast.error(err.message || 'Already completed');
     }
@@ -69,8 +94,8 @@ const HabitList = ({ onProgressLogged }) => {
     if (!window.confirm('Delete this habit permanently?')) return;
     try {
       await deleteHabit(habitId);
+      setHabits(prev => prev.filter(habit => habit.id !== habitId));
       toast.success('Habit deleted');
-      loadHabits();
     } catch {
       toast.error('Delete failed');
     }